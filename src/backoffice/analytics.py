@@ -0,0 +1,219 @@
+#Projecto final Programação
+#Análise de vendas vetorizada (NumPy) sobre extrações em blocos
+#
+#   python src/backoffice/analytics.py --user adminis --password ...
+#   python src/backoffice/analytics.py ... --chunk 500000 --abc-csv abc.csv --since 2024-01-01
+#
+# Lê todas as linhas encomendadas (Ordered_Item + Order) por ordem de order_id, em blocos
+# de --chunk linhas com um cursor sem buffer, e converte cada bloco em arrays NumPy.
+# Os acumuladores têm o tamanho dos ids de produto/cliente, por isso a memória não
+# cresce com o número de linhas (dezenas de milhões cabem no mesmo orçamento).
+#
+#   ABC de produtos     A = produtos que fazem 80% da receita, B = os 15% seguintes, C = resto
+#   Valor de cliente    receita, nº de encomendas e valor médio por cliente (percentis)
+#   Tamanho do cabaz    distribuição de linhas e unidades por encomenda
+import argparse
+import csv
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: sem resource, a memória é medida com tracemalloc
+    resource = None
+
+from cli import add_connection_args, connect
+
+LINHAS = """
+    SELECT oi.order_id, COALESCE(o.customer_id, 0), oi.product_id, oi.quantity,
+           CAST(oi.quantity * COALESCE(oi.unit_price, p.price) AS DOUBLE)
+    FROM Ordered_Item oi
+    JOIN `Order` o ON o.order_id = oi.order_id
+    JOIN Product p ON p.product_id = oi.product_id
+    WHERE o.order_date >= %s
+    ORDER BY oi.order_id
+"""
+# Cabazes maiores do que isto contam no último balde do histograma
+MAX_CABAZ = 100
+
+
+def memoria_maxima_mb():
+    """Peak memory of this process in MB (ru_maxrss is in KB on Linux, bytes on macOS)"""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024
+    # Só conta a memória alocada pelo Python desde tracemalloc.start() (os arrays NumPy incluídos)
+    return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+
+
+def iter_chunks(conn, chunk_size, since):
+    """Yield the order lines as dicts of NumPy arrays, chunk_size lines at a time"""
+    cursor = conn.cursor()  # sem buffer: as linhas vêm do servidor à medida que são lidas
+    cursor.execute(LINHAS, (since,))
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            dados = np.array(rows, dtype=np.float64)
+            yield {
+                'order_id': dados[:, 0].astype(np.int64),
+                'customer_id': dados[:, 1].astype(np.int64),
+                'product_id': dados[:, 2].astype(np.int64),
+                'quantity': dados[:, 3].astype(np.int64),
+                'net': dados[:, 4],
+            }
+    finally:
+        cursor.close()
+
+
+def acumular(total, indices, pesos=None):
+    """total += bincount(indices, pesos), growing total if a larger id shows up"""
+    parcial = np.bincount(indices, weights=pesos, minlength=len(total))
+    if len(parcial) > len(total):
+        total = np.concatenate([total, np.zeros(len(parcial) - len(total), dtype=total.dtype)])
+    total += parcial.astype(total.dtype)
+    return total
+
+
+class SalesAnalytics:
+    """Accumulates per-product, per-customer and per-order metrics chunk by chunk.
+
+    Chunks must arrive sorted by order_id; the lines of the last order of a chunk are
+    held back until the next one, so every order is measured whole.
+    """
+    def __init__(self, max_product_id=0, max_customer_id=0):
+        self.product_revenue = np.zeros(max_product_id + 1)
+        self.product_units = np.zeros(max_product_id + 1, dtype=np.int64)
+        self.customer_revenue = np.zeros(max_customer_id + 1)
+        self.customer_orders = np.zeros(max_customer_id + 1, dtype=np.int64)
+        self.basket_lines = np.zeros(MAX_CABAZ + 1, dtype=np.int64)
+        self.basket_units = np.zeros(MAX_CABAZ + 1, dtype=np.int64)
+        self.lines = 0
+        self._pendente = None
+
+    def add(self, chunk):
+        self.lines += len(chunk['order_id'])
+        self.product_revenue = acumular(self.product_revenue, chunk['product_id'], chunk['net'])
+        self.product_units = acumular(self.product_units, chunk['product_id'], chunk['quantity'])
+        self.customer_revenue = acumular(self.customer_revenue, chunk['customer_id'], chunk['net'])
+
+        if self._pendente is not None:
+            chunk = {k: np.concatenate([self._pendente[k], v]) for k, v in chunk.items()}
+        ultima = chunk['order_id'] == chunk['order_id'][-1]
+        self._pendente = {k: v[ultima] for k, v in chunk.items()}
+        completas = {k: v[~ultima] for k, v in chunk.items()}
+        if len(completas['order_id']):
+            self._add_orders(completas)
+
+    def finish(self):
+        """Account for the last order once the stream has ended"""
+        if self._pendente is not None and len(self._pendente['order_id']):
+            self._add_orders(self._pendente)
+        self._pendente = None
+
+    def _add_orders(self, linhas):
+        ids = linhas['order_id']
+        inicios = np.concatenate([[0], np.flatnonzero(np.diff(ids)) + 1])
+        linhas_por_encomenda = np.diff(np.concatenate([inicios, [len(ids)]]))
+        unidades = np.add.reduceat(linhas['quantity'], inicios)
+        self.customer_orders = acumular(self.customer_orders, linhas['customer_id'][inicios])
+        self.basket_lines += np.bincount(np.minimum(linhas_por_encomenda, MAX_CABAZ),
+                                         minlength=MAX_CABAZ + 1)
+        self.basket_units += np.bincount(np.minimum(unidades, MAX_CABAZ), minlength=MAX_CABAZ + 1)
+
+    def abc(self, a=0.80, b=0.95):
+        """ABC classes: (product_ids sorted by revenue, their revenue, class letter per product)"""
+        vendidos = np.flatnonzero(self.product_revenue > 0)
+        ordem = vendidos[np.argsort(-self.product_revenue[vendidos], kind='stable')]
+        receita = self.product_revenue[ordem]
+        total = receita.sum() or 1.0
+        # Um produto pertence à classe onde começa a sua receita acumulada
+        anterior = (np.cumsum(receita) - receita) / total
+        classes = np.where(anterior < a, 'A', np.where(anterior < b, 'B', 'C'))
+        return ordem, receita, classes
+
+    def customer_value(self):
+        """Revenue, orders and average order value of every customer who bought something"""
+        clientes = np.flatnonzero(self.customer_orders > 0)
+        receita = self.customer_revenue[clientes]
+        encomendas = self.customer_orders[clientes]
+        return clientes, receita, encomendas, receita / encomendas
+
+
+def percentis(valores, ps=(50, 90, 99)):
+    return "  ".join(f"p{p}={v:,.2f}" for p, v in zip(ps, np.percentile(valores, ps))) if len(valores) else "-"
+
+
+def histograma(contagens, titulo):
+    total = contagens.sum()
+    if not total:
+        return
+    media = (np.arange(len(contagens)) * contagens).sum() / total
+    print(f"\n{titulo} (média {media:.2f})")
+    for tamanho in np.flatnonzero(contagens)[:15]:
+        rotulo = f"{tamanho}+" if tamanho == MAX_CABAZ else str(tamanho)
+        print(f"  {rotulo:>4}  {contagens[tamanho]:>12,}  {contagens[tamanho] / total:6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Análise vetorizada das vendas (ABC, clientes, cabazes)")
+    add_connection_args(parser)
+    parser.add_argument("--chunk", type=int, default=200_000, help="linhas lidas de cada vez")
+    parser.add_argument("--since", default="1000-01-01", help="só encomendas desde esta data")
+    parser.add_argument("--abc-csv", help="escrever a classificação ABC de cada produto neste CSV")
+    parser.add_argument("--top", type=int, default=10, help="produtos/clientes a mostrar")
+    args = parser.parse_args()
+
+    conn = connect(args)
+    cursor = conn.cursor(buffered=True)
+    cursor.execute("SELECT (SELECT COALESCE(MAX(product_id), 0) FROM Product),"
+                   " (SELECT COALESCE(MAX(customer_id), 0) FROM Customer)")
+    max_produto, max_cliente = cursor.fetchone()
+    cursor.close()
+
+    if resource is None:
+        tracemalloc.start()
+    analise = SalesAnalytics(max_produto, max_cliente)
+    inicio = time.perf_counter()
+    for chunk in iter_chunks(conn, args.chunk, args.since):
+        analise.add(chunk)
+        taxa = analise.lines / (time.perf_counter() - inicio)
+        print(f"\r  {analise.lines:,} linhas ({taxa:,.0f} linhas/s)", end="", flush=True)
+    analise.finish()
+    conn.close()
+    duracao = time.perf_counter() - inicio
+    memoria = memoria_maxima_mb()
+    print(f"\n✅ {analise.lines:,} linhas em {duracao:.1f}s, memória máxima {memoria:,.0f} MB")
+
+    produtos, receita, classes = analise.abc()
+    print("\nClassificação ABC")
+    for classe in "ABC":
+        seleccao = classes == classe
+        print(f"  {classe}: {seleccao.sum():>8,} produtos  {receita[seleccao].sum():>16,.2f} €")
+    for product_id, valor, classe in list(zip(produtos, receita, classes))[:args.top]:
+        print(f"    {product_id:>10}  {valor:>14,.2f} €  {classe}")
+    if args.abc_csv:
+        with open(args.abc_csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["product_id", "revenue", "units", "class"])
+            writer.writerows(zip(produtos, np.round(receita, 2), analise.product_units[produtos], classes))
+        print(f"  classificação completa em {args.abc_csv}")
+
+    clientes, valor, encomendas, medio = analise.customer_value()
+    print(f"\nValor por cliente ({len(clientes):,} clientes com compras)")
+    print(f"  receita:      {percentis(valor)}")
+    print(f"  encomendas:   {percentis(encomendas)}")
+    print(f"  valor médio:  {percentis(medio)}")
+    for i in np.argsort(-valor)[:args.top]:
+        print(f"    {clientes[i]:>10}  {valor[i]:>14,.2f} €  {encomendas[i]:>6} encomendas")
+
+    histograma(analise.basket_lines, "Linhas por encomenda")
+    histograma(analise.basket_units, "Unidades por encomenda")
+
+
+if __name__ == "__main__":
+    main()
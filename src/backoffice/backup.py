@@ -0,0 +1,55 @@
+#Projecto final Programação
+#Backups completos, incrementais (binlog) e restauro até um instante
+#
+#   python src/backoffice/backup.py full --user adminis --password ...
+#   python src/backoffice/backup.py incremental --user adminis --password ...
+#   python src/backoffice/backup.py restore --until "2026-10-17 14:30:00" --user adminis --password ...
+#
+# Os backups ficam em backups/ (ver BackupManager em buypay.py). O incremental guarda
+# só o binlog escrito desde o backup anterior da cadeia; exige log_bin ligado no MySQL.
+# O restauro aplica o último backup completo (ou --full), carregando as tabelas em
+# paralelo (--workers) sem índices secundários nem verificação de FKs, confirma o
+# número de linhas de cada tabela com o manifest.json e depois aplica os incrementais.
+import argparse
+import sys
+from datetime import datetime
+
+from cli import add_connection_args, credentials
+from buypay import ConfigManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backups e restauro da base de dados BuyPy")
+    parser.add_argument("modo", choices=["full", "incremental", "restore"])
+    add_connection_args(parser)
+    parser.add_argument("--full", help="pasta do backup completo a restaurar (por omissão o mais recente)")
+    parser.add_argument("--until", type=datetime.fromisoformat,
+                        help="restaurar até este instante (AAAA-MM-DD HH:MM:SS)")
+    parser.add_argument("--workers", type=int,
+                        help="ligações em paralelo (por omissão [Backup] workers do config.ini)")
+    args = parser.parse_args()
+
+    user, password = credentials(args)
+    backup = ConfigManager.backup_manager(user, password, args.host, args.database, args.workers)
+
+    def progresso(estado):
+        print(f"\r  {estado['tables_done']}/{estado['tables_total']} {estado['table']:<40}",
+              end="", flush=True)
+
+    try:
+        if args.modo == "restore":
+            pasta = backup.restore(args.full, args.until, progresso)
+            print(f"\n✅ Restaurado a partir de {pasta}" + (f" até {args.until}" if args.until else ""))
+        else:
+            # A instância com as opções da linha de comandos (fazer_backup usaria o login da GUI)
+            if args.modo == "incremental":
+                pasta = backup.run_incremental(progresso)
+            else:
+                pasta = backup.run(progresso)
+            print(f"\n✅ Backup criado em {pasta}" if pasta else "\n➖ Sem alterações desde o último backup")
+    except Exception as e:
+        sys.exit(f"\n❌ {e}")
+
+
+if __name__ == "__main__":
+    main()
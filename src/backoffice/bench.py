@@ -0,0 +1,262 @@
+#Projecto final Programação
+#Benchmark dos métodos do DatabaseManager e das stored procedures
+#
+#   python src/backoffice/bench.py --user adminis --password ... --save baseline.json
+#   python src/backoffice/bench.py --user adminis --password ... --compare baseline.json
+#
+# Corre contra uma base de dados local já povoada (ver seed.py). Atenção: os casos
+# add_*, AddProductToOrder_ e create_order_with_items escrevem dados. Mostra
+# p50/p95/p99 e débito por caso; com --compare assinala regressões face a um
+# ficheiro JSON guardado antes. --query-stats guarda os tempos de cada query SQL
+# (QueryStats: .json, ou texto Prometheus com .prom). Para medir a cache de
+# statements preparados, correr com --save sem ela e depois --prepared-cache 64
+# --compare contra esse ficheiro.
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+import mysql.connector
+
+from cli import add_connection_args, database_manager
+
+
+def percentil(ordenados, p):
+    """p-th percentile of an already sorted list (nearest rank)"""
+    if not ordenados:
+        return 0.0
+    k = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados))) - 1))
+    return ordenados[k]
+
+
+def medir(fn, iteracoes, aquecimento):
+    """Call fn() repeatedly; return latency statistics in milliseconds"""
+    for _ in range(aquecimento):
+        try:
+            fn()
+        except mysql.connector.Error:
+            pass
+    tempos = []
+    erros = 0
+    inicio = time.perf_counter()
+    for _ in range(iteracoes):
+        t0 = time.perf_counter()
+        try:
+            fn()
+        except mysql.connector.Error:
+            erros += 1
+        tempos.append((time.perf_counter() - t0) * 1000)
+    duracao = time.perf_counter() - inicio
+    tempos.sort()
+    return {
+        'iterations': iteracoes,
+        'errors': erros,
+        'p50_ms': percentil(tempos, 50),
+        'p95_ms': percentil(tempos, 95),
+        'p99_ms': percentil(tempos, 99),
+        'mean_ms': sum(tempos) / len(tempos),
+        'ops_per_s': iteracoes / duracao if duracao else 0.0,
+    }
+
+
+def amostra(db, tamanho=500):
+    """Pick random existing customers, products and orders to use as parameters"""
+    def ids(tabela, coluna):
+        maximo = db.fetch_one(f"SELECT COALESCE(MAX({coluna}), 0) AS m FROM `{tabela}`")['m']
+        if not maximo:
+            return []
+        pedidos = [random.randint(1, maximo) for _ in range(tamanho)]
+        marcadores = ", ".join(["%s"] * len(pedidos))
+        return db.fetch_all(f"SELECT * FROM `{tabela}` WHERE {coluna} IN ({marcadores})", pedidos)
+
+    clientes = ids('Customer', 'customer_id')
+    produtos = ids('Product', 'product_id')
+    encomendas = ids('Order', 'order_id')
+    if not (clientes and produtos and encomendas):
+        sys.exit("❌ A base de dados está vazia: povoe-a primeiro com seed.py")
+    return {'customers': clientes, 'products': produtos, 'orders': encomendas}
+
+
+def criar_encomenda(db, customer_id):
+    """Create an order through CreateOrder_ and return its id"""
+    def work(conn):
+        cursor = conn.cursor()
+        try:
+            args = cursor.callproc('CreateOrder_', [customer_id, 'Standard', '************0000',
+                                                    'Benchmark', '2030-01-01', 0])
+            conn.commit()
+            return args[5]
+        finally:
+            cursor.close()
+    return db.run(work)
+
+
+def casos(db, dados):
+    """Yield (name, callable) for every benchmarked operation"""
+    clientes, produtos, encomendas = dados['customers'], dados['products'], dados['orders']
+    sufixo = datetime.now().strftime("%H%M%S")
+    contador = itertools.count()
+
+    yield 'search_user_by_id', lambda: db.search_user_by_id(random.choice(clientes)['customer_id'])
+    yield 'search_user_by_username', lambda: db.search_user_by_username(random.choice(clientes)['email'])
+
+    # Sem a CustomerCache: cada chamada vai mesmo à base de dados
+    def sem_cache(fn, coluna):
+        def chamar():
+            cliente = random.choice(clientes)
+            db.customer_cache.invalidate(cliente['customer_id'])
+            fn(cliente[coluna])
+        return chamar
+    yield 'search_user_by_id(sem cache)', sem_cache(db.search_user_by_id, 'customer_id')
+    yield 'search_user_by_username(sem cache)', sem_cache(db.search_user_by_username, 'email')
+    yield 'get_blocked_users', db.get_blocked_users
+    # Sem CustomerIndex (o bench não o arranca) mede o fallback com os índices da migração 007
+    for prefixo in ('mar', 'silva', 'joao.s', '3519'):
+        yield f'suggest_customers({prefixo})', (lambda t: lambda: db.suggest_customers(t))(prefixo)
+
+    # Todas as combinações de filtros de get_products
+    tipos = [None, 'Book', 'Electronics']
+    quantidades = [(None, None), (10, None), (None, 5), (5, 50)]
+    precos = [(None, None), (100, None), (None, 20), (10, 50)]
+    for tipo, (min_qty, max_qty), (min_price, max_price) in itertools.product(tipos, quantidades, precos):
+        nome = f"get_products(type={tipo},qty={min_qty}-{max_qty},price={min_price}-{max_price})"
+        yield nome, (lambda *f: lambda: db.get_products(*f))(tipo, min_qty, max_qty, min_price, max_price)
+
+    for sort_key in db.PRODUCT_SORT_KEYS:
+        yield f'get_products_page({sort_key})', (lambda k: lambda: db.get_products_page(100, None, k))(sort_key)
+
+    def add_book():
+        n = next(contador)
+        if not db.add_book(10, 19.99, 6, 3, '/images/bench.jpg', f"9{sufixo}{n:06d}"[:13],
+                           f"Benchmark {n}", 'Tecnologia', 'Editora Dados', 'Bench', '2024-01-01'):
+            raise mysql.connector.Error("add_book failed")
+
+    def add_electronics():
+        n = next(contador)
+        if not db.add_electronics(10, 199.99, 23, 3, '/images/bench.jpg', f"BENCH{sufixo}{n}",
+                                  'TechMaster', f"Bench {n}", 'Benchmark', 'Laptop'):
+            raise mysql.connector.Error("add_electronics failed")
+
+    # Pesquisa por texto (migração 006): palavras que aparecem nos dados do seed.py
+    for termo in ('Volume', 'TechMaster Laptop', 'Editora Dados', 'Silva', 'Mistério'):
+        yield f'search_products({termo})', (lambda t: lambda: db.search_products(t, 50))(termo)
+
+    yield 'add_book', add_book
+    yield 'add_electronics', add_electronics
+
+    datas = [o['order_date'].date() for o in encomendas if o.get('order_date')]
+    yield 'DailyOrders_', lambda: db.call_proc('DailyOrders_', [random.choice(datas)])
+    yield 'get_daily_order_summaries', lambda: db.get_daily_order_summaries(random.choice(datas))
+    yield 'get_daily_orders_page', lambda: db.get_daily_orders_page(random.choice(datas), 200)
+    yield 'GetOrderTotal_', lambda: db.call_proc('GetOrderTotal_', [random.choice(encomendas)['order_id'], 0])
+    # Consultas do detalhe de uma encomenda (OrderDetailsDialog)
+    yield 'get_order', lambda: db.get_order(random.choice(encomendas)['order_id'])
+    yield 'get_order_total', lambda: db.get_order_total(random.choice(encomendas)['order_id'])
+    yield 'get_order_items', lambda: db.get_order_items(random.choice(encomendas)['order_id'])
+
+    order_id = criar_encomenda(db, random.choice(clientes)['customer_id'])
+    yield 'AddProductToOrder_', lambda: db.call_proc(
+        'AddProductToOrder_', [order_id, random.choice(produtos)['product_id'], 1])
+
+    def create_order_with_items():
+        items = [(p['product_id'], 1) for p in random.sample(produtos, min(10, len(produtos)))]
+        try:
+            db.create_order_with_items(random.choice(clientes)['customer_id'], items,
+                                       'Standard', '************0000', 'Benchmark', '2030-01-01')
+        except ValueError as err:
+            raise mysql.connector.Error(str(err))
+
+    yield 'create_order_with_items(10 linhas)', create_order_with_items
+
+
+def comparar(resultados, baseline, limite):
+    """Print p50/p95 deltas against a baseline; return the names that regressed"""
+    regressoes = []
+    print(f"\n{'caso':<60} {'p50 Δ%':>8} {'p95 Δ%':>8}")
+    for nome, atual in resultados.items():
+        antes = baseline.get('results', {}).get(nome)
+        if not antes or not antes['p50_ms']:
+            continue
+        d50 = (atual['p50_ms'] / antes['p50_ms'] - 1) * 100
+        d95 = (atual['p95_ms'] / antes['p95_ms'] - 1) * 100 if antes['p95_ms'] else 0.0
+        marca = ""
+        if d50 > limite or d95 > limite:
+            regressoes.append(nome)
+            marca = "  ❌ regressão"
+        print(f"{nome:<60} {d50:>+8.1f} {d95:>+8.1f}{marca}")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do DatabaseManager e das procedures")
+    add_connection_args(parser)
+    parser.add_argument("--iterations", type=int, default=100, help="execuções medidas por caso")
+    parser.add_argument("--warmup", type=int, default=5, help="execuções de aquecimento por caso")
+    parser.add_argument("--only", help="correr só os casos cujo nome contém este texto")
+    parser.add_argument("--pool-size", type=int, default=0, help="usar o DatabaseManager com pool")
+    parser.add_argument("--save", help="guardar os resultados neste ficheiro JSON (baseline)")
+    parser.add_argument("--compare", help="comparar com um ficheiro JSON guardado antes")
+    parser.add_argument("--threshold", type=float, default=20.0,
+                        help="aumento de p50/p95 (%%) considerado regressão")
+    parser.add_argument("--query-stats", help="guardar os tempos por query SQL neste ficheiro")
+    parser.add_argument("--prepared-cache", type=int, default=0,
+                        help="statements preparados guardados por ligação (0 = protocolo de texto)")
+    args = parser.parse_args()
+
+    random.seed(1234)
+    query_stats = None
+    if args.query_stats:
+        # Só quando pedido: a instrumentação também entra nos tempos medidos
+        from buypay import QueryStats
+        query_stats = QueryStats(slow_query_ms=float('inf'))
+    db = database_manager(args, pool_size=args.pool_size, query_stats=query_stats,
+                          prepared_cache_size=args.prepared_cache)
+    resultados = {}
+    try:
+        dados = amostra(db)
+        print(f"{'caso':<60} {'p50':>8} {'p95':>8} {'p99':>8} {'ops/s':>9} {'erros':>6}")
+        for nome, fn in casos(db, dados):
+            if args.only and args.only not in nome:
+                continue
+            r = medir(fn, args.iterations, args.warmup)
+            resultados[nome] = r
+            print(f"{nome:<60} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+                  f" {r['ops_per_s']:>9.1f} {r['errors']:>6}")
+        if args.prepared_cache:
+            stats = db.pool_stats()
+            print(f"\nStatements preparados: {stats['prepared_hits']} reutilizados, "
+                  f"{stats['prepared_misses']} preparados, {stats['prepared_evictions']} descartados")
+    finally:
+        db.disconnect()
+
+    if query_stats is not None:
+        query_stats.dump(args.query_stats)
+        print(f"\n✅ Tempos por query guardados em {args.query_stats}")
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'host': args.host,
+                'python': platform.python_version(),
+                'iterations': args.iterations,
+                'results': resultados,
+            }, f, indent=2)
+        print(f"\n✅ Resultados guardados em {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressoes = comparar(resultados, baseline, args.threshold)
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} caso(s) mais lentos que a baseline")
+            sys.exit(1)
+        print("\n✅ Sem regressões face à baseline")
+
+
+if __name__ == "__main__":
+    main()
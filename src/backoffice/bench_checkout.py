@@ -0,0 +1,123 @@
+#Projecto final Programação
+#Benchmark de checkout concorrente: uma chamada por linha vs encomenda em lote
+#
+#   python src/backoffice/bench_checkout.py --user adminis --password ... --threads 16 --lines 50
+#
+# Cada thread cria encomendas com --lines produtos ao acaso, de duas formas:
+#   por_linha: CreateOrder_ + AddProductToOrder_ por linha (uma ida ao servidor por linha)
+#   lote:      DatabaseManager.create_order_with_items (bloqueia os produtos por ordem,
+#              um INSERT para todas as linhas, uma transação)
+# Atenção: escreve encomendas e desconta stock na base de dados indicada (use seed.py).
+# No fim confirma que nenhum produto ficou com stock negativo (venda acima do stock).
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+from bench import percentil
+from cli import add_connection_args, database_manager
+
+CARTAO = ('Standard', '************0000', 'Benchmark', '2030-01-01')
+
+
+def por_linha(db, customer_id, items):
+    """Legacy path: one procedure call per order line, all on one connection"""
+    def work(conn):
+        cursor = conn.cursor()
+        try:
+            args = cursor.callproc('CreateOrder_', [customer_id, *CARTAO, 0])
+            for product_id, quantity in items:
+                cursor.callproc('AddProductToOrder_', [args[5], product_id, quantity])
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    db.run(work)
+
+
+def em_lote(db, customer_id, items):
+    db.create_order_with_items(customer_id, items, *CARTAO)
+
+
+def carga(db, fn, clientes, produtos, args):
+    """Run fn from args.threads threads for args.seconds; return the statistics"""
+    tempos, erros = [], {'stock': 0, 'mysql': 0}
+    lock = threading.Lock()
+    fim = time.perf_counter() + args.seconds
+
+    def cliente(semente):
+        rng = random.Random(semente)
+        while time.perf_counter() < fim:
+            items = [(p, rng.randint(1, 3)) for p in rng.sample(produtos, args.lines)]
+            t0 = time.perf_counter()
+            try:
+                fn(db, rng.choice(clientes), items)
+                with lock:
+                    tempos.append((time.perf_counter() - t0) * 1000)
+            except ValueError:
+                with lock:
+                    erros['stock'] += 1
+            except mysql.connector.Error as err:
+                # por_linha: "Not enough stock" chega como erro 45000 da procedure
+                with lock:
+                    erros['stock' if err.sqlstate == '45000' else 'mysql'] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        list(executor.map(cliente, range(args.threads)))
+    duracao = time.perf_counter() - inicio
+    tempos.sort()
+    return {
+        'orders': len(tempos),
+        'orders_per_s': len(tempos) / duracao,
+        'lines_per_s': len(tempos) * args.lines / duracao,
+        'p50_ms': percentil(tempos, 50),
+        'p95_ms': percentil(tempos, 95),
+        'out_of_stock': erros['stock'],
+        'errors': erros['mysql'],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de checkout concorrente")
+    add_connection_args(parser)
+    parser.add_argument("--threads", type=int, default=8, help="checkouts em simultâneo")
+    parser.add_argument("--lines", type=int, default=50, help="linhas por encomenda")
+    parser.add_argument("--seconds", type=float, default=20, help="duração de cada modo")
+    parser.add_argument("--products", type=int, default=500,
+                        help="produtos disputados (menos = mais contenção)")
+    args = parser.parse_args()
+
+    db = database_manager(args, pool_size=args.threads)
+    try:
+        clientes = [r['customer_id'] for r in db.fetch_all(
+            "SELECT customer_id FROM Customer ORDER BY RAND() LIMIT 1000")]
+        produtos = [r['product_id'] for r in db.fetch_all(
+            "SELECT product_id FROM Product WHERE active AND quantity > 0 ORDER BY RAND() LIMIT %s",
+            (args.products,))]
+        if not clientes or len(produtos) < args.lines:
+            raise SystemExit("❌ Poucos clientes/produtos: povoe a base de dados com seed.py")
+
+        print(f"{'modo':<10} {'enc/s':>8} {'linhas/s':>10} {'p50 ms':>8} {'p95 ms':>8}"
+              f" {'sem stock':>10} {'erros':>6}")
+        for nome, fn in (('por_linha', por_linha), ('lote', em_lote)):
+            r = carga(db, fn, clientes, produtos, args)
+            print(f"{nome:<10} {r['orders_per_s']:>8.1f} {r['lines_per_s']:>10.0f} {r['p50_ms']:>8.1f}"
+                  f" {r['p95_ms']:>8.1f} {r['out_of_stock']:>10} {r['errors']:>6}")
+
+        negativos = db.fetch_one("SELECT COUNT(*) AS n FROM Product WHERE quantity < 0")['n']
+        if negativos:
+            print(f"❌ {negativos} produtos com stock negativo (venda acima do stock)")
+        else:
+            print("✅ Nenhum produto com stock negativo")
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
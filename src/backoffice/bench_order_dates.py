@@ -0,0 +1,126 @@
+#Projecto final Programação
+#Benchmark: filtro de encomendas com função na coluna vs intervalo semiaberto
+#
+#   python src/backoffice/bench_order_dates.py --user adminis --password ... --rows 2000000
+#
+# Cria uma cópia de `Order` (Order_Bench) com milhões de linhas, mede as duas formas
+# das queries de DailyOrders_/AnnualOrders_ e apaga a tabela no fim (exceto com --keep).
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from cli import add_connection_args, connect
+
+INICIO = datetime(2021, 1, 1)
+DIAS = 3 * 365
+
+QUERIES = {
+    'daily':  ("SELECT * FROM Order_Bench o WHERE DATE(o.order_date) = %s",
+               "SELECT * FROM Order_Bench o WHERE o.order_date >= %s AND o.order_date < %s + INTERVAL 1 DAY"),
+    'annual': ("SELECT * FROM Order_Bench o WHERE o.customer_id = %s AND YEAR(o.order_date) = %s",
+               "SELECT * FROM Order_Bench o WHERE o.customer_id = %s"
+               " AND o.order_date >= MAKEDATE(%s, 1) AND o.order_date < MAKEDATE(%s + 1, 1)"),
+}
+
+
+def seed(cursor, rows, customers):
+    """Fill Order_Bench with about `rows` orders spread over three years"""
+    cursor.execute("DROP TABLE IF EXISTS Order_Bench")
+    cursor.execute("""
+        CREATE TABLE Order_Bench (
+            order_id INT AUTO_INCREMENT PRIMARY KEY,
+            customer_id INT,
+            order_date DATETIME,
+            shipping_method VARCHAR(50),
+            status VARCHAR(50),
+            card_number VARCHAR(20),
+            card_holder_name VARCHAR(100),
+            card_expiry_date DATE,
+            INDEX idx_order_date (order_date),
+            INDEX idx_order_customer_date (customer_id, order_date)
+        )
+    """)
+    base = [
+        (random.randint(1, customers),
+         INICIO + timedelta(seconds=random.randrange(DIAS * 86400)),
+         random.choice(['Standard', 'Express']), 'Entregue',
+         '************1234', 'Cliente Teste', '2030-01-01')
+        for _ in range(1000)
+    ]
+    cursor.executemany("""
+        INSERT INTO Order_Bench (customer_id, order_date, shipping_method, status,
+                                 card_number, card_holder_name, card_expiry_date)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, base)
+
+    # Duplicar a tabela no servidor, baralhando cliente e data, até chegar ao tamanho pedido
+    total = len(base)
+    while total < rows:
+        cursor.execute(f"""
+            INSERT INTO Order_Bench (customer_id, order_date, shipping_method, status,
+                                     card_number, card_holder_name, card_expiry_date)
+            SELECT 1 + FLOOR(RAND() * {customers}),
+                   %s + INTERVAL FLOOR(RAND() * {DIAS * 86400}) SECOND,
+                   shipping_method, status, card_number, card_holder_name, card_expiry_date
+            FROM Order_Bench
+            LIMIT {rows - total}
+        """, (INICIO,))
+        total += cursor.rowcount
+        print(f"  {total:,} encomendas")
+    cursor.execute("ANALYZE TABLE Order_Bench")
+    cursor.fetchall()
+
+
+def time_query(cursor, query, params, repeat):
+    """Run a query `repeat` times with fresh params; return latencies in ms"""
+    tempos = []
+    for _ in range(repeat):
+        inicio = time.perf_counter()
+        cursor.execute(query, params())
+        cursor.fetchall()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das queries de encomendas por data")
+    add_connection_args(parser)
+    parser.add_argument("--rows", type=int, default=2_000_000, help="número de encomendas a gerar")
+    parser.add_argument("--customers", type=int, default=100_000, help="número de clientes distintos")
+    parser.add_argument("--repeat", type=int, default=20, help="execuções por query")
+    parser.add_argument("--keep", action="store_true", help="não apagar Order_Bench no fim")
+    args = parser.parse_args()
+
+    conn = connect(args, autocommit=True)
+    cursor = conn.cursor()
+    print(f"A criar Order_Bench com {args.rows:,} encomendas...")
+    seed(cursor, args.rows, args.customers)
+
+    def dia():
+        return (INICIO + timedelta(days=random.randrange(DIAS))).date()
+
+    params = {
+        'daily': (lambda: (dia(),), lambda: (d := dia(), d)),
+        'annual': (lambda: (random.randint(1, args.customers), random.randint(2021, 2023)),
+                   lambda: (random.randint(1, args.customers), y := random.randint(2021, 2023), y)),
+    }
+
+    print(f"\n{'query':<8} {'forma':<10} {'p50 ms':>10} {'p95 ms':>10}")
+    try:
+        for nome, (funcao, intervalo) in QUERIES.items():
+            for forma, query, gerar in (('função', funcao, params[nome][0]),
+                                        ('intervalo', intervalo, params[nome][1])):
+                tempos = sorted(time_query(cursor, query, gerar, args.repeat))
+                p95 = tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))]
+                print(f"{nome:<8} {forma:<10} {statistics.median(tempos):>10.2f} {p95:>10.2f}")
+    finally:
+        if not args.keep:
+            cursor.execute("DROP TABLE IF EXISTS Order_Bench")
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
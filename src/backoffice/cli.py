@@ -0,0 +1,51 @@
+#Projecto final Programação
+#Ferramentas de linha de comandos do backoffice (partilhado)
+import sys
+from pathlib import Path
+
+import mysql.connector
+
+# As ferramentas reutilizam o DatabaseManager/ConfigManager da aplicação gráfica
+GUI_DIR = Path(__file__).resolve().parent.parent / "backoffice_gui"
+sys.path.insert(0, str(GUI_DIR))
+
+
+def add_connection_args(parser):
+    """Add the usual MySQL connection options to an argparse parser"""
+    parser.add_argument("--host", default="localhost", help="IP/DNS do MySQL")
+    parser.add_argument("--user", help="utilizador (por omissão o operador guardado no config.ini)")
+    parser.add_argument("--password", default="", help="password do utilizador")
+    parser.add_argument("--database", default="BUYPY", help="base de dados")
+
+
+def credentials(args):
+    """Return (user, password) from the command line or the saved operator login"""
+    if args.user:
+        return args.user, args.password
+    from buypay import ConfigManager
+    user, password = ConfigManager().load_config()
+    if not user:
+        sys.exit("❌ Sem credenciais: use --user/--password ou faça login na aplicação")
+    return user, password
+
+
+def connect(args, **kwargs):
+    """Open a plain mysql.connector connection from the parsed arguments"""
+    user, password = credentials(args)
+    return mysql.connector.connect(
+        host=args.host,
+        user=user,
+        password=password,
+        database=args.database,
+        **kwargs
+    )
+
+
+def database_manager(args, pool_size=0, manager_class=None, **kwargs):
+    """Open a DatabaseManager (as used by the GUI) from the parsed arguments"""
+    from buypay import DatabaseManager
+    user, password = credentials(args)
+    db = (manager_class or DatabaseManager)(pool_size=pool_size, **kwargs)
+    if not db.connect(user, password, host=args.host, database=args.database):
+        sys.exit("❌ Não foi possível ligar à base de dados")
+    return db
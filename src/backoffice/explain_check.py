@@ -0,0 +1,104 @@
+#Projecto final Programação
+#Verifica com EXPLAIN se as queries do DatabaseManager usam índices
+#
+#   python src/backoffice/explain_check.py --user adminis --password ...
+#
+# Sai com código 1 se alguma query fizer um full scan sem índice possível.
+import argparse
+import sys
+from datetime import datetime
+
+from cli import add_connection_args, database_manager
+from buypay import DatabaseManager
+
+
+class ExplainingDatabaseManager(DatabaseManager):
+    """DatabaseManager whose SELECTs return their EXPLAIN plan instead of rows"""
+    def fetch_one(self, query, params=(), prepared=False):
+        return self.explain(query, params)
+
+    def fetch_all(self, query, params=(), prepared=False):
+        return self.explain(query, params)
+
+    def explain(self, query, params=()):
+        return DatabaseManager.fetch_all(self, "EXPLAIN " + query, params)
+
+
+# Corpo das stored procedures (não é possível fazer EXPLAIN de um CALL)
+PROCEDURE_QUERIES = {
+    'DailyOrders_': ("""
+        SELECT * FROM `Order` o
+        WHERE o.order_date >= %s AND o.order_date < %s + INTERVAL 1 DAY
+        ORDER BY o.order_date, o.order_id
+    """, ('2023-01-15', '2023-01-15')),
+    'AnnualOrders_': ("""
+        SELECT * FROM `Order` o
+        WHERE o.customer_id = %s
+        AND o.order_date >= MAKEDATE(%s, 1) AND o.order_date < MAKEDATE(%s + 1, 1)
+        ORDER BY o.order_date, o.order_id
+    """, (1, 2023, 2023)),
+    'OrdersBetween_': ("""
+        SELECT * FROM `Order` o
+        WHERE o.order_date >= %s AND o.order_date < %s
+        ORDER BY o.order_date, o.order_id
+    """, ('2023-01-01', '2023-02-01')),
+}
+
+
+def checks(db):
+    """Yield (name, plan, allow_scan) for every query the backoffice runs"""
+    yield 'search_user_by_id', db.search_user_by_id(1), False
+    yield 'search_user_by_username', db.search_user_by_username('joao.silva@email.com'), False
+    yield 'get_blocked_users', db.get_blocked_users(), False
+    # Listar todos os produtos sem filtros lê a tabela toda por definição
+    yield 'get_products()', db.get_products(), True
+    yield 'get_products(min_price)', db.get_products(min_price=500), False
+    yield 'get_products(max_qty)', db.get_products(max_qty=5), False
+    yield 'get_products(Book)', db.get_products('Book'), True
+    plan, _ = db.get_products_page(50, (1, 1), 'price', product_type='Electronics')
+    yield 'get_products_page(price, Electronics)', plan, False
+    for sort_key in DatabaseManager.PRODUCT_SORT_KEYS:
+        plan, _ = db.get_products_page(50, (1, 1), sort_key)
+        yield f'get_products_page({sort_key})', plan, False
+    rows, _ = db.search_products('TechMaster Laptop', 50)
+    yield 'search_products', rows, False
+    yield 'get_daily_order_summaries', db.get_daily_order_summaries('2023-01-15'), False
+    plan, _ = db.get_daily_orders_page('2023-01-15', 200, (datetime(2023, 1, 15, 12), 1))
+    yield 'get_daily_orders_page', plan, False
+    yield 'get_order', db.get_order(1), False
+    yield 'get_order_items', db.get_order_items(1), False
+    for name, (query, params) in PROCEDURE_QUERIES.items():
+        yield name, db.explain(query, params), False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EXPLAIN das queries do backoffice")
+    add_connection_args(parser)
+    args = parser.parse_args()
+
+    # Sem cache de clientes: fetch_one devolve o plano, não um cliente para guardar
+    db = database_manager(args, manager_class=ExplainingDatabaseManager, cache_size=0)
+    falhas = 0
+    try:
+        for name, plan, allow_scan in checks(db):
+            for row in plan:
+                if row['table'] is None or row['table'].startswith('<'):
+                    continue  # tabelas derivadas / sem tabela
+                if row['type'] != 'ALL':
+                    print(f"✅ {name}: {row['table']} usa {row['key']} ({row['type']})")
+                elif allow_scan:
+                    print(f"➖ {name}: {row['table']} full scan (esperado)")
+                elif row['possible_keys']:
+                    # Com poucas linhas o MySQL prefere ler a tabela toda
+                    print(f"⚠️  {name}: {row['table']} full scan, índices possíveis: {row['possible_keys']}")
+                else:
+                    falhas += 1
+                    print(f"❌ {name}: {row['table']} full scan sem índice utilizável")
+    finally:
+        db.disconnect()
+
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#Projecto final Programação
+#Importação em massa de produtos a partir de CSV / JSON / JSON Lines
+#
+#   python src/backoffice/import_products.py catalogo.csv --user adminis --password ...
+#   python src/backoffice/import_products.py catalogo.jsonl --batch 5000 --rejects rejeitados.csv
+#
+# Colunas: type (Book/Electronics), quantity, price, vat_rate, popularity, image_path,
+#          isbn, title, genre, publisher, author, publication_date (livros)
+#          serial_number, brand, model, technical_specs, consumable_type (eletrónicos)
+import argparse
+import csv
+import time
+
+from cli import add_connection_args, database_manager
+from buypay import ProductImporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa um catálogo de produtos em lotes")
+    parser.add_argument("ficheiro", help="ficheiro .csv, .json (array) ou .jsonl")
+    add_connection_args(parser)
+    parser.add_argument("--batch", type=int, default=1000, help="produtos por transação")
+    parser.add_argument("--rejects", help="escrever as linhas rejeitadas neste CSV")
+    args = parser.parse_args()
+
+    db = database_manager(args)
+    inicio = time.perf_counter()
+
+    def progresso(importados, rejeitados):
+        taxa = importados / (time.perf_counter() - inicio)
+        print(f"\r  {importados:,} importados, {rejeitados:,} rejeitados ({taxa:,.0f} linhas/s)",
+              end="", flush=True)
+
+    importer = ProductImporter(db, args.batch, progress=progresso)
+    try:
+        resumo = importer.run(args.ficheiro)
+    except KeyboardInterrupt:
+        importer.cancel()
+        print("\n❌ Interrompido; os lotes já confirmados ficam na base de dados")
+        return
+    finally:
+        db.disconnect()
+
+    print(f"\n✅ {resumo['imported']:,} produtos importados em {resumo['seconds']:.1f}s"
+          f" ({resumo['rows_per_s']:,.0f} linhas/s)")
+    if importer.rejects:
+        print(f"❌ {resumo['rejected']:,} linhas rejeitadas")
+        for linha, motivo in importer.rejects[:10]:
+            print(f"   linha {linha}: {motivo}")
+        if args.rejects:
+            with open(args.rejects, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(["line", "reason"])
+                writer.writerows(importer.rejects)
+            print(f"   lista completa em {args.rejects}")
+
+
+if __name__ == "__main__":
+    main()
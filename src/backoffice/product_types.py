@@ -0,0 +1,48 @@
+#Projecto final Programação
+#Verifica (e corrige) a coluna Product.product_type (migração 008)
+#
+#   python src/backoffice/product_types.py --user adminis --password ...
+#   python src/backoffice/product_types.py ... --fix
+#
+# A listagem de produtos filtra por product_type e junta só a tabela do tipo, por isso
+# um produto com o tipo errado deixa de aparecer. Lista os produtos em que o tipo não
+# bate com a linha em Book/Electronics; --fix acerta-o a partir da tabela de subtipo.
+# Produtos sem subtipo ou com os dois têm de ser corrigidos à mão.
+# Sai com código 1 se ficar algum produto inconsistente.
+import argparse
+import sys
+
+from cli import add_connection_args, database_manager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consistência de Product.product_type")
+    add_connection_args(parser)
+    parser.add_argument("--fix", action="store_true", help="corrigir o tipo a partir de Book/Electronics")
+    parser.add_argument("--limit", type=int, default=20, help="produtos a mostrar")
+    args = parser.parse_args()
+
+    db = database_manager(args)
+    try:
+        if args.fix:
+            corrigidos = db.backfill_product_types()
+            print(f"✅ Corrigidos {corrigidos['books_fixed']} livros e "
+                  f"{corrigidos['electronics_fixed']} eletrónicos")
+        problemas = db.check_product_types()
+    finally:
+        db.disconnect()
+
+    if not problemas:
+        print("✅ product_type consistente em todos os produtos")
+        return
+    print(f"❌ {len(problemas)} produto(s) inconsistentes")
+    for p in problemas[:args.limit]:
+        esperado = f" (devia ser {p['expected_type']})" if p['expected_type'] else ""
+        print(f"   {p['product_id']:>10}  {p['product_type']:<12} {p['problem']}{esperado}")
+    if not args.fix and any(p['expected_type'] for p in problemas):
+        print("➡️  Use --fix para corrigir os que têm subtipo")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
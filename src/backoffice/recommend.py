@@ -0,0 +1,222 @@
+#Projecto final Programação
+#Gera recomendações de produtos (tabela Recommendation) a partir das encomendas
+#
+#   python src/backoffice/recommend.py --user adminis --password ...
+#   python src/backoffice/recommend.py ... --top-k 10 --neighbours 50 --processes 8
+#
+# Filtragem colaborativa item-item:
+#   1. extração   linhas (encomenda, cliente, produto) lidas em blocos (ver analytics.py)
+#   2. coocorrência  B = encomendas x produtos (0/1); C = Bt.B somado por blocos de
+#                 encomendas em vários processos; semelhança de cosseno
+#                 S = C / sqrt(n_i.n_j), só com os --neighbours vizinhos de cada produto
+#   3. pontuação  clientes x produtos = P.S por blocos de clientes em vários processos;
+#                 ficam os --top-k produtos ativos que o cliente ainda não comprou
+#   4. escrita    INSERTs de várias linhas em Recommendation (as de hoje são substituídas)
+# No fim mostra o tempo de cada etapa.
+import argparse
+import time
+from contextlib import contextmanager
+from datetime import date
+from multiprocessing import Pool
+
+import numpy as np
+from scipy import sparse
+
+from analytics import iter_chunks
+from cli import add_connection_args, connect
+
+# Semelhanças, entregues uma vez a cada processo de pontuação (ver _iniciar)
+_S = None
+
+
+def _iniciar(s):
+    global _S
+    _S = s
+
+
+@contextmanager
+def etapa(tempos, nome):
+    """Time a stage of the job and print it when it ends"""
+    inicio = time.perf_counter()
+    print(f"➡️  {nome}...")
+    yield
+    tempos[nome] = time.perf_counter() - inicio
+    print(f"✅ {nome} em {tempos[nome]:.1f}s")
+
+
+def extrair(conn, chunk_size):
+    """Read every order line; returns int32 arrays (order_id, customer_id, product_id)"""
+    encomendas, clientes, produtos = [], [], []
+    for chunk in iter_chunks(conn, chunk_size, "1000-01-01"):
+        encomendas.append(chunk['order_id'].astype(np.int32))
+        clientes.append(chunk['customer_id'].astype(np.int32))
+        produtos.append(chunk['product_id'].astype(np.int32))
+    if not encomendas:
+        return (np.zeros(0, dtype=np.int32),) * 3
+    return np.concatenate(encomendas), np.concatenate(clientes), np.concatenate(produtos)
+
+
+def incidencia(linhas, colunas, n_colunas):
+    """Binary CSR matrix with a 1 at each (row, column) pair, empty rows dropped"""
+    _, linhas = np.unique(linhas, return_inverse=True)
+    m = sparse.csr_matrix((np.ones(len(colunas), dtype=np.float32), (linhas, colunas)),
+                          shape=(linhas.max() + 1 if len(linhas) else 0, n_colunas))
+    m.data[:] = 1  # pares repetidos somam-se: voltar a 0/1
+    return m
+
+
+def gram(bloco):
+    """Product co-occurrence counts of one block of orders"""
+    return (bloco.T @ bloco).tocsr()
+
+
+def blocos(m, n):
+    """Split a CSR matrix into about n blocks of rows"""
+    passo = max(1, -(-m.shape[0] // n))
+    return [m[i:i + passo] for i in range(0, m.shape[0], passo)]
+
+
+def semelhancas(b, processos, vizinhos):
+    """Cosine item-item similarity from the order incidence matrix, top neighbours per item"""
+    with Pool(processos) as pool:
+        parciais = pool.map(gram, blocos(b, processos * 4))
+    c = sparse.csr_matrix((b.shape[1], b.shape[1]), dtype=np.float32)
+    for parcial in parciais:
+        c = c + parcial
+    c.setdiag(0)
+    c.eliminate_zeros()
+    contagem = np.sqrt(np.asarray(b.sum(axis=0)).ravel())
+    inverso = np.divide(1.0, contagem, out=np.zeros_like(contagem), where=contagem > 0)
+    s = sparse.diags(inverso) @ c @ sparse.diags(inverso)
+    return manter_top(sparse.csr_matrix(s), vizinhos)
+
+
+def manter_top(m, k):
+    """Keep the k largest values of each row of a CSR matrix"""
+    m = m.tocsr()
+    linhas, colunas, valores = [], [], []
+    for i in range(m.shape[0]):
+        inicio, fim = m.indptr[i], m.indptr[i + 1]
+        if inicio == fim:
+            continue
+        dados = m.data[inicio:fim]
+        melhores = np.argpartition(-dados, k - 1)[:k] if len(dados) > k else np.arange(len(dados))
+        linhas.append(np.full(len(melhores), i, dtype=np.int32))
+        colunas.append(m.indices[inicio:fim][melhores])
+        valores.append(dados[melhores])
+    if not linhas:
+        return sparse.csr_matrix(m.shape, dtype=np.float32)
+    return sparse.csr_matrix((np.concatenate(valores), (np.concatenate(linhas), np.concatenate(colunas))),
+                             shape=m.shape)
+
+
+def pontuar(args):
+    """Top-k unseen products for a block of customers (runs in a worker process)"""
+    clientes, compras, k = args
+    pontos = (compras @ _S).tocsr()
+    # Retirar o que o cliente já comprou
+    pontos = pontos - pontos.multiply(compras > 0)
+    pontos.eliminate_zeros()
+    saida_clientes, saida_produtos = [], []
+    for i in range(pontos.shape[0]):
+        inicio, fim = pontos.indptr[i], pontos.indptr[i + 1]
+        if inicio == fim:
+            continue
+        dados = pontos.data[inicio:fim]
+        melhores = np.argpartition(-dados, k - 1)[:k] if len(dados) > k else np.arange(len(dados))
+        melhores = melhores[np.argsort(-dados[melhores])]
+        saida_produtos.append(pontos.indices[inicio:fim][melhores])
+        saida_clientes.append(np.full(len(melhores), clientes[i], dtype=np.int32))
+    if not saida_clientes:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    return np.concatenate(saida_clientes), np.concatenate(saida_produtos)
+
+
+def recomendar(s, clientes, produtos, n_produtos, top_k, processos):
+    """Return (customer_ids, product_ids) of the recommendations for every customer"""
+    # Encomendas sem cliente (customer_id NULL -> 0) não geram recomendações
+    com_cliente = clientes > 0
+    clientes, produtos = clientes[com_cliente], produtos[com_cliente]
+    ids, compras_linhas = np.unique(clientes, return_inverse=True)
+    compras = sparse.csr_matrix((np.ones(len(produtos), dtype=np.float32), (compras_linhas, produtos)),
+                                shape=(len(ids), n_produtos))
+    passo = max(1, -(-len(ids) // (processos * 8)))
+    tarefas = [(ids[i:i + passo], compras[i:i + passo], top_k) for i in range(0, len(ids), passo)]
+    with Pool(processos, initializer=_iniciar, initargs=(s,)) as pool:
+        partes = pool.map(pontuar, tarefas)
+    if not partes:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    return np.concatenate([p[0] for p in partes]), np.concatenate([p[1] for p in partes])
+
+
+def escrever(conn, clientes, produtos, lote):
+    """Replace today's recommendations with the new ones, lote rows per INSERT"""
+    hoje = date.today()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DELETE FROM Recommendation WHERE recommendation_date = %s", (hoje,))
+        for i in range(0, len(clientes), lote):
+            # executemany junta as linhas num só INSERT ... VALUES (...), (...)
+            cursor.executemany(
+                "INSERT INTO Recommendation (customer_id, product_id, recommendation_date) VALUES (%s, %s, %s)",
+                [(int(c), int(p), hoje) for c, p in zip(clientes[i:i + lote], produtos[i:i + lote])]
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera recomendações item-item para todos os clientes")
+    add_connection_args(parser)
+    parser.add_argument("--top-k", type=int, default=10, help="recomendações por cliente")
+    parser.add_argument("--neighbours", type=int, default=50, help="vizinhos guardados por produto")
+    parser.add_argument("--processes", type=int, default=4, help="processos de cálculo")
+    parser.add_argument("--chunk", type=int, default=500_000, help="linhas lidas de cada vez")
+    parser.add_argument("--batch", type=int, default=5000, help="linhas por INSERT")
+    parser.add_argument("--dry-run", action="store_true", help="calcular sem escrever na base de dados")
+    args = parser.parse_args()
+
+    tempos = {}
+    conn = connect(args)
+    try:
+        with etapa(tempos, "extração"):
+            encomendas, clientes, produtos = extrair(conn, args.chunk)
+            cursor = conn.cursor(buffered=True)
+            cursor.execute("SELECT product_id FROM Product WHERE active AND quantity > 0")
+            ativos = np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+            cursor.close()
+            n_produtos = int(max(produtos.max(initial=0), ativos.max(initial=0))) + 1
+            print(f"   {len(encomendas):,} linhas, {len(np.unique(clientes)):,} clientes, {len(ativos):,} produtos ativos")
+
+        with etapa(tempos, "coocorrência"):
+            s = semelhancas(incidencia(encomendas, produtos, n_produtos), args.processes, args.neighbours)
+            # Só se recomendam produtos ativos e com stock
+            mascara = np.zeros(n_produtos, dtype=np.float32)
+            mascara[ativos] = 1
+            s = (s @ sparse.diags(mascara)).tocsr()
+            s.eliminate_zeros()
+            print(f"   {s.nnz:,} pares de produtos semelhantes")
+
+        with etapa(tempos, "pontuação"):
+            rec_clientes, rec_produtos = recomendar(s, clientes, produtos, n_produtos,
+                                                    args.top_k, args.processes)
+            print(f"   {len(rec_clientes):,} recomendações")
+
+        if not args.dry_run:
+            with etapa(tempos, "escrita"):
+                escrever(conn, rec_clientes, rec_produtos, args.batch)
+    finally:
+        conn.close()
+
+    total = sum(tempos.values())
+    print(f"\n{'etapa':<14} {'segundos':>9} {'%':>6}")
+    for nome, segundos in tempos.items():
+        print(f"{nome:<14} {segundos:>9.1f} {segundos / total:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#Projecto final Programação
+#Relatórios de vendas a partir das tabelas de agregados (migração 005)
+#
+#   python src/backoffice/reports.py yearly --user adminis --password ...
+#   python src/backoffice/reports.py monthly --year 2024 [--type Book]
+#   python src/backoffice/reports.py top-products --year 2024 [--month 3] [--limit 20]
+#   python src/backoffice/reports.py top-customers --year 2024 [--month 3]
+#   python src/backoffice/reports.py refresh [--rebuild]
+#
+# As respostas vêm de Sales_Daily / Sales_Customer_Monthly, não de Order/Ordered_Item;
+# refresh acrescenta as encomendas novas (o evento do MySQL fá-lo de 5 em 5 minutos).
+import argparse
+import time
+
+from cli import add_connection_args, database_manager
+
+
+def tabela(linhas, colunas):
+    """Print rows (dicts) as aligned columns"""
+    larguras = [max(len(c), *(len(str(l[c])) for l in linhas)) if linhas else len(c) for c in colunas]
+    print("  ".join(c.rjust(w) for c, w in zip(colunas, larguras)))
+    for linha in linhas:
+        print("  ".join(str(linha[c]).rjust(w) for c, w in zip(colunas, larguras)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatórios de vendas da BuyPy")
+    parser.add_argument("relatorio", choices=["yearly", "monthly", "top-products", "top-customers", "refresh"])
+    add_connection_args(parser)
+    parser.add_argument("--year", type=int, help="ano (obrigatório exceto em yearly/refresh)")
+    parser.add_argument("--month", type=int, choices=range(1, 13), help="mês (top-products/top-customers)")
+    parser.add_argument("--type", choices=["Book", "Electronics"], help="só este tipo de produto")
+    parser.add_argument("--limit", type=int, default=10, help="linhas dos tops")
+    parser.add_argument("--rebuild", action="store_true", help="refresh: recalcular tudo de raiz")
+    args = parser.parse_args()
+    if args.relatorio not in ("yearly", "refresh") and not args.year:
+        parser.error("--year é obrigatório neste relatório")
+
+    db = database_manager(args)
+    try:
+        inicio = time.perf_counter()
+        if args.relatorio == "refresh":
+            estado = db.refresh_sales_rollups(args.rebuild)
+            print(f"✅ Agregados atualizados até à encomenda {estado['last_order_id']}")
+        elif args.relatorio in ("yearly", "monthly"):
+            linhas = db.get_sales_by_period(args.year if args.relatorio == "monthly" else None, args.type)
+            tabela(linhas, ["period", "units", "order_lines", "net_revenue", "gross_revenue"])
+        elif args.relatorio == "top-products":
+            tabela(db.get_top_products(args.year, args.month, args.type, args.limit),
+                   ["product_id", "product_type", "description", "units", "gross_revenue"])
+        else:
+            tabela(db.get_top_customers(args.year, args.month, args.limit),
+                   ["customer_id", "first_name", "last_name", "orders", "gross_revenue"])
+        print(f"\n({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+    finally:
+        db.disconnect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#Projecto final Programação
+#Gerador de dados sintéticos para a base de dados BuyPy
+#
+#   python src/backoffice/seed.py --user adminis --password ... --rows 1000000
+#   python src/backoffice/seed.py ... --rows 50000000 --method infile --batch 200000
+#
+# Gera clientes, produtos (livros e eletrónicos), encomendas e itens encomendados com
+# distribuições enviesadas (poucos produtos/clientes concentram a maior parte das vendas)
+# e carrega-os com INSERTs de várias linhas ou LOAD DATA LOCAL INFILE.
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from cli import add_connection_args, connect
+
+# Proporção de cada tabela quando só se indica --rows
+PROPORCOES = {'customers': 0.10, 'products': 0.05, 'orders': 0.30}
+ITENS_POR_ENCOMENDA = 2.5
+
+GENEROS = ['Ficção Científica', 'Arte', 'Mistério', 'Culinária', 'Poesia', 'Tecnologia',
+           'Viagem', 'Negócios', 'Jardinagem', 'Filosofia', 'Romance', 'História']
+EDITORAS = ['Editora Galáxia', 'Editora Cultura', 'Editora Suspense', 'Editora Sabor',
+            'Editora Verso', 'Editora Dados', 'Editora Aventura', 'Editora Pensamento']
+MARCAS = ['TechMaster', 'SoundPlus', 'TabTech', 'GameForce', 'SmartPlus', 'KeyMaster',
+          'PrecisionTech', 'ViewPlus', 'DataSafe', 'PowerUp']
+TIPOS_ELETRONICA = ['Laptop', 'Headphones', 'Tablet', 'Desktop', 'Smartwatch', 'Keyboard',
+                    'Mouse', 'Monitor', 'External Drive', 'Charger']
+NOMES = ['João', 'Maria', 'Carlos', 'Ana', 'Pedro', 'Sofia', 'Miguel', 'Inês', 'Rui',
+         'Beatriz', 'Tiago', 'Marta', 'Diogo', 'Rita', 'Nuno', 'Oksana']
+APELIDOS = ['Silva', 'Santos', 'Pereira', 'Oliveira', 'Martins', 'Ribeiro', 'Fernandes',
+            'Gomes', 'Lopes', 'Marques', 'Costa', 'Rodrigues', 'Almeida', 'Carvalho']
+CIDADES = ['Lisboa', 'Porto', 'Coimbra', 'Braga', 'Faro', 'Setúbal', 'Évora', 'Aveiro', 'Viseu']
+ESTADOS_ENCOMENDA = ['Entregue', 'Enviado', 'Em Processamento', 'Cancelado']
+
+COLUNAS = {
+    'Product': ('product_id', 'quantity', 'price', 'vat_rate', 'popularity', 'image_path',
+                'active', 'product_type'),
+    'Book': ('product_id', 'isbn', 'title', 'genre', 'publisher', 'author', 'publication_date'),
+    'Electronics': ('product_id', 'serial_number', 'brand', 'model', 'technical_specs',
+                    'consumable_type'),
+    'Customer': ('customer_id', 'first_name', 'last_name', 'email', 'password', 'address',
+                 'postal_code', 'city', 'country', 'phone_number', 'status'),
+    'Order': ('order_id', 'customer_id', 'order_date', 'shipping_method', 'status',
+              'card_number', 'card_holder_name', 'card_expiry_date'),
+    'Ordered_Item': ('order_id', 'product_id', 'quantity'),
+}
+
+
+def enviesado(rnd, n):
+    """Pick 1..n with probability roughly proportional to 1/rank (Zipf-like, O(1) memory)"""
+    return min(n, int(math.exp(rnd.random() * math.log(n + 1))))
+
+
+class BatchWriter:
+    """Buffers rows for one table and loads them in batches"""
+    def __init__(self, conn, table, batch_size, method):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.table = table
+        self.columns = COLUNAS[table]
+        self.batch_size = batch_size
+        self.method = method
+        self.buffer = []
+        self.total = 0
+        cols = ", ".join(self.columns)
+        marcadores = ", ".join(["%s"] * len(self.columns))
+        # O conector junta o executemany de um INSERT ... VALUES num único INSERT de várias linhas
+        self.insert_sql = f"INSERT INTO `{table}` ({cols}) VALUES ({marcadores})"
+
+    def add(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.method == 'infile':
+            self._load_infile()
+        else:
+            self.cursor.executemany(self.insert_sql, self.buffer)
+        self.conn.commit()
+        self.total += len(self.buffer)
+        self.buffer = []
+
+    def _load_infile(self):
+        fd, caminho = tempfile.mkstemp(suffix=".tsv")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as f:
+                for row in self.buffer:
+                    f.write("\t".join(self._campo(v) for v in row) + "\n")
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE `{self.table}` CHARACTER SET utf8mb4"
+                f" FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(self.columns)})",
+                (caminho,)
+            )
+        finally:
+            os.remove(caminho)
+
+    @staticmethod
+    def _campo(valor):
+        if valor is None:
+            return "\\N"
+        if isinstance(valor, bool):
+            return "1" if valor else "0"
+        return str(valor)
+
+    def close(self):
+        self.flush()
+        self.cursor.close()
+
+
+def proximo_id(cursor, table, column):
+    cursor.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM `{table}`")
+    return cursor.fetchone()[0]
+
+
+def gerar_produtos(writers, first_id, n, book_share, rnd):
+    for product_id in range(first_id, first_id + n):
+        livro = rnd.random() < book_share
+        if livro:
+            price = round(min(rnd.lognormvariate(2.8, 0.5), 999.99), 2)
+            vat = 6.00
+        else:
+            price = round(min(rnd.lognormvariate(5.2, 0.9), 99999.99), 2)
+            vat = 23.00
+        quantity = int(rnd.expovariate(1 / 40))
+        writers['Product'].add((
+            product_id, quantity, price, vat, rnd.randint(1, 5),
+            f"/images/prod{product_id}.jpg", quantity > 0,
+            'Book' if livro else 'Electronics'
+        ))
+        if livro:
+            writers['Book'].add((
+                product_id, f"978{product_id:010d}",
+                f"{rnd.choice(GENEROS)} Volume {product_id}", rnd.choice(GENEROS),
+                rnd.choice(EDITORAS), f"{rnd.choice(NOMES)} {rnd.choice(APELIDOS)}",
+                (datetime(1990, 1, 1) + timedelta(days=rnd.randrange(12000))).date()
+            ))
+        else:
+            tipo = rnd.choice(TIPOS_ELETRONICA)
+            writers['Electronics'].add((
+                product_id, f"SN{product_id:010d}", rnd.choice(MARCAS),
+                f"{tipo} {rnd.randint(100, 9999)}", f"Especificações do produto {product_id}", tipo
+            ))
+
+
+def gerar_clientes(writers, first_id, n, rnd):
+    for customer_id in range(first_id, first_id + n):
+        nome, apelido = rnd.choice(NOMES), rnd.choice(APELIDOS)
+        sorteio = rnd.random()
+        status = 'blocked' if sorteio < 0.02 else 'inactive' if sorteio < 0.05 else 'active'
+        writers['Customer'].add((
+            customer_id, nome, apelido,
+            f"{nome.lower()}.{apelido.lower()}.{customer_id}@buypy.test",
+            f"hash{customer_id}", f"Rua {rnd.randint(1, 500)}",
+            f"{rnd.randint(1000, 9999)}-{rnd.randint(1, 999):03d}", rnd.choice(CIDADES),
+            'Portugal', f"+3519{rnd.randint(10000000, 99999999)}", status
+        ))
+
+
+def gerar_encomendas(writers, first_id, n, customers, products, dias, rnd):
+    fim = datetime.now().replace(microsecond=0)
+    for order_id in range(first_id, first_id + n):
+        # Mais encomendas nos dias recentes (crescimento da loja)
+        dias_atras = int(dias * (1 - math.sqrt(rnd.random())))
+        customer_id = customers[0] + enviesado(rnd, customers[1]) - 1
+        nome = f"{rnd.choice(NOMES)} {rnd.choice(APELIDOS)}"
+        writers['Order'].add((
+            order_id, customer_id,
+            fim - timedelta(days=dias_atras, seconds=rnd.randrange(86400)),
+            rnd.choice(['Standard', 'Express']), rnd.choice(ESTADOS_ENCOMENDA),
+            f"************{rnd.randint(0, 9999):04d}", nome,
+            (fim + timedelta(days=rnd.randint(30, 1500))).date().replace(day=1)
+        ))
+        # 1 + geométrica: a maioria das encomendas tem 1-3 linhas
+        linhas = 1 + int(rnd.expovariate(1 / (ITENS_POR_ENCOMENDA - 1)))
+        vistos = set()
+        for _ in range(linhas):
+            product_id = products[0] + enviesado(rnd, products[1]) - 1
+            if product_id in vistos:
+                continue
+            vistos.add(product_id)
+            writers['Ordered_Item'].add((order_id, product_id, 1 + int(rnd.expovariate(1.5))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para a BuyPy")
+    add_connection_args(parser)
+    parser.add_argument("--rows", type=int, default=10_000,
+                        help="total aproximado de linhas a gerar (10k a 50M)")
+    parser.add_argument("--customers", type=int, help="número de clientes (sobrepõe --rows)")
+    parser.add_argument("--products", type=int, help="número de produtos (sobrepõe --rows)")
+    parser.add_argument("--orders", type=int, help="número de encomendas (sobrepõe --rows)")
+    parser.add_argument("--book-share", type=float, default=0.6, help="fração de produtos que são livros")
+    parser.add_argument("--days", type=int, default=3 * 365, help="intervalo de datas das encomendas")
+    parser.add_argument("--method", choices=['insert', 'infile'], default='insert',
+                        help="INSERTs de várias linhas ou LOAD DATA LOCAL INFILE")
+    parser.add_argument("--batch", type=int, help="linhas por lote (5000 insert / 200000 infile)")
+    parser.add_argument("--seed", type=int, default=42, help="semente do gerador aleatório")
+    args = parser.parse_args()
+
+    contagens = {nome: getattr(args, nome) or max(1, int(args.rows * fracao))
+                 for nome, fracao in PROPORCOES.items()}
+    batch = args.batch or (200_000 if args.method == 'infile' else 5000)
+    rnd = random.Random(args.seed)
+
+    conn = connect(args, allow_local_infile=(args.method == 'infile'))
+    cursor = conn.cursor()
+    # Os dados gerados são consistentes entre si; sem estas verificações o carregamento
+    # não depende da ordem em que os lotes das várias tabelas são escritos
+    cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+
+    primeiro = {
+        'products': proximo_id(cursor, 'Product', 'product_id'),
+        'customers': proximo_id(cursor, 'Customer', 'customer_id'),
+        'orders': proximo_id(cursor, 'Order', 'order_id'),
+    }
+    writers = {table: BatchWriter(conn, table, batch, args.method) for table in COLUNAS}
+
+    inicio = time.perf_counter()
+    etapas = [
+        ('produtos', lambda: gerar_produtos(writers, primeiro['products'], contagens['products'],
+                                            args.book_share, rnd)),
+        ('clientes', lambda: gerar_clientes(writers, primeiro['customers'], contagens['customers'], rnd)),
+        ('encomendas', lambda: gerar_encomendas(
+            writers, primeiro['orders'], contagens['orders'],
+            (primeiro['customers'], contagens['customers']),
+            (primeiro['products'], contagens['products']), args.days, rnd)),
+    ]
+    for nome, etapa in etapas:
+        t0 = time.perf_counter()
+        etapa()
+        for writer in writers.values():
+            writer.flush()
+        print(f"✅ {nome} gerados em {time.perf_counter() - t0:.1f}s")
+
+    total = 0
+    for table, writer in writers.items():
+        writer.close()
+        total += writer.total
+        print(f"   {table:<13} {writer.total:>12,} linhas")
+    duracao = time.perf_counter() - inicio
+    print(f"✅ {total:,} linhas em {duracao:.1f}s ({total / duracao:,.0f} linhas/s)")
+
+    cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+    # Preço de venda e totais das encomendas geradas (migração 004), num só passo no servidor
+    cursor.execute("SELECT COUNT(*) FROM information_schema.routines"
+                   " WHERE routine_schema = DATABASE() AND routine_name = 'RecalcOrderTotals_'")
+    if cursor.fetchone()[0]:
+        t0 = time.perf_counter()
+        cursor.callproc('RecalcOrderTotals_', [primeiro['orders'], primeiro['orders'] + contagens['orders'] - 1])
+        conn.commit()
+        print(f"✅ totais das encomendas calculados em {time.perf_counter() - t0:.1f}s")
+    cursor.close()
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
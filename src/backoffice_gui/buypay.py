@@ -8,19 +8,41 @@ from pathlib import Path
 import os
 import sys
 import configparser
+import csv
+import gzip
+import json
+import queue
+import re
 import hashlib
 import base64
+import bisect
 import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from datetime import datetime, date
+from decimal import Decimal, ROUND_HALF_UP
 from cryptography.fernet import Fernet
 from PySide6.QtWidgets import QHeaderView
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                               QHBoxLayout, QLabel, QLineEdit, QPushButton,QFileDialog, QVBoxLayout, QFormLayout, 
                               QTabWidget, QTableWidget, QTableWidgetItem, QComboBox, 
                               QDateEdit, QMessageBox, QDialog, QCheckBox, QGroupBox,
-                              QSpinBox, QDoubleSpinBox, QTextEdit, QFileDialog)
-from PySide6.QtCore import Qt, QDate
+                              QSpinBox, QDoubleSpinBox, QTextEdit, QFileDialog, QTableView,
+                              QProgressBar)
+from PySide6.QtCore import (Qt, QDate, QObject, QRunnable, QThreadPool, Signal,
+                            QAbstractTableModel, QModelIndex, QTimer)
 import mysql.connector
+from mysql.connector import errorcode, pooling
+
+try:
+    import zstandard
+except ImportError:  # opcional: sem o pacote zstandard os backups usam gzip
+    zstandard = None
 
 
 
@@ -34,71 +56,198 @@ class ConfigManager:
         self.config = configparser.ConfigParser()
 
     @staticmethod
-    def fazer_backup():
-        # Diretório atual + pasta 'backups'
-        dir_backup = Path.cwd() / "backups"
-        dir_backup.mkdir(exist_ok=True)  # Cria a pasta se não existir
-
-        # Gerar timestamp e nome do ficheiro
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        caminho_ficheiro = dir_backup / f"buypy_backup_{timestamp}.sql"
+    def fazer_backup(progress=None, incremental=False):
+        """Back up the buypy database into backups/buypy_backup_<timestamp>/; returns that path.
 
+        With incremental=True only the binlog since the previous backup is archived
+        (backups/buypy_incr_<timestamp>/, or None when nothing changed).
+        Settings come from the [Backup] section of config.ini (compression, workers).
+        """
+        backup = ConfigManager.backup_manager()
         try:
-            # Executar mysqldump
-            with open(caminho_ficheiro, "w") as f:
-                subprocess.run(
-                    ["mysqldump", "-u", ConfigManager.username, "-p"+ConfigManager.password, "buypy"],
-                    stdout=f,
-                    check=True
-                )
+            caminho = backup.run_incremental(progress) if incremental else backup.run(progress)
+            if caminho:
+                print(f"✅ Backup criado com sucesso em: {caminho}")
+            return caminho
+        except (subprocess.CalledProcessError, mysql.connector.Error, OSError) as e:
+            print(f"❌ Erro ao criar backup: {e}")
+            raise
 
-            print(f"✅ Backup criado com sucesso em: {caminho_ficheiro}")
+    @staticmethod
+    def backup_manager(user=None, password=None, host=None, database=None, workers=None):
+        """BackupManager for the operator's credentials and the [Backup] settings"""
+        settings = ConfigManager()
+        return BackupManager(
+            host=host or settings.get_setting('Backup', 'host', 'localhost'),
+            user=user or ConfigManager.username,
+            password=password if user else ConfigManager.password,
+            database=database or settings.get_setting('Backup', 'database', 'buypy'),
+            compression=settings.get_setting('Backup', 'compression', 'zstd'),
+            workers=workers or int(settings.get_setting('Backup', 'workers', 4))
+        )
 
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Erro ao criar backup: {e}")
+    @staticmethod
+    def iter_statements(linhas):
+        """Split an iterable of script lines into statements, honouring DELIMITER.
+
+        Works line by line, so only the statement being read is kept in memory.
+        """
+        delimitador = ';'
+        buffer = []
+
+        for linha in linhas:
+            linha_strip = linha.strip()
+            if linha_strip.lower().startswith('delimiter'):
+                delimitador = linha_strip.split()[1]
+                continue
+            if not buffer and (not linha_strip or linha_strip.startswith(('--', '#'))):
+                continue  # linhas vazias e comentários entre comandos
+
+            buffer.append(linha)
+            if linha_strip.endswith(delimitador):
+                comando = ''.join(buffer).strip()[:-len(delimitador)].strip()
+                buffer = []
+                if comando:
+                    yield comando
 
     @staticmethod
-    def exec_script_mysql(ficheiro_sql, host, user, password, database):
+    def exec_script_mysql(ficheiro_sql, host, user, password, database,
+                          batch_size=500, progress=None):
+     """Run a SQL script statement by statement; returns how many statements failed.
+
+     The file is streamed, so dumps of any size run in constant memory. Consecutive
+     INSERT/REPLACE statements are grouped into transactions of batch_size statements
+     instead of committing each one. progress, if given, is called with
+     (bytes read, file size, statements run).
+     """
      if not os.path.exists(ficheiro_sql):
         print(f"❌ Ficheiro não encontrado: {ficheiro_sql}")
-        return
+        return None
 
      conn = mysql.connector.connect(
         host=host,
         user=user,
         password=password,
         database=database,
-        autocommit=True
+        autocommit=False
     )
      cursor = conn.cursor()
 
-     with open(ficheiro_sql, 'r', encoding='utf-8') as f:
-        script = f.read()
+     tamanho = os.path.getsize(ficheiro_sql)
+     lidos = 0
+     falhas = 0
+     executados = 0
+     pendentes = 0  # INSERTs por confirmar na transação atual
+     mais_lentos = []  # (segundos, comando) dos 10 comandos mais lentos
+     inicio = ultimo_aviso = time.perf_counter()
 
-     comandos = []
-     delimitador = ';'
-     buffer = ''
+     def linhas(f):
+        nonlocal lidos
+        for raw in f:
+            lidos += len(raw)
+            yield raw.decode('utf-8')
 
-     for linha in script.splitlines():
-        linha_strip = linha.strip()
-        if linha_strip.lower().startswith('delimiter'):
-            delimitador = linha_strip.split()[1]
-            continue
+     with open(ficheiro_sql, 'rb') as f:
+        for comando in ConfigManager.iter_statements(linhas(f)):
+            insercao = comando[:7].upper() in ('INSERT ', 'REPLACE')
+            if not insercao and pendentes:
+                conn.commit()
+                pendentes = 0
 
-        buffer += linha + '\n'
-        if buffer.strip().endswith(delimitador):
-            comandos.append(buffer.strip()[:-len(delimitador)].strip())
-            buffer = ''
+            t0 = time.perf_counter()
+            try:
+                cursor.execute(comando)
+                if cursor.with_rows:
+                    cursor.fetchall()
+                if insercao:
+                    pendentes += 1
+                    if pendentes >= batch_size:
+                        conn.commit()
+                        pendentes = 0
+                else:
+                    conn.commit()
+                    print(f"✅ Executado: {comando.splitlines()[0][:80]}...")
+            except Exception as e:
+                falhas += 1
+                print(f"❌ Erro:\n{comando[:200]}\n→ {e}\n")
+            duracao = time.perf_counter() - t0
+            executados += 1
 
-     for comando in comandos:
-        try:
-            cursor.execute(comando)
-            print(f"✅ Executado: {comando.splitlines()[0][:80]}...")
-        except Exception as e:
-            print(f"❌ Erro:\n{comando[:200]}\n→ {e}\n")
+            if len(mais_lentos) < 10 or duracao > mais_lentos[0][0]:
+                mais_lentos.append((duracao, comando.splitlines()[0][:80]))
+                mais_lentos.sort(key=lambda item: item[0])
+                del mais_lentos[:-10]
+
+            agora = time.perf_counter()
+            if agora - ultimo_aviso >= 1:
+                ultimo_aviso = agora
+                if progress:
+                    progress(lidos, tamanho, executados)
+                else:
+                    print(f"… {lidos * 100 / max(tamanho, 1):.0f}% ({executados} comandos)")
+
+     if pendentes:
+        conn.commit()
+     if progress:
+        progress(lidos, tamanho, executados)
+
+     decorrido = time.perf_counter() - inicio
+     print(f"\n{executados} comandos ({falhas} erros) em {decorrido:.1f}s — "
+           f"{executados / max(decorrido, 1e-9):.0f} comandos/s, "
+           f"{lidos / 1048576 / max(decorrido, 1e-9):.1f} MB/s")
+     print("Comandos mais lentos:")
+     for duracao, comando in reversed(mais_lentos):
+        print(f"  {duracao * 1000:9.1f} ms  {comando}")
 
      cursor.close()
      conn.close()
+     return falhas
+
+    # Pasta com as migrações versionadas (001_..., 002_..., aplicadas por ordem)
+    MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "db" / "migrations"
+
+    @staticmethod
+    def apply_migrations(host, user, password, database, progress=None):
+        """Apply the scripts in src/db/migrations that were not applied yet.
+
+        Returns how many statements failed in the migration that stopped the run
+        (0 when all were applied). progress is passed to exec_script_mysql for
+        each script.
+        """
+        conn = mysql.connector.connect(
+            host=host,
+            user=user,
+            password=password,
+            database=database,
+            autocommit=True
+        )
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Schema_Migration (
+                version VARCHAR(100) PRIMARY KEY,
+                applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT version FROM Schema_Migration")
+        aplicadas = {row[0] for row in cursor.fetchall()}
+
+        falhas = 0
+        for script in sorted(ConfigManager.MIGRATIONS_DIR.glob("*.sql")):
+            versao = script.stem
+            if versao in aplicadas:
+                continue
+            print(f"➡️  A aplicar migração {versao}")
+            falhas = ConfigManager.exec_script_mysql(str(script), host, user, password, database,
+                                                     progress=progress)
+            if falhas:
+                # Parar: as migrações seguintes podem depender desta
+                print(f"❌ Migração {versao} falhou ({falhas} erros); as seguintes não foram aplicadas")
+                break
+            cursor.execute("INSERT INTO Schema_Migration (version) VALUES (%s)", (versao,))
+
+        cursor.close()
+        conn.close()
+        return falhas
 
     def get_or_create_key(self):
         """Get existing key or create a new one"""
@@ -140,6 +289,11 @@ class ConfigManager:
         except:
             return None, None
     
+    def get_setting(self, section, option, fallback=None):
+        """Read a plain (unencrypted) setting, e.g. [Database] pool_size"""
+        self.config.read(self.config_file)
+        return self.config.get(section, option, fallback=fallback)
+    
     def encrypt(self, text):
         """Encrypt text data"""
         return self.fernet.encrypt(text.encode()).decode()
@@ -153,9 +307,532 @@ class ConfigManager:
         if os.path.exists(self.config_file):
             os.remove(self.config_file)
 
-   
-  #2025############################################
+class _ChecksumFile:
+    """Write-only file that counts and SHA-256 hashes the bytes that reach the disk"""
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class CompressedOutput:
+    """Streams bytes through zstd or gzip into a file, tracking sizes and checksum"""
+    EXTENSIONS = {'zstd': '.zst', 'gzip': '.gz'}
+
+    def __init__(self, path, compression):
+        self.path = Path(path)
+        self.disk = _ChecksumFile(path)
+        if compression == 'zstd':
+            self.stream = zstandard.ZstdCompressor(level=3).stream_writer(self.disk, closefd=False)
+        else:
+            self.stream = gzip.GzipFile(filename='', mode='wb', fileobj=self.disk, compresslevel=6)
+        self.raw_bytes = 0
+
+    def write(self, data):
+        self.raw_bytes += len(data)
+        self.stream.write(data)
+
+    def close(self):
+        """Finish the file and return its manifest entry"""
+        self.stream.close()
+        self.disk.close()
+        return {
+            'file': self.path.name,
+            'raw_bytes': self.raw_bytes,
+            'compressed_bytes': self.disk.size,
+            'sha256': self.disk.sha256.hexdigest(),
+        }
+
+
+def open_compressed(path):
+    """Open a .zst or .gz backup file for reading as a stream of bytes"""
+    path = Path(path)
+    if path.suffix == '.zst':
+        if zstandard is None:
+            raise OSError(f"{path.name}: é preciso o pacote zstandard para ler este backup")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return gzip.open(path, 'rb')
+
+
+class BackupManager:
+    """Compressed, parallel backups taken from one consistent snapshot.
+
+    The schema (tables, procedures) is dumped with mysqldump --no-data. Table data
+    is read by `workers` connections that all start their transaction while the
+    database is briefly locked with FLUSH TABLES WITH READ LOCK, so every table
+    comes from the same point in time. Each table goes to its own compressed file
+    and manifest.json records sizes, row counts, checksums and binlog coordinates.
+
+    run_incremental() archives only the binlog written since the previous backup
+    of the chain, and restore() replays a full backup plus its increments up to a
+    chosen point in time.
+    """
+    ROWS_PER_INSERT = 1000
+
+    def __init__(self, host, user, password, database='buypy', compression='zstd', workers=4,
+                 backup_root=None):
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        if compression == 'zstd' and zstandard is None:
+            print("⚠️  Pacote zstandard não instalado; a usar gzip")
+            compression = 'gzip'
+        self.compression = compression
+        self.workers = max(1, workers)
+        self.backup_root = Path(backup_root) if backup_root else Path.cwd() / "backups"
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        # use_pure: o conversor Python é usado para escrever os valores como literais SQL
+        return mysql.connector.connect(host=self.host, user=self.user, password=self.password,
+                                       database=self.database, use_pure=True)
+
+    def run(self, progress=None):
+        """Take the backup; progress(dict) is called after each table"""
+        inicio = time.perf_counter()
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        pasta = self.backup_root / f"buypy_backup_{timestamp}"
+        pasta.mkdir(parents=True)
+        ext = ".sql" + CompressedOutput.EXTENSIONS[self.compression]
+
+        ficheiros = [self._dump_schema(pasta / f"schema{ext}")]
+        tabelas = self._tables()
+        ligacoes, consistente, binlog = self._open_snapshots(min(self.workers, max(1, len(tabelas))))
+        livres = queue.Queue()
+        for conn in ligacoes:
+            livres.put(conn)
+
+        estado = {'tables_done': 0, 'tables_total': len(tabelas), 'rows': 0}
+
+        def copiar(tabela):
+            conn = livres.get()
+            try:
+                info = self._dump_table(conn, tabela, pasta / f"{tabela}{ext}")
+            finally:
+                livres.put(conn)
+            with self._lock:
+                estado['tables_done'] += 1
+                estado['rows'] += info['rows']
+                if progress:
+                    progress(dict(estado, table=tabela))
+            return info
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(ligacoes)) as executor:
+                ficheiros += list(executor.map(copiar, tabelas))
+        finally:
+            for conn in ligacoes:
+                conn.close()
+
+        manifest = {
+            'format': 1,
+            'type': 'full',
+            'database': self.database,
+            'created': timestamp,
+            'compression': self.compression,
+            'consistent': consistente,
+            'binlog': binlog,
+            'seconds': round(time.perf_counter() - inicio, 3),
+            'files': ficheiros,
+        }
+        # O manifest é escrito no fim: a sua presença indica um backup completo
+        with open(pasta / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return pasta
+
+    def run_incremental(self, progress=None):
+        """Archive the binlog events since the last backup; returns the new folder or None.
+
+        The binlog files are copied raw with mysqlbinlog --read-from-remote-server and
+        compressed; manifest.json stores the [start, end) coordinates to replay.
+        """
+        inicio = time.perf_counter()
+        full, incrementos = self.latest_chain()
+        if full is None:
+            raise OSError("Não há nenhum backup completo: faça primeiro um backup completo")
+        anterior = incrementos[-1] if incrementos else full
+        desde = self.read_manifest(anterior)['binlog']
+        if not desde:
+            raise OSError(f"{anterior.name} não tem posição do binlog (log_bin desligado?)")
+
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            ate = self.binlog_position(cursor)
+            cursor.execute("SHOW BINARY LOGS")
+            logs = [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+        if desde['file'] not in logs:
+            raise OSError(f"O binlog {desde['file']} já foi apagado do servidor: faça um backup completo")
+        if ate == desde:
+            print("✅ Sem alterações desde o último backup")
+            return None
+        ficheiros_binlog = logs[logs.index(desde['file']):logs.index(ate['file']) + 1]
+
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        pasta = self.backup_root / f"buypy_incr_{timestamp}"
+        pasta.mkdir(parents=True)
+        ficheiros = []
+        with tempfile.TemporaryDirectory() as tmp:
+            subprocess.run(
+                ["mysqlbinlog", "--read-from-remote-server", "--raw",
+                 "-h", self.host, "-u", self.user, "-p" + self.password,
+                 f"--result-file={tmp}/", *ficheiros_binlog],
+                check=True
+            )
+            ext = CompressedOutput.EXTENSIONS[self.compression]
+            for n, nome in enumerate(ficheiros_binlog, 1):
+                out = CompressedOutput(pasta / f"{nome}{ext}", self.compression)
+                with open(Path(tmp) / nome, 'rb') as f:
+                    for bloco in iter(lambda: f.read(1 << 20), b''):
+                        out.write(bloco)
+                info = out.close()
+                info['binlog'] = nome
+                ficheiros.append(info)
+                if progress:
+                    progress({'tables_done': n, 'tables_total': len(ficheiros_binlog),
+                              'rows': 0, 'table': nome})
+
+        manifest = {
+            'format': 1,
+            'type': 'incremental',
+            'database': self.database,
+            'created': timestamp,
+            'compression': self.compression,
+            'base': full.name,
+            'previous': anterior.name,
+            'binlog_start': desde,
+            'binlog': ate,
+            'seconds': round(time.perf_counter() - inicio, 3),
+            'files': ficheiros,
+        }
+        with open(pasta / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return pasta
+
+    @staticmethod
+    def read_manifest(pasta):
+        with open(Path(pasta) / "manifest.json", encoding='utf-8') as f:
+            return json.load(f)
+
+    def latest_chain(self, full=None):
+        """(full backup folder, [its increments oldest first]) — the newest full by default"""
+        backups = []
+        for manifesto in self.backup_root.glob("*/manifest.json"):
+            backups.append((self.read_manifest(manifesto.parent), manifesto.parent))
+        backups.sort(key=lambda b: b[0]['created'])
+        completos = [pasta for m, pasta in backups if m.get('type', 'full') == 'full']
+        if full is None:
+            if not completos:
+                return None, []
+            full = completos[-1]
+        full = Path(full)
+        return full, [pasta for m, pasta in backups
+                      if m.get('type') == 'incremental' and m['base'] == full.name]
+
+    def _mysql(self, *args):
+        """Start the mysql client reading SQL from stdin"""
+        return subprocess.Popen(
+            ["mysql", "-h", self.host, "-u", self.user, "-p" + self.password, *args],
+            stdin=subprocess.PIPE
+        )
+
+    def _pipe(self, proc, *fontes):
+        """Feed byte strings / readable streams to a mysql client and wait for it"""
+        for fonte in fontes:
+            if isinstance(fonte, bytes):
+                proc.stdin.write(fonte)
+                continue
+            with fonte:
+                for bloco in iter(lambda: fonte.read(1 << 20), b''):
+                    proc.stdin.write(bloco)
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, "mysql")
+
+    def restore(self, full=None, until=None, progress=None):
+        """Restore a full backup and replay its increments, stopping at `until` (datetime).
+
+        Without `full` the newest full backup is used; without `until` every increment
+        is replayed. The database is created if it does not exist. Tables are loaded
+        in parallel (see _load_tables) and their row counts checked against the manifest.
+        """
+        full, incrementos = self.latest_chain(full)
+        if full is None:
+            raise OSError("Não há backups para restaurar")
+        manifest = self.read_manifest(full)
+        if until is not None and until < datetime.strptime(manifest['created'], "%Y-%m-%d_%H-%M-%S"):
+            raise ValueError(f"{full.name} é posterior a {until}: escolha um backup completo mais antigo")
+
+        self._pipe(self._mysql(), f"CREATE DATABASE IF NOT EXISTS `{self.database}`;\n".encode())
+        tabelas = [f for f in manifest['files'] if f['table']]
+        esquema = next(f for f in manifest['files'] if not f['table'])
+        self.verify_files(full, manifest)
+        self._pipe(self._mysql(self.database), open_compressed(full / esquema['file']))
+        self._load_tables(full, tabelas, progress)
+
+        for pasta in incrementos:
+            incremento = self.read_manifest(pasta)
+            if until is not None and \
+                    datetime.strptime(self.read_manifest(full.parent / incremento['previous'])['created'],
+                                      "%Y-%m-%d_%H-%M-%S") > until:
+                break  # eventos todos posteriores ao ponto pedido
+            self._replay_binlog(pasta, incremento, until)
+        return full
+
+    @staticmethod
+    def verify_files(pasta, manifest):
+        """Check every file of a backup against the size and SHA-256 in its manifest"""
+        for info in manifest['files']:
+            caminho = Path(pasta) / info['file']
+            sha256 = hashlib.sha256()
+            with open(caminho, 'rb') as f:
+                for bloco in iter(lambda: f.read(1 << 20), b''):
+                    sha256.update(bloco)
+            if caminho.stat().st_size != info['compressed_bytes'] or sha256.hexdigest() != info['sha256']:
+                raise OSError(f"{caminho.name} está corrompido (não corresponde ao manifest.json)")
+
+    def _load_tables(self, pasta, tabelas, progress=None):
+        """Load the table files over `workers` mysql clients at once.
+
+        Secondary indexes are dropped first and rebuilt afterwards with one ALTER
+        TABLE per table (a sorted build is much faster than row-by-row inserts);
+        FK and unique checks are off in the loading sessions. Largest tables start
+        first, as in the manifest.
+        """
+        indices = self._drop_secondary_indexes([info['table'] for info in tabelas])
+        estado = {'tables_done': 0, 'tables_total': len(tabelas), 'rows': 0}
+
+        def carregar(info):
+            self._pipe(self._mysql(self.database),
+                       b"SET FOREIGN_KEY_CHECKS=0; SET UNIQUE_CHECKS=0;\n",
+                       open_compressed(pasta / info['file']))
+            with self._lock:
+                estado['tables_done'] += 1
+                estado['rows'] += info['rows']
+                if progress:
+                    progress(dict(estado, table=info['table']))
+
+        def reindexar(item):
+            tabela, definicoes = item
+            conn = self._connect()
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SET FOREIGN_KEY_CHECKS=0")
+                cursor.execute(f"ALTER TABLE `{tabela}` " + ", ".join(f"ADD {d}" for d in definicoes))
+            finally:
+                cursor.close()
+                conn.close()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            try:
+                list(executor.map(carregar, tabelas))
+            finally:
+                # Mesmo que uma tabela falhe os índices são repostos
+                list(executor.map(reindexar, indices.items()))
+        self._verify_counts(tabelas)
+
+    def _drop_secondary_indexes(self, tabelas):
+        """Drop the secondary indexes of the given tables; returns {table: [index definitions]}.
+
+        Indexes that back a foreign key are kept: InnoDB refuses to drop them.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT table_name, column_name FROM information_schema.key_column_usage
+                WHERE table_schema = DATABASE() AND referenced_table_name IS NOT NULL
+            """)
+            colunas_fk = {(tabela, f"`{coluna}`") for tabela, coluna in cursor.fetchall()}
+            cursor.execute("""
+                SELECT table_name, index_name, non_unique, index_type, column_name, sub_part
+                FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND index_name <> 'PRIMARY'
+                ORDER BY table_name, index_name, seq_in_index
+            """)
+            colunas = OrderedDict()
+            for tabela, indice, non_unique, tipo, coluna, sub_part in cursor.fetchall():
+                if tabela not in tabelas:
+                    continue
+                chave = (tabela, indice)
+                colunas.setdefault(chave, {'unique': not int(non_unique), 'type': tipo, 'columns': []})
+                # coluna NULL = índice funcional; não o sabemos recriar, fica como está
+                colunas[chave]['columns'].append(
+                    None if coluna is None else f"`{coluna}`" + (f"({sub_part})" if sub_part else ""))
+            indices = {}
+            for (tabela, indice), info in colunas.items():
+                if None in info['columns'] or (tabela, info['columns'][0]) in colunas_fk:
+                    continue
+                if info['type'] in ('FULLTEXT', 'SPATIAL'):
+                    prefixo = f"{info['type']} INDEX"
+                else:
+                    prefixo = "UNIQUE INDEX" if info['unique'] else "INDEX"
+                indices.setdefault(tabela, []).append(f"{prefixo} `{indice}` ({', '.join(info['columns'])})")
+                cursor.execute(f"ALTER TABLE `{tabela}` DROP INDEX `{indice}`")
+        finally:
+            cursor.close()
+            conn.close()
+        return indices
+
+    def _verify_counts(self, tabelas):
+        """Compare the restored row counts with the manifest; raise on any difference"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        diferencas = []
+        try:
+            for info in tabelas:
+                cursor.execute(f"SELECT COUNT(*) FROM `{info['table']}`")
+                linhas = cursor.fetchone()[0]
+                if linhas != info['rows']:
+                    diferencas.append(f"{info['table']}: {linhas} linhas, esperadas {info['rows']}")
+        finally:
+            cursor.close()
+            conn.close()
+        if diferencas:
+            raise OSError("Restauro incompleto: " + "; ".join(diferencas))
+
+    def _replay_binlog(self, pasta, incremento, until):
+        """Pipe mysqlbinlog over one increment's [start, end) range into mysql"""
+        with tempfile.TemporaryDirectory() as tmp:
+            nomes = []
+            for info in incremento['files']:
+                destino = Path(tmp) / info['binlog']
+                with open_compressed(pasta / info['file']) as origem, open(destino, 'wb') as f:
+                    for bloco in iter(lambda: origem.read(1 << 20), b''):
+                        f.write(bloco)
+                nomes.append(str(destino))
+            comando = ["mysqlbinlog", "--skip-gtids",
+                       f"--start-position={incremento['binlog_start']['position']}",
+                       f"--stop-position={incremento['binlog']['position']}"]
+            if until is not None:
+                comando.append(f"--stop-datetime={until:%Y-%m-%d %H:%M:%S}")
+            binlog = subprocess.Popen(comando + nomes, stdout=subprocess.PIPE)
+            self._pipe(self._mysql(self.database), binlog.stdout)
+            if binlog.wait() != 0:
+                raise subprocess.CalledProcessError(binlog.returncode, "mysqlbinlog")
+
+    def _dump_schema(self, caminho):
+        """Stream mysqldump --no-data (tables, routines, triggers) into a compressed file"""
+        out = CompressedOutput(caminho, self.compression)
+        proc = subprocess.Popen(
+            ["mysqldump", "-h", self.host, "-u", self.user, "-p" + self.password,
+             "--no-data", "--routines", "--triggers", "--events", "--single-transaction",
+             self.database],
+            stdout=subprocess.PIPE
+        )
+        for bloco in iter(lambda: proc.stdout.read(1 << 20), b''):
+            out.write(bloco)
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, "mysqldump")
+        info = out.close()
+        info['table'] = None
+        return info
+
+    def _tables(self):
+        """Base tables, largest first so the parallel workers finish together"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_type = 'BASE TABLE'
+            ORDER BY data_length DESC
+        """)
+        tabelas = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        conn.close()
+        return tabelas
+
+    def _open_snapshots(self, n):
+        """Open n connections sharing one snapshot; returns (connections, consistent, binlog)"""
+        controlo = self._connect()
+        cursor = controlo.cursor()
+        consistente = True
+        try:
+            cursor.execute("FLUSH TABLES WITH READ LOCK")
+        except mysql.connector.Error as err:
+            print(f"⚠️  Sem FLUSH TABLES WITH READ LOCK ({err.msg}); snapshots podem diferir entre tabelas")
+            consistente = False
+
+        ligacoes = []
+        try:
+            for _ in range(n):
+                conn = self._connect()
+                c = conn.cursor()
+                c.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                c.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                c.close()
+                ligacoes.append(conn)
+            binlog = self.binlog_position(cursor)
+        finally:
+            if consistente:
+                cursor.execute("UNLOCK TABLES")
+            cursor.close()
+            controlo.close()
+        return ligacoes, consistente, binlog
+
+    @staticmethod
+    def binlog_position(cursor):
+        """Current binlog file/position, or None when binary logging is off"""
+        for comando in ("SHOW BINARY LOG STATUS", "SHOW MASTER STATUS"):  # MySQL 8.4+ / anteriores
+            try:
+                cursor.execute(comando)
+                row = cursor.fetchone()
+                cursor.fetchall()
+                return {'file': row[0], 'position': row[1]} if row else None
+            except mysql.connector.Error:
+                continue
+        return None
+
+    def _dump_table(self, conn, tabela, caminho):
+        """Write a table as multi-row INSERTs, streaming rows with an unbuffered cursor"""
+        out = CompressedOutput(caminho, self.compression)
+        conv = conn.converter
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM `{tabela}`")
+        colunas = ", ".join(f"`{c}`" for c in cursor.column_names)
+        cabecalho = f"INSERT INTO `{tabela}` ({colunas}) VALUES\n".encode()
+        linhas = 0
+        while True:
+            lote = cursor.fetchmany(self.ROWS_PER_INSERT)
+            if not lote:
+                break
+            valores = b",\n".join(
+                b"(" + b", ".join(self._literal(conv, v) for v in row) + b")" for row in lote
+            )
+            out.write(cabecalho + valores + b";\n")
+            linhas += len(lote)
+        cursor.close()
+        info = out.close()
+        info.update(table=tabela, rows=linhas)
+        return info
+
+    @staticmethod
+    def _literal(conv, valor):
+        if valor is None:
+            return b"NULL"
+        return bytes(conv.quote(conv.escape(conv.to_mysql(valor))))
+
+
+#2025############################################
 class MySQLForm(QDialog):
+    # (bytes lidos, tamanho do ficheiro, comandos executados); object porque passa de 2 GB
+    progress = Signal(object, object, object)
+
     def __init__(self):
         super().__init__()
 
@@ -172,6 +849,7 @@ class MySQLForm(QDialog):
         # Botões
         self.open_sql_btn = QPushButton("Abrir scripts de SQL")
         self.init_db_btn = QPushButton("Iniciar base dados")
+        self.migrate_btn = QPushButton("Aplicar migrações")
 
         # Layouts
         form_layout = QFormLayout()
@@ -184,12 +862,23 @@ class MySQLForm(QDialog):
         main_layout.addLayout(form_layout)
         main_layout.addWidget(self.open_sql_btn)
         main_layout.addWidget(self.init_db_btn)
+        main_layout.addWidget(self.migrate_btn)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        main_layout.addWidget(self.progress_bar)
+        self.status_label = QLabel("")
+        main_layout.addWidget(self.status_label)
 
         self.setLayout(main_layout)
 
         # Ligações
         self.open_sql_btn.clicked.connect(self.select_sql_file)
         self.init_db_btn.clicked.connect(self.start_database)
+        self.migrate_btn.clicked.connect(self.apply_migrations)
+        self.progress.connect(self.show_progress)
+
+        # O script corre numa thread; os botões ficam inativos até terminar
+        self.queries = QueryRunner(None, self, [self.open_sql_btn, self.init_db_btn, self.migrate_btn])
 
         # Abrir o explorador assim que a janela abre
         self.select_sql_file()
@@ -218,15 +907,576 @@ class MySQLForm(QDialog):
         print(f"Password: {password}")
         print(f"Base de Dados: {database}")
         print(f"Script SQL: {script_path}")
-        ConfigManager.exec_script_mysql(script_path, ip, admin, password, database)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("A executar o script...")
+        self.queries.submit(
+            partial(ConfigManager.exec_script_mysql, script_path, ip, admin, password, database,
+                    progress=self.progress.emit),
+            on_result=self.script_done
+        )
+
+    def show_progress(self, lidos, tamanho, executados):
+        self.progress_bar.setValue(int(lidos * 100 / max(tamanho, 1)))
+        self.status_label.setText(f"{executados} comandos executados")
+
+    def script_done(self, falhas):
+        if falhas is None:
+            self.status_label.setText("Ficheiro não encontrado")
+        elif falhas:
+            self.status_label.setText(f"Script terminado com {falhas} erros (ver consola)")
+        else:
+            self.progress_bar.setValue(100)
+            self.status_label.setText("Script executado com sucesso")
+
+    def apply_migrations(self):
+        """Apply pending schema migrations (indexes, procedures) to the database"""
+        self.progress_bar.setValue(0)
+        self.status_label.setText("A aplicar migrações...")
+        self.queries.submit(
+            partial(ConfigManager.apply_migrations, self.ip_input.text(), self.admin_input.text(),
+                    self.pass_input.text(), self.db_input.text(), progress=self.progress.emit),
+            on_result=self.migrations_done
+        )
+
+    def migrations_done(self, falhas):
+        if falhas:
+            self.status_label.setText(f"Migração falhou com {falhas} erros (ver consola)")
+        else:
+            self.progress_bar.setValue(100)
+            self.status_label.setText("Migrações aplicadas com sucesso")
+
+class CustomerCache:
+    """Thread-safe LRU cache of Customer rows with a time-to-live, indexed by id and email"""
+    def __init__(self, max_size=1000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # customer_id -> (expira_em, linha)
+        self._emails = {}  # email (minúsculas) -> customer_id
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_by_id(self, customer_id):
+        with self._lock:
+            return self._get(customer_id)
+
+    def get_by_email(self, email):
+        with self._lock:
+            return self._get(self._emails.get(email.lower()))
+
+    def put(self, customer):
+        """Store (a copy of) a customer row"""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._discard(customer['customer_id'])
+            self._entries[customer['customer_id']] = (time.monotonic() + self.ttl, dict(customer))
+            self._emails[customer['email'].lower()] = customer['customer_id']
+            while len(self._entries) > self.max_size:
+                self._discard(next(iter(self._entries)))
+
+    def update(self, customer_id, **changes):
+        """Apply a write to a cached row, if present"""
+        with self._lock:
+            entry = self._entries.get(customer_id)
+            if entry:
+                entry[1].update(changes)
+
+    def invalidate(self, customer_id=None):
+        """Drop one customer, or everything when customer_id is None"""
+        with self._lock:
+            if customer_id is None:
+                self._entries.clear()
+                self._emails.clear()
+            else:
+                self._discard(customer_id)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def _get(self, customer_id):
+        entry = self._entries.get(customer_id) if customer_id is not None else None
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                self._discard(customer_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(customer_id)
+        self.hits += 1
+        return dict(entry[1])
+
+    def _discard(self, customer_id):
+        entry = self._entries.pop(customer_id, None)
+        if entry:
+            self._emails.pop(entry[1]['email'].lower(), None)
+
+
+class CustomerIndex:
+    """In-memory prefix index of Customer for as-you-type search.
+
+    Every customer contributes a few normalized keys (email, "first last",
+    "last first", phone digits) to one sorted list of "key<NUL>id" strings; a
+    prefix search is a bisect plus a short scan. The index is loaded in the
+    background in pages of PAGE_SIZE customers, picks up new customers every
+    refresh_interval seconds (customer_id above the last one loaded) and is
+    rebuilt from scratch every reload_interval seconds to catch edits made
+    elsewhere. Status changes made through DatabaseManager are applied at once.
+    """
+    PAGE_SIZE = 50000
+    COLUMNS = "customer_id, first_name, last_name, email, city, status, phone_number"
+
+    def __init__(self, refresh_interval=30, reload_interval=600):
+        self.refresh_interval = refresh_interval
+        self.reload_interval = reload_interval
+        self._keys = []
+        self._rows = {}  # customer_id -> (first_name, last_name, email, city, status, phone)
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = False
+
+    @staticmethod
+    def normalize(text):
+        return " ".join(str(text or "").casefold().split())
+
+    @classmethod
+    def keys_for(cls, customer_id, first_name, last_name, email, phone):
+        chaves = {cls.normalize(email), cls.normalize(f"{first_name} {last_name}"),
+                  cls.normalize(f"{last_name} {first_name}")}
+        digitos = re.sub(r"\D", "", phone or "")
+        if digitos:
+            chaves.add(digitos)
+            chaves.add(digitos[-9:])  # sem indicativo do país
+        return [f"{chave}\0{customer_id}" for chave in chaves if chave]
+
+    def start(self, db):
+        """Load the index in a background thread and keep it fresh until stop()"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(db,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+    def _run(self, db):
+        proxima_recarga = 0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= proxima_recarga:
+                    self._load(db, rebuild=True)
+                    proxima_recarga = time.monotonic() + self.reload_interval
+                else:
+                    self._load(db)
+            except mysql.connector.Error as err:
+                print(f"Índice de clientes: {err}")
+            self._stop.wait(self.refresh_interval)
+
+    def _load(self, db, rebuild=False):
+        """Read customers after the last loaded id (all of them when rebuilding)"""
+        ultimo = 0 if rebuild else self._last_id
+        chaves, linhas = [], {}
+        while not self._stop.is_set():
+            pagina = db.fetch_all(f"""
+                SELECT {self.COLUMNS} FROM Customer
+                WHERE customer_id > %s ORDER BY customer_id LIMIT %s
+            """, (ultimo, self.PAGE_SIZE))
+            for c in pagina:
+                linhas[c['customer_id']] = (c['first_name'], c['last_name'], c['email'],
+                                            c['city'], c['status'], c['phone_number'])
+                chaves += self.keys_for(c['customer_id'], c['first_name'], c['last_name'],
+                                        c['email'], c['phone_number'])
+            if pagina:
+                ultimo = pagina[-1]['customer_id']
+            if len(pagina) < self.PAGE_SIZE:
+                break
+        if rebuild:
+            chaves.sort()
+        elif not chaves:
+            return
+        else:
+            # O timsort junta as duas partes já ordenadas em tempo quase linear
+            chaves = sorted(self._keys + chaves)
+        with self._lock:
+            if rebuild:
+                self._rows = linhas
+            else:
+                self._rows.update(linhas)
+            self._keys = chaves
+            self._last_id = max(self._last_id if not rebuild else 0, ultimo)
+            self.ready = True
+
+    def search(self, text, limit=10):
+        """Customers with a key starting with text (id, email, name or phone), as dicts"""
+        prefixo = self.normalize(text)
+        if not prefixo:
+            return []
+        with self._lock:
+            ids = []
+            if prefixo.isdigit() and int(prefixo) in self._rows:
+                ids.append(int(prefixo))
+            i = bisect.bisect_left(self._keys, prefixo)
+            while i < len(self._keys) and len(ids) < limit and self._keys[i].startswith(prefixo):
+                customer_id = int(self._keys[i].rsplit("\0", 1)[1])
+                if customer_id not in ids:
+                    ids.append(customer_id)
+                i += 1
+            linhas = [(customer_id, self._rows[customer_id]) for customer_id in ids]
+        return [{'customer_id': customer_id, 'first_name': r[0], 'last_name': r[1], 'email': r[2],
+                 'city': r[3], 'status': r[4], 'phone_number': r[5]} for customer_id, r in linhas]
+
+    def update(self, customer_id, **changes):
+        """Apply a change made through the application (only non-key columns)"""
+        with self._lock:
+            linha = self._rows.get(customer_id)
+            if linha is not None and 'status' in changes:
+                self._rows[customer_id] = linha[:4] + (changes['status'],) + linha[5:]
+
+
+class QueryStats:
+    """Per-query-fingerprint counters: latency histogram, rows, bytes and errors.
+
+    A fingerprint is the statement with literals and placeholders replaced by "?"
+    and whitespace collapsed, so every execution of the same query lands in the
+    same entry whatever its parameters. Statements slower than slow_query_ms are
+    appended to slow_log with their parameters redacted to type and length. With
+    dump_path set the counters are also written there every dump_interval
+    seconds (".prom"/".txt" -> Prometheus text format, anything else -> JSON).
+    """
+    # Limites superiores dos baldes do histograma, em milissegundos
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+    _STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+    _NUMBERS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+    _PLACEHOLDERS = re.compile(r"%(?:\(\w+\))?s")
+    _LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+    _ROWS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+
+    def __init__(self, slow_query_ms=500, slow_log='slow_queries.log',
+                 dump_path=None, dump_interval=60):
+        self.slow_query_ms = slow_query_ms
+        self.slow_log = slow_log
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._fingerprints = {}  # cache sql -> fingerprint
+        self._next_dump = time.monotonic() + dump_interval
+        self.started = datetime.now()
+
+    def fingerprint(self, sql):
+        """Normalize a statement so executions with different literals share an entry"""
+        if isinstance(sql, (bytes, bytearray)):
+            sql = sql.decode('utf-8', 'replace')
+        fp = self._fingerprints.get(sql)
+        if fp is None:
+            fp = self._STRINGS.sub("?", sql)
+            fp = self._PLACEHOLDERS.sub("?", fp)
+            fp = self._NUMBERS.sub("?", fp)
+            fp = " ".join(fp.split())
+            fp = self._LISTS.sub("(?+)", fp)       # IN (?, ?, ?) -> IN (?+)
+            fp = self._ROWS.sub("(?+), ...", fp)   # VALUES (...), (...) -> VALUES (?+), ...
+            if len(self._fingerprints) < 10000:
+                self._fingerprints[sql] = fp
+        return fp
+
+    @staticmethod
+    def redact(params):
+        """Replace parameter values with their type (and length), e.g. ['<int>', '<str:12>']"""
+        def tipo(valor):
+            if valor is None:
+                return "<NULL>"
+            if isinstance(valor, (str, bytes, bytearray)):
+                return f"<{type(valor).__name__}:{len(valor)}>"
+            return f"<{type(valor).__name__}>"
+        if params is None:
+            return []
+        if isinstance(params, dict):
+            return {k: tipo(v) for k, v in params.items()}
+        if isinstance(params, (list, tuple)):
+            return [tipo(v) for v in params]
+        return tipo(params)
+
+    def record(self, fingerprint, elapsed_ms, rows=0, nbytes=0, error=None, params=None):
+        """Account for one execution (called by InstrumentedCursor)"""
+        balde = bisect.bisect_left(self.BUCKETS_MS, elapsed_ms)
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                entry = self._entries[fingerprint] = {
+                    'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'rows': 0, 'bytes': 0, 'buckets': [0] * (len(self.BUCKETS_MS) + 1),
+                    'last_error': None,
+                }
+            entry['calls'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['rows'] += rows
+            entry['bytes'] += nbytes
+            entry['buckets'][balde] += 1
+            if error is not None:
+                entry['errors'] += 1
+                entry['last_error'] = str(error)
+            dump = self.dump_path and time.monotonic() >= self._next_dump
+            if dump:
+                self._next_dump = time.monotonic() + self.dump_interval
+        if elapsed_ms >= self.slow_query_ms:
+            self._log_slow(fingerprint, elapsed_ms, rows, nbytes, error, params)
+        if dump:
+            try:
+                self.dump(self.dump_path)
+            except OSError as err:
+                print(f"⚠️ Não foi possível escrever {self.dump_path}: {err}")
+
+    def _log_slow(self, fingerprint, elapsed_ms, rows, nbytes, error, params):
+        campos = [datetime.now().isoformat(timespec='seconds'), f"{elapsed_ms:.1f} ms",
+                  f"rows={rows}", f"bytes={nbytes}", f"params={self.redact(params)}"]
+        if error is not None:
+            campos.append(f"error={error}")
+        linha = "\t".join(campos + [fingerprint]) + "\n"
+        try:
+            with self._lock, open(self.slow_log, 'a', encoding='utf-8') as f:
+                f.write(linha)
+        except OSError as err:
+            print(f"⚠️ Query lenta ({elapsed_ms:.0f} ms), sem acesso a {self.slow_log}: {err}")
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+        self.started = datetime.now()
+
+    def percentile(self, entry, p):
+        """Approximate p-th percentile (ms) of an entry: upper bound of the bucket it falls in"""
+        alvo = entry['calls'] * p / 100
+        acumulado = 0
+        for limite, contagem in zip(self.BUCKETS_MS, entry['buckets']):
+            acumulado += contagem
+            if contagem and acumulado >= alvo:
+                return min(limite, entry['max_ms'])
+        return entry['max_ms']
+
+    def snapshot(self):
+        """List of dicts, one per fingerprint, slowest total time first"""
+        with self._lock:
+            entradas = [(fp, dict(e, buckets=list(e['buckets']))) for fp, e in self._entries.items()]
+        linhas = []
+        for fp, e in entradas:
+            e['fingerprint'] = fp
+            e['id'] = hashlib.sha1(fp.encode('utf-8')).hexdigest()[:12]
+            e['avg_ms'] = e['total_ms'] / e['calls'] if e['calls'] else 0.0
+            e['p50_ms'] = self.percentile(e, 50)
+            e['p95_ms'] = self.percentile(e, 95)
+            e['p99_ms'] = self.percentile(e, 99)
+            linhas.append(e)
+        linhas.sort(key=lambda e: e['total_ms'], reverse=True)
+        return linhas
+
+    def to_json(self):
+        return json.dumps({
+            'since': self.started.isoformat(timespec='seconds'),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'slow_query_ms': self.slow_query_ms,
+            'buckets_ms': list(self.BUCKETS_MS),
+            'queries': self.snapshot(),
+        }, indent=2)
+
+    def to_prometheus(self):
+        """Counters in the Prometheus text exposition format"""
+        def rotulos(e):
+            query = e['fingerprint'][:200].replace("\\", "\\\\").replace('"', '\\"')
+            return f'id="{e["id"]}",query="{query}"'
+
+        linhas = [
+            "# HELP buypy_query_duration_seconds Query latency by fingerprint",
+            "# TYPE buypy_query_duration_seconds histogram",
+        ]
+        entradas = self.snapshot()
+        for e in entradas:
+            acumulado = 0
+            for limite, contagem in zip(self.BUCKETS_MS, e['buckets']):
+                acumulado += contagem
+                linhas.append(f'buypy_query_duration_seconds_bucket{{{rotulos(e)},le="{limite / 1000:g}"}} {acumulado}')
+            linhas.append(f'buypy_query_duration_seconds_bucket{{{rotulos(e)},le="+Inf"}} {e["calls"]}')
+            linhas.append(f'buypy_query_duration_seconds_sum{{{rotulos(e)}}} {e["total_ms"] / 1000:.6f}')
+            linhas.append(f'buypy_query_duration_seconds_count{{{rotulos(e)}}} {e["calls"]}')
+        for nome, chave, ajuda in (("rows", 'rows', "Rows returned"),
+                                   ("bytes", 'bytes', "Approximate bytes fetched"),
+                                   ("errors", 'errors', "Failed executions")):
+            linhas.append(f"# HELP buypy_query_{nome}_total {ajuda} by fingerprint")
+            linhas.append(f"# TYPE buypy_query_{nome}_total counter")
+            linhas += [f"buypy_query_{nome}_total{{{rotulos(e)}}} {e[chave]}" for e in entradas]
+        return "\n".join(linhas) + "\n"
+
+    def dump(self, path):
+        """Write the counters to path (Prometheus text for .prom/.txt, JSON otherwise)"""
+        texto = self.to_prometheus() if str(path).endswith(('.prom', '.txt')) else self.to_json()
+        temporario = f"{path}.tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        os.replace(temporario, path)  # quem lê o ficheiro nunca o vê a meio
+        return path
+
+
+class InstrumentedCursor:
+    """Wraps a mysql.connector cursor and reports every statement to a QueryStats.
+
+    The time of a statement runs from execute() until the next execute() or
+    close(), so rows read later with fetch*() count too (and are summed into
+    rows/bytes). Everything not overridden is passed to the real cursor.
+    """
+    def __init__(self, cursor, stats, owner=None):
+        self._cursor = cursor
+        self._stats = stats
+        self._owner = owner  # resultados de stored_results() contam no CALL que os gerou
+        self._current = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _row_bytes(row):
+        valores = row.values() if isinstance(row, dict) else row
+        return sum(len(v) if isinstance(v, (str, bytes, bytearray)) else 8
+                   for v in valores if v is not None)
+
+    def _start(self, sql, params):
+        self._finish()
+        self._current = {'fingerprint': self._stats.fingerprint(sql), 'params': params,
+                         'elapsed': 0.0, 'rows': 0, 'bytes': 0}
+
+    def _finish(self, error=None):
+        atual, self._current = self._current, None
+        if atual is not None:
+            self._stats.record(atual['fingerprint'], atual['elapsed'] * 1000, atual['rows'],
+                               atual['bytes'], error, atual['params'])
+
+    def _timed(self, fn, *args, **kwargs):
+        destino = self._owner._current if self._owner is not None else self._current
+        inicio = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except mysql.connector.Error as err:
+            if destino is not None:
+                destino['elapsed'] += time.perf_counter() - inicio
+            (self._owner or self)._finish(err)
+            raise
+        finally:
+            if destino is not None and (self._owner or self)._current is destino:
+                destino['elapsed'] += time.perf_counter() - inicio
+
+    def _count(self, rows):
+        destino = self._owner._current if self._owner is not None else self._current
+        if destino is not None and rows:
+            destino['rows'] += len(rows)
+            destino['bytes'] += sum(self._row_bytes(r) for r in rows)
+        return rows
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._start(operation, params)
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)  # aceita geradores, como o cursor normal
+        self._start(operation, f"<{len(seq_params)} rows>")
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def callproc(self, procname, args=()):
+        self._start(f"CALL {procname}", args)
+        return self._timed(self._cursor.callproc, procname, args)
+
+    def stored_results(self):
+        for result in self._cursor.stored_results():
+            yield InstrumentedCursor(result, self._stats, owner=self)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None:
+            self._count([row])
+        return row
+
+    def fetchmany(self, size=1):
+        return self._count(self._timed(self._cursor.fetchmany, size))
+
+    def fetchall(self):
+        rows = self._count(self._timed(self._cursor.fetchall))
+        if self._owner is None:
+            self._finish()  # resultado lido até ao fim (cursores reutilizados nunca chegam a close)
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are InstrumentedCursors; the rest goes to the real one"""
+    def __init__(self, connection, stats):
+        self._connection = connection
+        self._stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs), self._stats)
+
 
 class DatabaseManager:
     """Handles database connections and operations"""
-    def __init__(self):
+    # Erros que indicam que o servidor fechou a ligação ("MySQL server has gone away")
+    RECONNECT_ERRORS = (errorcode.CR_SERVER_GONE_ERROR, errorcode.CR_SERVER_LOST)
+
+    def __init__(self, pool_size=0, pool_timeout=10, cache_size=1000, cache_ttl=60,
+                 customer_index=False, query_stats=None, prepared_cache_size=0):
         self.connection = None
+        # Statements preparados no servidor por ligação (connection_id -> OrderedDict sql -> cursor)
+        self.prepared_cache_size = prepared_cache_size
+        self._prepared_capacity = 0
+        self._statements = {}
+        # Contadores por query (ver QueryStats); None desliga a instrumentação
+        self.query_stats = query_stats
+        self.customer_cache = CustomerCache(cache_size, cache_ttl)
+        self.customer_index = CustomerIndex() if customer_index else None
+        self.pool = None
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self._lock = threading.RLock()
+        self._running = {}  # thread id -> connection_id da query em curso
+        self._stats = {
+            'borrows': 0,
+            'in_use': 0,
+            'peak_in_use': 0,
+            'wait_total': 0.0,
+            'wait_max': 0.0,
+            'health_check_failures': 0,
+            'reconnects': 0,
+            'prepared_hits': 0,
+            'prepared_misses': 0,
+            'prepared_evictions': 0,
+        }
     
     def connect(self, username, password, host='localhost', database='sys'):
-        """Connect to the database"""
+        """Connect to the database (pooled when pool_size > 0)"""
         try:
             if LoginDialog.database==0:
                 print("\nlogado\n")
@@ -235,12 +1485,32 @@ class DatabaseManager:
                 #exec_script_mysql("BUYPY.sql", "localhost", "adminis", "ZZtopes!23", "sys")
             else:
                 print("\nnao logado\n")   
-            self.connection = mysql.connector.connect(
-                host=host,
-                user=username,
-                password=password,
-                database=database
-            )
+            if self.pool_size > 0:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name="buypy",
+                    pool_size=min(self.pool_size, pooling.CNX_POOL_MAXSIZE),
+                    # O reset da sessão ao devolver a ligação apagava os statements preparados
+                    pool_reset_session=not self.prepared_cache_size,
+                    host=host,
+                    user=username,
+                    password=password,
+                    database=database
+                )
+            else:
+                self.connection = mysql.connector.connect(
+                    host=host,
+                    user=username,
+                    password=password,
+                    database=database
+                )
+                if self.customer_index is not None:
+                    # A ligação única serve uma query de cada vez (ver checkout)
+                    print("⚠️  customer_index sem pool: enquanto o índice carrega as outras "
+                          "queries ficam à espera (usar pool_size > 0)")
+            if self.prepared_cache_size > 0:
+                self._prepared_capacity = self._prepared_limit()
+            if self.customer_index is not None:
+                self.customer_index.start(self)
             return True
         except mysql.connector.Error as err:
             print(f"Database connection error: {err}")
@@ -248,136 +1518,1072 @@ class DatabaseManager:
     
     def disconnect(self):
         """Close database connection"""
+        if self.customer_index is not None:
+            self.customer_index.stop()
+        with self._lock:
+            self._statements.clear()  # o servidor liberta-os ao fechar a ligação
+        # Largar o pool: as ligações livres fecham quando ele é recolhido (a cache de
+        # statements acima era a única outra referência) e as emprestadas voltam a um
+        # pool que já ninguém usa
+        self.pool = None
         if self.connection and self.connection.is_connected():
             self.connection.close()
+
+    @contextmanager
+    def checkout(self):
+        """Borrow a connection for one unit of work and give it back afterwards.
+
+        Without a pool (pool_size=0) every caller queues for the single connection
+        for the whole unit of work, so queries from QueryRunner workers and the
+        customer_index loader run one at a time and kill_query has no effect.
+        """
+        if self.pool is None:
+            # Sem pool: a ligação única é partilhada, um utilizador de cada vez
+            with self._lock:
+                yield self._instrument(self.connection)
+            return
+
+        conn = self._borrow()
+        try:
+            yield self._instrument(conn)
+        finally:
+            if self.prepared_cache_size:
+                # Sem o reset da sessão (ver connect) a ligação voltaria ao pool com a
+                # transação e o snapshot REPEATABLE READ ainda abertos
+                try:
+                    conn.rollback()
+                except mysql.connector.Error:
+                    pass
+            with self._lock:
+                self._stats['in_use'] -= 1
+            conn.close()  # devolve ao pool
+
+    def _instrument(self, conn):
+        return conn if self.query_stats is None else InstrumentedConnection(conn, self.query_stats)
+
+    def _borrow(self):
+        """Get a healthy connection from the pool, waiting up to pool_timeout seconds"""
+        start = time.perf_counter()
+        while True:
+            try:
+                conn = self.pool.get_connection()
+                break
+            except mysql.connector.errors.PoolError:
+                if time.perf_counter() - start >= self.pool_timeout:
+                    raise
+                time.sleep(0.01)
+        waited = time.perf_counter() - start
+
+        # Verificar a ligação antes de a entregar
+        try:
+            conn.ping(reconnect=True, attempts=3, delay=1)
+        except mysql.connector.Error:
+            with self._lock:
+                self._stats['health_check_failures'] += 1
+            conn.close()
+            raise
+
+        with self._lock:
+            self._stats['borrows'] += 1
+            self._stats['in_use'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
+            self._stats['wait_total'] += waited
+            self._stats['wait_max'] = max(self._stats['wait_max'], waited)
+        return conn
+
+    def run(self, work):
+        """Run work(connection) on a borrowed connection, retrying once if the server went away"""
+        thread_id = threading.get_ident()
+        for attempt in (1, 2):
+            with self.checkout() as conn:
+                self._running[thread_id] = conn.connection_id
+                try:
+                    return work(conn)
+                except mysql.connector.Error as err:
+                    if attempt == 2 or err.errno not in self.RECONNECT_ERRORS:
+                        raise
+                    print(f"Ligação perdida ({err}), a religar...")
+                    with self._lock:
+                        # Os statements preparados morreram com a sessão antiga
+                        self._statements.pop(conn.connection_id, None)
+                    conn.reconnect(attempts=3, delay=1)
+                    with self._lock:
+                        self._stats['reconnects'] += 1
+                finally:
+                    self._running.pop(thread_id, None)
+
+    def kill_query(self, thread_id):
+        """Abort the statement a worker thread is running (pooled mode only)"""
+        connection_id = self._running.get(thread_id)
+        if self.pool is None or connection_id is None:
+            # Com uma só ligação não há outra por onde mandar o KILL
+            return False
+        self.execute("KILL QUERY %s", (connection_id,))
+        return True
+
+    def pool_stats(self):
+        """Return pool usage counters (wait times in milliseconds)"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pool_size'] = self.pool.pool_size if self.pool is not None else 0
+        stats['wait_avg_ms'] = stats['wait_total'] * 1000 / stats['borrows'] if stats['borrows'] else 0.0
+        stats['wait_total_ms'] = stats.pop('wait_total') * 1000
+        stats['wait_max_ms'] = stats.pop('wait_max') * 1000
+        return stats
+
+    def _prepared_limit(self):
+        """Statements each connection may keep: prepared_cache_size, capped so that all
+        our connections together use at most half of the server's max_prepared_stmt_count"""
+        try:
+            limite = self.fetch_one("SELECT @@GLOBAL.max_prepared_stmt_count AS n")['n']
+        except mysql.connector.Error as err:
+            print(f"⚠️ Sem cache de statements preparados: {err}")
+            return 0
+        ligacoes = self.pool.pool_size if self.pool is not None else 1
+        return max(0, min(self.prepared_cache_size, int(limite) // 2 // ligacoes))
+
+    def _prepared_cursor(self, conn, query):
+        """Cached cursor(prepared=True) for query on this connection, least recently used evicted"""
+        with self._lock:
+            cache = self._statements.setdefault(conn.connection_id, OrderedDict())
+        cursor = cache.get(query)
+        if cursor is not None:
+            cache.move_to_end(query)
+            with self._lock:
+                self._stats['prepared_hits'] += 1
+            return cursor
+        while len(cache) >= self._prepared_capacity:
+            _, antigo = cache.popitem(last=False)
+            self._close_prepared(antigo)
+            with self._lock:
+                self._stats['prepared_evictions'] += 1
+        cursor = conn.cursor(prepared=True)
+        cache[query] = cursor
+        with self._lock:
+            self._stats['prepared_misses'] += 1
+        return cursor
+
+    @staticmethod
+    def _close_prepared(cursor):
+        try:
+            cursor.close()  # COM_STMT_CLOSE: liberta o statement no servidor
+        except mysql.connector.Error:
+            pass
+
+    def _fetch_prepared(self, conn, query, params):
+        """Run a SELECT through a cached prepared statement (binary protocol); rows as dicts"""
+        cursor = self._prepared_cursor(conn, query)
+        try:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        except mysql.connector.Error as err:
+            cache = self._statements.get(conn.connection_id, {})
+            if cache.pop(query, None) is not None:
+                self._close_prepared(cursor)
+            if err.errno not in (errorcode.ER_MAX_PREPARED_STMT_COUNT_REACHED,
+                                 errorcode.ER_UNSUPPORTED_PS):
+                raise
+            # Sem lugar no servidor (ou statement não preparável): protocolo de texto
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        colunas = cursor.column_names
+        return [dict(zip(colunas, row)) for row in rows]
+
+    def fetch_one(self, query, params=(), prepared=False):
+        """Run a SELECT and return the first row as a dict.
+
+        prepared=True runs it as a cached server-side prepared statement (when the
+        cache is enabled); meant for hot lookups that return one row.
+        """
+        if prepared and self._prepared_capacity > 0:
+            rows = self.run(lambda conn: self._fetch_prepared(conn, query, params))
+            return rows[0] if rows else None
+
+        def work(conn):
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchone()
+            finally:
+                cursor.close()
+        return self.run(work)
+
+    def fetch_all(self, query, params=(), prepared=False):
+        """Run a SELECT and return all rows as dicts (prepared: see fetch_one)"""
+        if prepared and self._prepared_capacity > 0:
+            return self.run(lambda conn: self._fetch_prepared(conn, query, params))
+
+        def work(conn):
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        return self.run(work)
+
+    def execute(self, query, params=()):
+        """Run a write statement, commit it and return the affected row count"""
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, params)
+                conn.commit()
+                return cursor.rowcount
+            finally:
+                cursor.close()
+        return self.run(work)
+
+    def call_proc(self, name, args=()):
+        """Call a stored procedure, commit and return all its result rows as dicts"""
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.callproc(name, args)
+                rows = []
+                for result in cursor.stored_results():
+                    for row in result.fetchall():
+                        rows.append(row if isinstance(row, dict)
+                                    else dict(zip(result.column_names, row)))
+                conn.commit()
+                return rows
+            finally:
+                cursor.close()
+        return self.run(work)
     
     def search_user_by_id(self, user_id):
-        """Search for a user by ID"""
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT customer_id, first_name, last_name, email, address, postal_code, 
-                   city, country, phone_number, status
-            FROM Customer
-            WHERE customer_id = %s
-        """, (user_id,))
-        result = cursor.fetchone()
-        cursor.close()
-        return result
+        """Search for a user by ID (served from the customer cache when possible)"""
+        user = self.customer_cache.get_by_id(user_id)
+        if user is None:
+            user = self.fetch_one("""
+                SELECT customer_id, first_name, last_name, email, address, postal_code, 
+                       city, country, phone_number, status
+                FROM Customer
+                WHERE customer_id = %s
+            """, (user_id,), prepared=True)
+            if user:
+                self.customer_cache.put(user)
+        return user
     
     def search_user_by_username(self, username):
-        """Search for a user by username (email)"""
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT customer_id, first_name, last_name, email, address, postal_code, 
-                   city, country, phone_number, status
-            FROM Customer
-            WHERE email = %s
-        """, (username,))
-        result = cursor.fetchone()
-        cursor.close()
-        return result
+        """Search for a user by username (email), served from the customer cache when possible"""
+        user = self.customer_cache.get_by_email(username)
+        if user is None:
+            user = self.fetch_one("""
+                SELECT customer_id, first_name, last_name, email, address, postal_code, 
+                       city, country, phone_number, status
+                FROM Customer
+                WHERE email = %s
+            """, (username,), prepared=True)
+            if user:
+                self.customer_cache.put(user)
+        return user
     
     def update_user_status(self, user_id, new_status):
         """Update a user's status (active, inactive, blocked)"""
-        cursor = self.connection.cursor()
-        cursor.execute("""
+        updated = self.execute("""
             UPDATE Customer
             SET status = %s
             WHERE customer_id = %s
-        """, (new_status, user_id))
-        self.connection.commit()
-        cursor.close()
-        return cursor.rowcount > 0
+        """, (new_status, user_id)) > 0
+        if updated:
+            self.customer_cache.update(user_id, status=new_status)
+            if self.customer_index is not None:
+                self.customer_index.update(user_id, status=new_status)
+        else:
+            self.customer_cache.invalidate(user_id)
+        return updated
     
+    def suggest_customers(self, text, limit=10):
+        """As-you-type customer search by id, email, name or phone prefix.
+
+        Served from the in-memory CustomerIndex once it has loaded; until then (or
+        without it) the prefix indexes of Customer are queried (migration 007).
+        """
+        if self.customer_index is not None and self.customer_index.ready:
+            return self.customer_index.search(text, limit)
+        texto = text.strip()
+        if not texto:
+            return []
+        prefixo = re.sub(r"([\\%_])", r"\\\1", texto) + "%"
+        partes = [f"(SELECT {CustomerIndex.COLUMNS} FROM Customer WHERE {coluna} LIKE %s LIMIT %s)"
+                  for coluna in ('email', 'first_name', 'last_name', 'phone_number')]
+        params = [prefixo, limit] * len(partes)
+        if texto.isdigit():
+            partes.insert(0, f"(SELECT {CustomerIndex.COLUMNS} FROM Customer WHERE customer_id = %s)")
+            params.insert(0, int(texto))
+        return self.fetch_all(" UNION ".join(partes) + " LIMIT %s", params + [limit])
+
     def get_blocked_users(self):
         """Get a list of all blocked users"""
-        cursor = self.connection.cursor(dictionary=True)
-        cursor.execute("""
+        return self.fetch_all("""
             SELECT customer_id, first_name, last_name, email, city, postal_code, status
             FROM Customer
             WHERE status = 'blocked'
         """)
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+    
+    # Colunas por onde os produtos podem ser ordenados no servidor
+    PRODUCT_SORT_KEYS = {
+        'product_id': 'p.product_id',
+        'price': 'p.price',
+        'quantity': 'p.quantity',
+        'popularity': 'p.popularity',
+    }
+    # Colunas de ordenação que podem ser NULL (mostradas como 0; no índice vêm primeiro)
+    NULLABLE_SORT_KEYS = {'popularity'}
+
+    # Tabela de cada tipo de produto (Product.product_type) e a descrição mostrada
+    PRODUCT_SUBTYPES = {
+        'Book': ('Book b', 'b', 'b.title'),
+        'Electronics': ('Electronics e', 'e', "CONCAT(e.brand, ' ', e.model)"),
+    }
+
+    def _products_query(self, product_type=None, min_qty=None, max_qty=None, min_price=None, max_price=None,
+                        keyset=None, order_by=None, limit=None):
+        """Build the product listing query and params for the given filters.
+
+        Each type filters on the indexed Product.product_type and joins only its own
+        subtype table; with no type (or an unknown one) it is a UNION ALL of both.
+        keyset is an extra (condition, params) on p.*, order_by a list of
+        (column, output name, direction) and limit a row count; they are applied
+        inside every branch and again over the union, so each branch can stop early.
+        """
+        condicoes, filtros = [], []
+        for condicao, valor in (("p.quantity >= %s", min_qty), ("p.quantity <= %s", max_qty),
+                                ("p.price >= %s", min_price), ("p.price <= %s", max_price)):
+            if valor is not None:
+                condicoes.append(condicao)
+                filtros.append(valor)
+        if keyset is not None:
+            condicoes.append(keyset[0])
+            filtros += list(keyset[1])
+
+        partes, params = [], []
+        for tipo, (tabela, alias, descricao) in self.PRODUCT_SUBTYPES.items():
+            if product_type in self.PRODUCT_SUBTYPES and product_type != tipo:
+                continue
+            query = f"""
+                SELECT p.product_id, p.price, p.quantity, p.active,
+                       COALESCE(p.popularity, 0) AS popularity, p.product_type,
+                       {descricao} AS description
+                FROM Product p
+                JOIN {tabela} ON {alias}.product_id = p.product_id
+                WHERE p.product_type = %s"""
+            query += "".join(f" AND {condicao}" for condicao in condicoes)
+            params += [tipo] + filtros
+            if order_by:
+                query += " ORDER BY " + ", ".join(f"{coluna} {direcao}" for coluna, _, direcao in order_by)
+            if limit is not None:
+                query += " LIMIT %s"
+                params.append(limit)
+            partes.append(query)
+
+        if len(partes) == 1:
+            return partes[0], params
+        query = " UNION ALL ".join(f"({parte})" for parte in partes)
+        if order_by:
+            query += " ORDER BY " + ", ".join(f"{nome} {direcao}" for _, nome, direcao in order_by)
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        return query, params
     
     def get_products(self, product_type=None, min_qty=None, max_qty=None, min_price=None, max_price=None):
         """Get products with optional filters"""
-        cursor = self.connection.cursor(dictionary=True)
-        
-        query = """
+        query, params = self._products_query(product_type, min_qty, max_qty, min_price, max_price)
+        return self.fetch_all(query, params)
+
+    def get_products_page(self, page_size=100, after=None, sort_key='product_id', descending=False,
+                          **filters):
+        """Get one page of products sorted by the server (keyset pagination).
+
+        Returns (rows, cursor). Pass cursor back as after to get the next page;
+        it is None once the last page has been read. Unlike OFFSET, every page
+        costs the same because the query seeks straight to (sort_key, product_id).
+        """
+        if sort_key not in self.PRODUCT_SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort_key}")
+        column = self.PRODUCT_SORT_KEYS[sort_key]
+        op, direction = ('<', 'DESC') if descending else ('>', 'ASC')
+
+        keyset = None
+        if sort_key == 'product_id':
+            if after is not None:
+                keyset = (f"p.product_id {op} %s", [after[-1]])
+            order_by = [('p.product_id', 'product_id', direction)]
+        else:
+            if after is not None and sort_key in self.NULLABLE_SORT_KEYS and after[0] in (None, 0):
+                # O cursor está nos NULL (vêm antes de qualquer valor): continuar neles por
+                # product_id e, a subir, passar depois para os valores
+                condicao = f"{column} IS NULL AND p.product_id {op} %s"
+                if not descending:
+                    condicao = f"({condicao}) OR {column} IS NOT NULL"
+                keyset = (f"({condicao})", [after[1]])
+            elif after is not None:
+                condicao = f"({column}, p.product_id) {op} (%s, %s)"
+                if descending and sort_key in self.NULLABLE_SORT_KEYS:
+                    # Comparar com NULL dá NULL: a descer os NULL vêm no fim e entram à parte
+                    condicao += f" OR {column} IS NULL"
+                keyset = (f"({condicao})", list(after))
+            order_by = [(column, sort_key, direction), ('p.product_id', 'product_id', direction)]
+
+        query, params = self._products_query(keyset=keyset, order_by=order_by, limit=page_size, **filters)
+        rows = self.fetch_all(query, params)
+        if len(rows) < page_size:
+            return rows, None
+        return rows, (rows[-1][sort_key], rows[-1]['product_id'])
+
+    def check_product_types(self):
+        """Products whose product_type disagrees with their Book/Electronics row (migration 008)"""
+        return self.call_proc('CheckProductTypes_')
+
+    def backfill_product_types(self):
+        """Set product_type from the subtype tables; returns how many products were fixed"""
+        rows = self.call_proc('BackfillProductType_')
+        return rows[0] if rows else {'books_fixed': 0, 'electronics_fixed': 0}
+
+    # Colunas de cada índice FULLTEXT (migração 006)
+    FULLTEXT_COLUMNS = {
+        'Book': ('b', 'b.title, b.author, b.publisher, b.genre'),
+        'Electronics': ('e', 'e.brand, e.model, e.technical_specs'),
+    }
+
+    @staticmethod
+    def fulltext_terms(text):
+        """Turn free text into a BOOLEAN MODE query: every word required, as a prefix"""
+        palavras = re.sub(r'[+\-<>()~*"@]', ' ', text).split()
+        # O InnoDB não indexa palavras com menos de 3 letras (innodb_ft_min_token_size)
+        return " ".join(f"+{p}*" for p in palavras if len(p) >= 3)
+
+    def search_products(self, text, page_size=50, after=None, product_type=None, min_qty=None,
+                        max_qty=None, min_price=None, max_price=None):
+        """Full-text search over book and electronics attributes, best matches first.
+
+        Paged like get_products_page: returns (rows, cursor) with the cursor being
+        (score, product_id) of the last row, or None after the last page.
+        """
+        termos = self.fulltext_terms(text)
+        if not termos:
+            return [], None
+        partes, params = [], []
+        for tipo, (alias, colunas) in self.FULLTEXT_COLUMNS.items():
+            if product_type and product_type != tipo:
+                continue
+            descricao = self.PRODUCT_SUBTYPES[tipo][2]
+            partes.append(f"""
+                SELECT {alias}.product_id, {descricao} AS description,
+                       MATCH({colunas}) AGAINST (%s IN BOOLEAN MODE) AS score
+                FROM {tipo} {alias}
+                WHERE MATCH({colunas}) AGAINST (%s IN BOOLEAN MODE)
+            """)
+            params += [termos, termos]
+
+        query = f"""
             SELECT p.product_id, p.price, p.quantity, p.active,
-                   CASE
-                       WHEN b.isbn IS NOT NULL THEN 'Book'
-                       ELSE 'Electronics'
-                   END AS product_type,
+                   COALESCE(p.popularity, 0) AS popularity, p.product_type,
+                   m.description, m.score
+            FROM ({" UNION ALL ".join(partes)}) m
+            JOIN Product p ON p.product_id = m.product_id
+            WHERE 1=1
+        """
+        for condicao, valor in (("p.quantity >= %s", min_qty), ("p.quantity <= %s", max_qty),
+                                ("p.price >= %s", min_price), ("p.price <= %s", max_price)):
+            if valor is not None:
+                query += f" AND {condicao}"
+                params.append(valor)
+        if after is not None:
+            query += " AND (m.score < %s OR (m.score = %s AND p.product_id > %s))"
+            params += [after[0], after[0], after[1]]
+        query += " ORDER BY m.score DESC, p.product_id LIMIT %s"
+        params.append(page_size)
+
+        rows = self.fetch_all(query, params)
+        if len(rows) < page_size:
+            return rows, None
+        return rows, (rows[-1]['score'], rows[-1]['product_id'])
+
+    def get_daily_orders(self, order_date):
+        """Get all orders placed on a date (yyyy-MM-dd)"""
+        return self.call_proc('DailyOrders_', [order_date])
+
+    def get_daily_order_summaries(self, order_date):
+        """Get a day's orders with customer name, item counts and total in one query"""
+        return self.fetch_all("""
+            SELECT o.order_id, o.order_date, o.status, o.customer_id,
+                   c.first_name, c.last_name, o.gross_total,
+                   COUNT(oi.product_id) AS item_lines,
+                   COALESCE(SUM(oi.quantity), 0) AS units
+            FROM `Order` o
+            LEFT JOIN Customer c ON o.customer_id = c.customer_id
+            LEFT JOIN Ordered_Item oi ON oi.order_id = o.order_id
+            WHERE o.order_date >= %s AND o.order_date < %s + INTERVAL 1 DAY
+            GROUP BY o.order_id, o.order_date, o.status, o.customer_id,
+                     c.first_name, c.last_name, o.gross_total
+            ORDER BY o.order_date, o.order_id
+        """, (order_date, order_date))
+
+    def get_orders_between(self, start, end):
+        """Get all orders with start <= order_date < end"""
+        return self.call_proc('OrdersBetween_', [start, end])
+
+    def get_daily_orders_page(self, order_date, page_size=100, after=None):
+        """Get one page of a day's order summaries sorted by order_date (keyset pagination).
+
+        Rows are those of get_daily_order_summaries; returns (rows, cursor) like
+        get_products_page. The page of orders is picked first (seek on
+        (order_date, order_id) over idx_order_date) and only its lines are joined and counted.
+        """
+        query = """
+            SELECT order_id, order_date, status, customer_id, gross_total
+            FROM `Order`
+            WHERE order_date >= %s AND order_date < %s + INTERVAL 1 DAY
+        """
+        params = [order_date, order_date]
+        if after is not None:
+            query += " AND (order_date, order_id) > (%s, %s)"
+            params.extend(after)
+        query += " ORDER BY order_date, order_id LIMIT %s"
+        params.append(page_size)
+
+        rows = self.fetch_all(f"""
+            SELECT o.order_id, o.order_date, o.status, o.customer_id,
+                   c.first_name, c.last_name, o.gross_total,
+                   COUNT(oi.product_id) AS item_lines,
+                   COALESCE(SUM(oi.quantity), 0) AS units
+            FROM ({query}) o
+            LEFT JOIN Customer c ON o.customer_id = c.customer_id
+            LEFT JOIN Ordered_Item oi ON oi.order_id = o.order_id
+            GROUP BY o.order_id, o.order_date, o.status, o.customer_id,
+                     c.first_name, c.last_name, o.gross_total
+            ORDER BY o.order_date, o.order_id
+        """, params)
+        if len(rows) < page_size:
+            return rows, None
+        return rows, (rows[-1]['order_date'], rows[-1]['order_id'])
+
+    def get_order(self, order_id):
+        """Get an order together with its customer's name and email"""
+        return self.fetch_one("""
+            SELECT o.*, c.first_name, c.last_name, c.email
+            FROM `Order` o
+            JOIN Customer c ON o.customer_id = c.customer_id
+            WHERE o.order_id = %s
+        """, (order_id,), prepared=True)
+
+    def get_order_total(self, order_id):
+        """Get the total amount (VAT included) of an order, as stored on the order"""
+        row = self.fetch_one("SELECT gross_total FROM `Order` WHERE order_id = %s", (order_id,),
+                             prepared=True)
+        return row['gross_total'] if row else None
+
+    def get_order_items(self, order_id):
+        """Get the items of an order with their description and the price they were sold at"""
+        return self.fetch_all("""
+            SELECT oi.product_id, oi.quantity, COALESCE(oi.unit_price, p.price) AS price,
                    COALESCE(b.title, CONCAT(e.brand, ' ', e.model)) AS description
-            FROM Product p
+            FROM Ordered_Item oi
+            JOIN Product p ON oi.product_id = p.product_id
             LEFT JOIN Book b ON p.product_id = b.product_id
             LEFT JOIN Electronics e ON p.product_id = e.product_id
+            WHERE oi.order_id = %s
+        """, (order_id,), prepared=True)
+
+    def create_order_with_items(self, customer_id, items, shipping_method, card_number,
+                                card_holder_name, card_expiry_date):
+        """Create an order with all its lines in one transaction; returns the order id.
+
+        items is a list of (product_id, quantity); repeated products are summed. The
+        Product rows are locked with one SELECT ... FOR UPDATE in product_id order (so
+        concurrent checkouts cannot deadlock or oversell), stock is checked, and the
+        lines and stock updates are written with one statement each; the lines keep
+        the price and VAT rate of the moment and the order gets its totals (see
+        migration 004). Raises ValueError
+        if a product does not exist, is inactive or lacks stock; nothing is written then.
+        """
+        pedido = {}
+        for product_id, quantity in items:
+            if quantity <= 0:
+                raise ValueError(f"Invalid quantity {quantity} for product {product_id}")
+            pedido[product_id] = pedido.get(product_id, 0) + quantity
+        if not pedido:
+            raise ValueError("An order needs at least one item")
+        ids = sorted(pedido)
+        marcadores = ", ".join(["%s"] * len(ids))
+
+        def work(conn):
+            cursor = conn.cursor()
+            try:
+                # autocommit está desligado: tudo até ao commit é uma só transação
+                cursor.execute(f"""
+                    SELECT product_id, quantity, active, price, vat_rate
+                    FROM Product
+                    WHERE product_id IN ({marcadores})
+                    ORDER BY product_id
+                    FOR UPDATE
+                """, ids)
+                stock = {row[0]: row[1:] for row in cursor.fetchall()}
+                net = vat = Decimal('0.00')
+                for product_id in ids:
+                    if product_id not in stock:
+                        raise ValueError(f"Product {product_id} not found")
+                    quantity, active, price, vat_rate = stock[product_id]
+                    if not active:
+                        raise ValueError(f"Product {product_id} is inactive")
+                    if quantity < pedido[product_id]:
+                        raise ValueError(f"Not enough stock for product {product_id} "
+                                         f"({quantity} available, {pedido[product_id]} requested)")
+                    linha = price * pedido[product_id]
+                    net += linha
+                    # Como no MySQL: IVA arredondado ao cêntimo por linha (ROUND = half up)
+                    vat += (linha * vat_rate / 100).quantize(Decimal('0.01'), ROUND_HALF_UP)
+
+                cursor.execute("""
+                    INSERT INTO `Order` (customer_id, order_date, shipping_method, status,
+                                         card_number, card_holder_name, card_expiry_date,
+                                         net_total, vat_total, gross_total)
+                    VALUES (%s, NOW(), %s, 'Pending', %s, %s, %s, %s, %s, %s)
+                """, (customer_id, shipping_method, card_number, card_holder_name, card_expiry_date,
+                      net, vat, net + vat))
+                order_id = cursor.lastrowid
+
+                linhas = [(order_id, product_id, pedido[product_id]) + tuple(stock[product_id][2:])
+                          for product_id in ids]
+                cursor.execute(
+                    "INSERT INTO Ordered_Item (order_id, product_id, quantity, unit_price, vat_rate) VALUES "
+                    + ", ".join(["(%s, %s, %s, %s, %s)"] * len(ids)),
+                    [v for item in linhas for v in item]
+                )
+                cursor.execute(
+                    "UPDATE Product SET quantity = quantity - CASE product_id "
+                    + " ".join(["WHEN %s THEN %s"] * len(ids))
+                    + f" END WHERE product_id IN ({marcadores})",
+                    [v for product_id in ids for v in (product_id, pedido[product_id])] + ids
+                )
+                conn.commit()
+                return order_id
+            except (mysql.connector.Error, ValueError):
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+        return self.run(work)
+    
+    def refresh_sales_rollups(self, rebuild=False):
+        """Add new orders to the sales rollup tables (or rebuild them from scratch)"""
+        self.call_proc('RebuildSalesRollups_' if rebuild else 'RefreshSalesRollups_')
+        return self.fetch_one("SELECT last_order_id, updated_at FROM Rollup_State WHERE name = 'sales'")
+
+    @staticmethod
+    def _period_range(year, month=None):
+        """[start, end) dates of a year, or of one month of it"""
+        ultimo = month or 12
+        return date(year, month or 1, 1), date(year + ultimo // 12, ultimo % 12 + 1, 1)
+
+    def get_sales_by_period(self, year=None, product_type=None):
+        """Revenue, units and orders per year, or per month of `year`, from Sales_Daily"""
+        periodo = "MONTH(sale_date)" if year else "YEAR(sale_date)"
+        query = f"""
+            SELECT {periodo} AS period, SUM(units) AS units, SUM(orders) AS order_lines,
+                   SUM(net_revenue) AS net_revenue, SUM(gross_revenue) AS gross_revenue
+            FROM Sales_Daily
             WHERE 1=1
         """
         params = []
-        
         if product_type:
-            if product_type == 'Book':
-                query += " AND b.isbn IS NOT NULL"
-            elif product_type == 'Electronics':
-                query += " AND e.serial_number IS NOT NULL"
-        
-        if min_qty is not None:
-            query += " AND p.quantity >= %s"
-            params.append(min_qty)
-        
-        if max_qty is not None:
-            query += " AND p.quantity <= %s"
-            params.append(max_qty)
-        
-        if min_price is not None:
-            query += " AND p.price >= %s"
-            params.append(min_price)
-        
-        if max_price is not None:
-            query += " AND p.price <= %s"
-            params.append(max_price)
-        
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
-        return results
+            query += " AND product_type = %s"
+            params.append(product_type)
+        if year:
+            query += " AND sale_date >= MAKEDATE(%s, 1) AND sale_date < MAKEDATE(%s + 1, 1)"
+            params += [year, year]
+        query += f" GROUP BY {periodo} ORDER BY period"
+        return self.fetch_all(query, params)
+
+    def get_top_products(self, year, month=None, product_type=None, limit=10):
+        """Best-selling products (by gross revenue) of a year or month, from Sales_Daily"""
+        inicio, fim = self._period_range(year, month)
+        query = """
+            SELECT s.product_id, s.product_type,
+                   COALESCE(b.title, CONCAT(e.brand, ' ', e.model)) AS description,
+                   s.units, s.gross_revenue
+            FROM (
+                SELECT product_id, product_type, SUM(units) AS units, SUM(gross_revenue) AS gross_revenue
+                FROM Sales_Daily
+                WHERE sale_date >= %s AND sale_date < %s
+        """
+        params = [inicio, fim]
+        if product_type:
+            query += " AND product_type = %s"
+            params.append(product_type)
+        query += """
+                GROUP BY product_id, product_type
+                ORDER BY gross_revenue DESC
+                LIMIT %s
+            ) s
+            LEFT JOIN Book b ON b.product_id = s.product_id
+            LEFT JOIN Electronics e ON e.product_id = s.product_id
+            ORDER BY s.gross_revenue DESC
+        """
+        params.append(limit)
+        return self.fetch_all(query, params)
+
+    def get_top_customers(self, year, month=None, limit=10):
+        """Customers with the highest gross revenue in a year or month, from Sales_Customer_Monthly"""
+        inicio, fim = self._period_range(year, month)
+        return self.fetch_all("""
+            SELECT s.customer_id, c.first_name, c.last_name, s.orders, s.gross_revenue
+            FROM (
+                SELECT customer_id, SUM(orders) AS orders, SUM(gross_revenue) AS gross_revenue
+                FROM Sales_Customer_Monthly
+                WHERE sale_month >= %s AND sale_month < %s
+                GROUP BY customer_id
+                ORDER BY gross_revenue DESC
+                LIMIT %s
+            ) s
+            JOIN Customer c ON c.customer_id = s.customer_id
+            ORDER BY s.gross_revenue DESC
+        """, (inicio, fim, limit))
     
     def add_book(self, quantity, price, vat_rate, popularity, image_path, isbn, title, 
                  genre, publisher, author, publication_date):
-        """Add a new book product"""
-        cursor = self.connection.cursor()
+        """Add a new book product (AddBook_, migration 010)"""
         try:
-            cursor.callproc('AddBook', 
+            self.call_proc('AddBook_', 
                            [quantity, price, vat_rate, popularity, image_path, isbn, 
                             title, genre, publisher, author, publication_date])
-            self.connection.commit()
             return True
         except mysql.connector.Error as err:
             print(f"Error adding book: {err}")
             return False
-        finally:
-            cursor.close()
     
     def add_electronics(self, quantity, price, vat_rate, popularity, image_path, 
-                        serial_number, brand, model, tech_specs, product_type):
-        """Add a new electronics product"""
-        cursor = self.connection.cursor()
+                        serial_number, brand, model, tech_specs, consumable_type):
+        """Add a new electronics product (AddElec_, migration 010)"""
         try:
-            cursor.callproc('AddElec', 
+            self.call_proc('AddElec_', 
                            [quantity, price, vat_rate, popularity, image_path,
-                            serial_number, brand, model, tech_specs, product_type])
-            self.connection.commit()
+                            serial_number, brand, model, tech_specs, consumable_type])
             return True
         except mysql.connector.Error as err:
             print(f"Error adding electronics: {err}")
             return False
+
+
+class ProductImporter:
+    """Streams a product catalog (CSV or JSON) into Product + Book/Electronics in batches.
+
+    Rows are read lazily, validated, and inserted with one multi-row INSERT per
+    table per batch, each batch in its own transaction. The subtype rows take their
+    ids from LAST_INSERT_ID(), which is only safe while Product gets consecutive ids,
+    so under innodb_autoinc_lock_mode=2 the batch runs under LOCK TABLES. A batch
+    that hits a constraint error (e.g. duplicate ISBN) is retried row by row so
+    only the offending rows are rejected.
+    """
+    PRODUCT_COLUMNS = ('quantity', 'price', 'vat_rate', 'popularity', 'image_path',
+                       'active', 'product_type')
+    SUBTYPE_COLUMNS = {
+        'Book': ('isbn', 'title', 'genre', 'publisher', 'author', 'publication_date'),
+        'Electronics': ('serial_number', 'brand', 'model', 'technical_specs', 'consumable_type'),
+    }
+    REQUIRED = {
+        'Book': ('isbn', 'title'),
+        'Electronics': ('serial_number', 'brand', 'model'),
+    }
+
+    def __init__(self, db_manager, batch_size=1000, progress=None):
+        self.db_manager = db_manager
+        self.batch_size = batch_size
+        self.progress = progress  # chamado com (importados, rejeitados) após cada lote
+        self.cancelled = False
+        self.imported = 0
+        self.rejects = []  # (linha, motivo)
+
+    def cancel(self):
+        self.cancelled = True
+
+    @staticmethod
+    def read_rows(path):
+        """Yield (line/record number, dict) from a CSV, JSON Lines or JSON array file"""
+        if path.lower().endswith('.csv'):
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                for row in reader:
+                    yield reader.line_num, row
+            return
+
+        with open(path, encoding='utf-8') as f:
+            primeiro = f.read(1)
+            while primeiro and primeiro.isspace():
+                primeiro = f.read(1)
+            if primeiro != '[':
+                # JSON Lines: um objeto por linha
+                f.seek(0)
+                for n, linha in enumerate(f, start=1):
+                    if linha.strip():
+                        try:
+                            yield n, json.loads(linha)
+                        except json.JSONDecodeError:
+                            yield n, linha  # rejeitada pelo validate
+                return
+
+            # Array JSON: descodificar objeto a objeto sem carregar o ficheiro todo
+            decoder = json.JSONDecoder()
+            buffer = ''
+            n = 0
+            while True:
+                buffer = buffer.lstrip(' \t\r\n,')
+                if buffer.startswith(']'):
+                    return
+                try:
+                    obj, fim = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    bloco = f.read(65536)
+                    if not bloco:
+                        if buffer.strip():
+                            raise ValueError("JSON array is truncated")
+                        return
+                    buffer += bloco
+                    continue
+                n += 1
+                yield n, obj
+                buffer = buffer[fim:]
+
+    @classmethod
+    def validate(cls, raw):
+        """Turn a raw row into (product_type, product values, subtype values); raise ValueError"""
+        if not isinstance(raw, dict):
+            raise ValueError("not a JSON object")
+
+        def texto(campo):
+            valor = raw.get(campo)
+            return str(valor).strip() if valor not in (None, '') else None
+
+        tipo = (texto('product_type') or texto('type') or '').capitalize()
+        if tipo.lower() in ('book', 'livro'):
+            tipo = 'Book'
+        elif tipo.lower() in ('electronics', 'eletronica', 'electronic'):
+            tipo = 'Electronics'
+        else:
+            raise ValueError(f"unknown product type {tipo!r}")
+
+        try:
+            quantity = int(raw.get('quantity') or 0)
+            price = round(float(raw['price']), 2)
+            vat_rate = round(float(raw.get('vat_rate') or 0), 2)
+            popularity = int(raw['popularity']) if texto('popularity') else None
+        except (KeyError, TypeError, ValueError) as err:
+            raise ValueError(f"invalid number: {err}")
+        if quantity < 0:
+            raise ValueError("quantity must be >= 0")
+        if not 0 < price < 100000000:
+            raise ValueError("price must be > 0")
+        if not 0 <= vat_rate < 100:
+            raise ValueError("vat_rate must be between 0 and 99.99")
+        if popularity is not None and not 1 <= popularity <= 5:
+            raise ValueError("popularity must be between 1 and 5")
+
+        for campo in cls.REQUIRED[tipo]:
+            if not texto(campo):
+                raise ValueError(f"missing {campo}")
+        if tipo == 'Book':
+            if len(texto('isbn')) > 13:
+                raise ValueError("isbn longer than 13 characters")
+            data = texto('publication_date')
+            if data:
+                try:
+                    data = date.fromisoformat(data)
+                except ValueError:
+                    raise ValueError(f"invalid publication_date {data!r}")
+            subtipo = (texto('isbn'), texto('title'), texto('genre'), texto('publisher'),
+                       texto('author'), data)
+        else:
+            subtipo = tuple(texto(c) for c in cls.SUBTYPE_COLUMNS['Electronics'])
+
+        produto = (quantity, price, vat_rate, popularity, texto('image_path'), True, tipo)
+        return tipo, produto, subtipo
+
+    def run(self, path):
+        """Import the whole file; returns a summary dict"""
+        inicio = time.perf_counter()
+        lote = []
+        for linha, raw in self.read_rows(path):
+            if self.cancelled:
+                break
+            try:
+                lote.append((linha,) + self.validate(raw))
+            except ValueError as err:
+                self.rejects.append((linha, str(err)))
+                continue
+            if len(lote) >= self.batch_size:
+                self._flush(lote)
+                lote = []
+        if lote and not self.cancelled:
+            self._flush(lote)
+
+        duracao = time.perf_counter() - inicio
+        return {
+            'imported': self.imported,
+            'rejected': len(self.rejects),
+            'seconds': duracao,
+            'rows_per_s': self.imported / duracao if duracao else 0.0,
+            'cancelled': self.cancelled,
+        }
+
+    def _flush(self, lote):
+        try:
+            self.db_manager.run(lambda conn: self._insert(conn, lote))
+            self.imported += len(lote)
+        except mysql.connector.IntegrityError:
+            # Isolar as linhas problemáticas repetindo o lote linha a linha
+            for item in lote:
+                try:
+                    self.db_manager.run(lambda conn: self._insert(conn, [item]))
+                    self.imported += 1
+                except mysql.connector.IntegrityError as err:
+                    self.rejects.append((item[0], err.msg))
+        if self.progress:
+            self.progress(self.imported, len(self.rejects))
+
+    def _insert(self, conn, lote):
+        """Insert one batch in a single transaction"""
+        cursor = conn.cursor()
+        bloqueado = False
+        try:
+            cursor.execute("SELECT @@auto_increment_increment, @@innodb_autoinc_lock_mode")
+            passo, modo = cursor.fetchone()
+            if int(modo) >= 2:
+                # Modo 2 (omissão no MySQL 8): com outras sessões a inserir ao mesmo tempo os
+                # ids de um INSERT de várias linhas podem não ser seguidos. Com as tabelas
+                # bloqueadas ninguém intercala, e os ids voltam a ser consecutivos
+                cursor.execute("LOCK TABLES Product WRITE, Book WRITE, Electronics WRITE")
+                bloqueado = True
+            produtos = [produto for _, _, produto, _ in lote]
+            cursor.execute(*self._multi_insert('Product', self.PRODUCT_COLUMNS, produtos))
+            ids = [cursor.lastrowid + i * passo for i in range(len(lote))]
+            por_tipo = {'Book': [], 'Electronics': []}
+            for product_id, (_, tipo, _, subtipo) in zip(ids, lote):
+                por_tipo[tipo].append((product_id,) + subtipo)
+            for tipo, linhas in por_tipo.items():
+                if linhas:
+                    cursor.execute(*self._multi_insert(
+                        tipo, ('product_id',) + self.SUBTYPE_COLUMNS[tipo], linhas))
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
         finally:
+            if bloqueado:
+                cursor.execute("UNLOCK TABLES")
             cursor.close()
 
+    @staticmethod
+    def _multi_insert(table, columns, rows):
+        marcadores = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        query = (f"INSERT INTO `{table}` ({', '.join(columns)}) VALUES "
+                 + ", ".join([marcadores] * len(rows)))
+        return query, [valor for row in rows for valor in row]
+
+
+class QuerySignals(QObject):
+    """Signals used by QueryWorker to hand results back to the GUI thread"""
+    finished = Signal(object)
+    failed = Signal(object)
+
+
+class QueryWorker(QRunnable):
+    """Runs one DatabaseManager call in a QThreadPool thread"""
+    def __init__(self, fn, *args):
+        super().__init__()
+        self.setAutoDelete(False)  # o QueryRunner guarda a referência até ao fim
+        self.fn = fn
+        self.args = args
+        self.signals = QuerySignals()
+        self.cancelled = False
+        self.thread_id = None
+
+    def run(self):
+        if self.cancelled:
+            return
+        self.thread_id = threading.get_ident()
+        # Emite sempre, mesmo se cancelado: é assim que o QueryRunner sabe que pode largá-lo
+        try:
+            result = self.fn(*self.args)
+        except Exception as err:
+            self.signals.failed.emit(err)
+            return
+        self.signals.finished.emit(result)
+
+
+class QueryRunner(QObject):
+    """Submits database calls to worker threads on behalf of a dialog.
+
+    While queries are pending the busy_widgets are disabled and the dialog shows
+    a busy cursor. Everything still pending is cancelled when the dialog closes.
+    """
+    def __init__(self, db_manager, parent, busy_widgets=()):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.dialog = parent
+        self.busy_widgets = list(busy_widgets)
+        self.thread_pool = QThreadPool.globalInstance()
+        self.workers = set()
+        # Cancelados mas ainda a correr: guardados até acabarem (setAutoDelete(False)
+        # faz desta a única referência Python ao worker)
+        self.cancelled = set()
+        if hasattr(parent, 'finished'):
+            parent.finished.connect(self.cancel_all)
+
+    def submit(self, fn, *args, on_result, on_error=None):
+        """Run fn(*args) in the background and deliver its result to on_result"""
+        worker = QueryWorker(fn, *args)
+        worker.signals.finished.connect(lambda result: self._done(worker, on_result, result))
+        worker.signals.failed.connect(
+            lambda err: self._done(worker, on_error or self.show_error, err))
+        self.workers.add(worker)
+        self._set_busy(True)
+        self.thread_pool.start(worker)
+        return worker
+
+    def cancel_all(self, *_):
+        """Cancel pending queries and abort the ones already running"""
+        for worker in list(self.workers):
+            worker.cancelled = True
+            if self.thread_pool.tryTake(worker):
+                continue  # ainda não tinha começado: já não vai correr
+            self.cancelled.add(worker)
+            if worker.thread_id is not None and self.db_manager is not None:
+                try:
+                    self.db_manager.kill_query(worker.thread_id)
+                except mysql.connector.Error as err:
+                    print(f"Não foi possível cancelar a query: {err}")
+        self.workers.clear()
+        self._set_busy(False)
+
+    def show_error(self, err):
+        QMessageBox.warning(self.dialog, "Database Error", f"Query failed: {err}")
+
+    def _done(self, worker, callback, value):
+        if worker in self.cancelled:
+            self.cancelled.discard(worker)  # acabou: já pode ser libertado
+            return
+        if worker not in self.workers:
+            return
+        self.workers.discard(worker)
+        if not self.workers:
+            self._set_busy(False)
+        callback(value)
+
+    def _set_busy(self, busy):
+        for widget in self.busy_widgets:
+            widget.setEnabled(not busy)
+        if busy:
+            self.dialog.setCursor(Qt.BusyCursor)
+        else:
+            self.dialog.unsetCursor()
+
 
 class LoginDialog(QDialog):
     """Dialog for operator login"""
@@ -440,6 +2646,22 @@ class UserSearchDialog(QDialog):
         
         layout = QVBoxLayout()
         
+        # Pesquisa enquanto se escreve (id, email, nome ou telefone)
+        quick_layout = QHBoxLayout()
+        quick_layout.addWidget(QLabel("Search:"))
+        self.quick_input = QLineEdit()
+        self.quick_input.setPlaceholderText("id, email, name or phone...")
+        self.quick_input.textEdited.connect(self.schedule_suggestions)
+        quick_layout.addWidget(self.quick_input)
+        layout.addLayout(quick_layout)
+        
+        # Espera uma pausa na escrita antes de pesquisar
+        self.suggest_timer = QTimer(self)
+        self.suggest_timer.setSingleShot(True)
+        self.suggest_timer.setInterval(120)
+        self.suggest_timer.timeout.connect(self.load_suggestions)
+        self.suggest_generation = 0
+        
         # Search by ID
         id_layout = QHBoxLayout()
         id_layout.addWidget(QLabel("User ID:"))
@@ -474,6 +2696,10 @@ class UserSearchDialog(QDialog):
         
         self.setLayout(layout)
         
+        # Queries correm em background; os botões de pesquisa ficam inativos entretanto
+        self.queries = QueryRunner(self.db_manager, self,
+                                   [self.search_id_button, self.search_username_button])
+        
         # Resize columns
         header = self.results_table.horizontalHeader()
         for i in range(5):
@@ -495,8 +2721,8 @@ class UserSearchDialog(QDialog):
             QMessageBox.warning(self, "Input Error", "User ID must be a number")
             return
         
-        user = self.db_manager.search_user_by_id(user_id)
-        self.display_results([user] if user else [])
+        self.queries.submit(self.db_manager.search_user_by_id, user_id,
+                            on_result=self.display_user)
     
     def search_by_username(self):
         """Search for user by username (email)"""
@@ -505,14 +2731,41 @@ class UserSearchDialog(QDialog):
             QMessageBox.warning(self, "Input Error", "Please enter a username")
             return
         
-        user = self.db_manager.search_user_by_username(username)
+        self.queries.submit(self.db_manager.search_user_by_username, username,
+                            on_result=self.display_user)
+    
+    def schedule_suggestions(self, _text):
+        self.suggest_timer.start()
+
+    def load_suggestions(self):
+        """Fetch suggestions for the text typed so far"""
+        text = self.quick_input.text().strip()
+        self.suggest_generation += 1
+        generation = self.suggest_generation
+        if not text:
+            self.results_table.setRowCount(0)
+            return
+        self.queries.submit(
+            self.db_manager.suggest_customers, text, 20,
+            on_result=lambda users: self.display_suggestions(generation, users)
+        )
+
+    def display_suggestions(self, generation, users):
+        # Ignorar respostas de texto entretanto alterado
+        if generation == self.suggest_generation:
+            self.display_results(users, quiet=True)
+
+    def display_user(self, user):
+        """Display the result of a single-user lookup"""
         self.display_results([user] if user else [])
     
-    def display_results(self, users):
+    def display_results(self, users, quiet=False):
         """Display search results in the table"""
         self.results_table.setRowCount(0)
         
         if not users or all(user is None for user in users):
+            if quiet:
+                return
             QMessageBox.information(self, "Search Results", "No users found matching the criteria")
             return
         
@@ -544,7 +2797,12 @@ class UserSearchDialog(QDialog):
         """Toggle user status between blocked and active"""
         new_status = 'blocked' if current_status != 'blocked' else 'active'
         
-        if self.db_manager.update_user_status(user_id, new_status):
+        self.queries.submit(self.db_manager.update_user_status, user_id, new_status,
+                            on_result=lambda ok: self.status_changed(user_id, new_status, ok))
+
+    def status_changed(self, user_id, new_status, ok):
+        """Report the status change and refresh the current search"""
+        if ok:
             QMessageBox.information(self, "Success", 
                                    f"User {user_id} status changed to {new_status}")
             
@@ -556,6 +2814,8 @@ class UserSearchDialog(QDialog):
                 # If we just blocked a user that was found by username, refresh that search
                 elif self.username_input.text():
                     self.search_by_username()
+                elif self.quick_input.text():
+                    self.load_suggestions()
             else:
                 # If we just unblocked a user, they won't show up in the blocked users list anymore
                 # So we should refresh the current search
@@ -563,6 +2823,8 @@ class UserSearchDialog(QDialog):
                     self.search_by_id()
                 elif self.username_input.text():
                     self.search_by_username()
+                elif self.quick_input.text():
+                    self.load_suggestions()
         else:
             QMessageBox.warning(self, "Error", "Failed to update user status")
 
@@ -599,13 +2861,18 @@ class BlockedUsersDialog(QDialog):
         
         self.setLayout(layout)
         
+        self.queries = QueryRunner(self.db_manager, self, [self.refresh_button])
+        
         # Load blocked users when dialog opens
         self.load_blocked_users()
     
     def load_blocked_users(self):
-        """Load and display all blocked users"""
-        blocked_users = self.db_manager.get_blocked_users()
-        
+        """Load all blocked users in the background"""
+        self.queries.submit(self.db_manager.get_blocked_users,
+                            on_result=self.display_blocked_users)
+
+    def display_blocked_users(self, blocked_users):
+        """Display all blocked users"""
         self.results_table.setRowCount(0)
         
         if not blocked_users:
@@ -633,13 +2900,125 @@ class BlockedUsersDialog(QDialog):
     
     def unblock_user(self, user_id):
         """Unblock a user"""
-        if self.db_manager.update_user_status(user_id, 'active'):
+        self.queries.submit(self.db_manager.update_user_status, user_id, 'active',
+                            on_result=lambda ok: self.user_unblocked(user_id, ok))
+
+    def user_unblocked(self, user_id, ok):
+        if ok:
             QMessageBox.information(self, "Success", f"User {user_id} has been unblocked")
             self.load_blocked_users()  # Refresh the list
         else:
             QMessageBox.warning(self, "Error", "Failed to unblock user")
 
 
+class ProductTableModel(QAbstractTableModel):
+    """Product rows loaded page by page as the view scrolls (keyset pagination)"""
+    HEADERS = ["ID", "Type", "Description", "Price (€)", "Quantity"]
+    # Colunas que o servidor sabe ordenar (coluna da vista -> chave de get_products_page)
+    SORT_KEYS = {0: 'product_id', 3: 'price', 4: 'quantity'}
+    PAGE_SIZE = 500
+
+    page_loaded = Signal(int)  # total de linhas carregadas
+
+    def __init__(self, db_manager, queries, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.queries = queries
+        self.rows = []  # tuplos (id, tipo, descrição, preço, quantidade)
+        self.filters = None
+        self.sort_key = 'product_id'
+        self.descending = False
+        self.cursor = None
+        self.has_more = False
+        self.fetching = False
+        self.generation = 0  # descarta páginas de pesquisas anteriores
+
+    def set_filters(self, **filters):
+        """Start a new search, dropping the rows already loaded"""
+        self.beginResetModel()
+        self.rows = []
+        self.filters = filters
+        self.cursor = None
+        self.has_more = True
+        self.fetching = False
+        self.generation += 1
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Re-run the search sorted by the server (only ID, price and quantity)"""
+        if column not in self.SORT_KEYS:
+            return
+        self.sort_key = self.SORT_KEYS[column]
+        self.descending = order == Qt.DescendingOrder
+        if self.filters is not None:
+            self.set_filters(**self.filters)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self.rows[index.row()][index.column()]
+        if index.column() == 3:
+            return f"{value:.2f}"
+        return str(value) if value is not None else ""
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.has_more and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.fetching = True
+        generation = self.generation
+        filters = dict(self.filters)
+        text = filters.pop('text', None)
+        if text:
+            # Pesquisa por texto: ordenada por relevância, não pela coluna escolhida
+            fetch = partial(self.db_manager.search_products, text, self.PAGE_SIZE, self.cursor, **filters)
+        else:
+            fetch = partial(self.db_manager.get_products_page, self.PAGE_SIZE, self.cursor,
+                            self.sort_key, self.descending, **filters)
+        self.queries.submit(
+            fetch,
+            on_result=lambda page: self.append_page(generation, page),
+            on_error=lambda err: self.fetch_failed(generation, err)
+        )
+
+    def append_page(self, generation, result):
+        if generation != self.generation:
+            return
+        page, self.cursor = result
+        self.fetching = False
+        self.has_more = self.cursor is not None
+        if page:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+            self.rows.extend(
+                (p['product_id'], p['product_type'], p['description'], p['price'], p['quantity'])
+                for p in page
+            )
+            self.endInsertRows()
+        self.page_loaded.emit(len(self.rows))
+
+    def fetch_failed(self, generation, err):
+        if generation != self.generation:
+            return
+        self.fetching = False
+        self.has_more = False
+        self.queries.show_error(err)
+
+
 class ProductListDialog(QDialog):
     """Dialog for listing and filtering products"""
     def __init__(self, db_manager, parent=None):
@@ -655,6 +3034,15 @@ class ProductListDialog(QDialog):
         filter_box = QGroupBox("Filters")
         filter_layout = QHBoxLayout()
         
+        # Text search (título, autor, editora, género, marca, modelo, especificações)
+        text_layout = QVBoxLayout()
+        text_layout.addWidget(QLabel("Search Text:"))
+        self.text_input = QLineEdit()
+        self.text_input.setPlaceholderText("title, author, brand, model...")
+        self.text_input.returnPressed.connect(self.search_products)
+        text_layout.addWidget(self.text_input)
+        filter_layout.addLayout(text_layout)
+        
         # Product type filter
         type_layout = QVBoxLayout()
         type_layout.addWidget(QLabel("Product Type:"))
@@ -717,11 +3105,16 @@ class ProductListDialog(QDialog):
         self.search_button.clicked.connect(self.search_products)
         layout.addWidget(self.search_button)
         
-        # Results table
-        self.results_table = QTableWidget(0, 5)
-        self.results_table.setHorizontalHeaderLabels(
-            ["ID", "Type", "Description", "Price (€)", "Quantity"]
-        )
+        self.queries = QueryRunner(self.db_manager, self, [self.search_button])
+        
+        # Results table (os produtos são carregados à medida que se faz scroll)
+        self.results_model = ProductTableModel(self.db_manager, self.queries, self)
+        self.results_model.page_loaded.connect(self.on_page_loaded)
+        self.results_table = QTableView()
+        self.results_table.setModel(self.results_model)
+        self.results_table.setSortingEnabled(True)
+        self.results_table.sortByColumn(0, Qt.AscendingOrder)
+        self.results_table.horizontalHeader().sortIndicatorChanged.connect(self.keep_sort_indicator)
         layout.addWidget(self.results_table)
         
         # Close button
@@ -731,10 +3124,9 @@ class ProductListDialog(QDialog):
         
         self.setLayout(layout)
         
-        # Set column resize behavior
+        # Set column resize behavior (ResizeToContents percorreria todas as linhas carregadas)
         header = self.results_table.horizontalHeader()
-        for i in range(5):
-            header.setSectionResizeMode(i, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.Stretch)
     #        header.setSectionResizeMode(i, QTableWidget.resizeRowsToContents)
     
     def search_products(self):
@@ -747,30 +3139,31 @@ class ProductListDialog(QDialog):
         min_price = self.min_price.value() if self.min_price.value() > 0 else None
         max_price = self.max_price.value() if self.max_price.value() > 0 else None
         
-        products = self.db_manager.get_products(
-            product_type, min_qty, max_qty, min_price, max_price
+        self.results_model.set_filters(
+            text=self.text_input.text().strip() or None,
+            product_type=product_type, min_qty=min_qty, max_qty=max_qty,
+            min_price=min_price, max_price=max_price
         )
-        
-        self.display_results(products)
     
-    def display_results(self, products):
-        """Display search results in the table"""
-        self.results_table.setRowCount(0)
-        
-        if not products:
+    def on_page_loaded(self, total_rows):
+        """Tell the operator when a search returned nothing"""
+        if total_rows == 0:
             QMessageBox.information(self, "Search Results", "No products found matching the criteria")
+        elif total_rows <= ProductTableModel.PAGE_SIZE:
+            self.results_table.resizeColumnToContents(0)
+            self.results_table.resizeColumnToContents(1)
+
+    def keep_sort_indicator(self, column, order):
+        """Put the header arrow back on the active sort column when another one is clicked"""
+        model = self.results_model
+        if column in model.SORT_KEYS:
             return
-        
-        for product in products:
-            row = self.results_table.rowCount()
-            self.results_table.insertRow(row)
-            
-            # Add product data
-            self.results_table.setItem(row, 0, QTableWidgetItem(str(product['product_id'])))
-            self.results_table.setItem(row, 1, QTableWidgetItem(product['product_type']))
-            self.results_table.setItem(row, 2, QTableWidgetItem(product['description']))
-            self.results_table.setItem(row, 3, QTableWidgetItem(f"{product['price']:.2f}"))
-            self.results_table.setItem(row, 4, QTableWidgetItem(str(product['quantity'])))
+        # ProductTableModel.sort ignorou o clique; sem signals para não repetir a pesquisa
+        activa = next(c for c, key in model.SORT_KEYS.items() if key == model.sort_key)
+        header = self.results_table.horizontalHeader()
+        header.blockSignals(True)
+        header.setSortIndicator(activa, Qt.DescendingOrder if model.descending else Qt.AscendingOrder)
+        header.blockSignals(False)
 
 class AddProductDialog(QDialog):
     """Dialog for adding new products"""
@@ -877,6 +3270,8 @@ class AddProductDialog(QDialog):
         
         layout.addLayout(button_layout)
         self.setLayout(layout)
+        
+        self.queries = QueryRunner(self.db_manager, self, [self.add_button])
     
     def toggle_product_fields(self, index):
         """Show/hide fields based on product type selection"""
@@ -919,9 +3314,11 @@ class AddProductDialog(QDialog):
                 QMessageBox.warning(self, "Input Error", "Please fill all book fields")
                 return
                 
-            success = self.db_manager.add_book(
+            self.queries.submit(
+                self.db_manager.add_book,
                 quantity, price, vat_rate, popularity, image_path,
-                isbn, title, genre, publisher, author, pub_date
+                isbn, title, genre, publisher, author, pub_date,
+                on_result=self.product_added
             )
         else:  # Electronics
             serial = self.serial_number.text()
@@ -934,17 +3331,113 @@ class AddProductDialog(QDialog):
                 QMessageBox.warning(self, "Input Error", "Please fill all electronics fields")
                 return
                 
-            success = self.db_manager.add_electronics(
+            self.queries.submit(
+                self.db_manager.add_electronics,
                 quantity, price, vat_rate, popularity, image_path,
-                serial, brand, model, tech_specs, product_type
+                serial, brand, model, tech_specs, product_type,
+                on_result=self.product_added
             )
-        
+
+    def product_added(self, success):
         if success:
             QMessageBox.information(self, "Success", "Product added successfully")
             self.accept()
         else:
             QMessageBox.warning(self, "Error", "Failed to add product")
 
+class ProductImportDialog(QDialog):
+    """Dialog for importing a product catalog file (CSV or JSON) in batches"""
+    progress = Signal(int, int)
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        self.importer = None
+        self.file_path = ""
+        self.setWindowTitle("Import Products")
+        self.setMinimumWidth(500)
+        
+        layout = QVBoxLayout()
+        
+        self.file_button = QPushButton("Select CSV/JSON file...")
+        self.file_button.clicked.connect(self.select_file)
+        layout.addWidget(self.file_button)
+        
+        form_layout = QFormLayout()
+        self.batch_size = QSpinBox()
+        self.batch_size.setRange(1, 50000)
+        self.batch_size.setValue(1000)
+        form_layout.addRow("Batch size:", self.batch_size)
+        layout.addLayout(form_layout)
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        layout.addWidget(self.progress_bar)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        
+        button_layout = QHBoxLayout()
+        self.import_button = QPushButton("Import")
+        self.import_button.clicked.connect(self.start_import)
+        button_layout.addWidget(self.import_button)
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.accept)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        
+        self.queries = QueryRunner(self.db_manager, self,
+                                   [self.import_button, self.file_button, self.batch_size])
+        self.progress.connect(self.show_progress)
+        self.finished.connect(self.cancel_import)
+    
+    def select_file(self):
+        """Choose the catalog file to import"""
+        file_name, _ = QFileDialog.getOpenFileName(
+            self, "Select Product Catalog", "", "Catalog (*.csv *.json *.jsonl);;All Files (*)"
+        )
+        if file_name:
+            self.file_path = file_name
+            self.file_button.setText(f"File: {os.path.basename(file_name)}")
+    
+    def start_import(self):
+        """Run the import in a worker thread"""
+        if not self.file_path:
+            QMessageBox.warning(self, "Input Error", "Please select a file to import")
+            return
+        self.importer = ProductImporter(self.db_manager, self.batch_size.value(),
+                                        progress=self.progress.emit)
+        self.progress_bar.setRange(0, 0)  # indeterminado: o ficheiro é lido em streaming
+        self.status_label.setText("Importing...")
+        self.queries.submit(self.importer.run, self.file_path, on_result=self.import_done,
+                            on_error=self.import_failed)
+    
+    def show_progress(self, imported, rejected):
+        self.status_label.setText(f"{imported} imported, {rejected} rejected")
+    
+    def import_done(self, summary):
+        """Show the import summary and the first rejected rows"""
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(1)
+        message = (f"{summary['imported']} products imported, {summary['rejected']} rejected "
+                   f"in {summary['seconds']:.1f}s ({summary['rows_per_s']:.0f} rows/s)")
+        self.status_label.setText(message)
+        if self.importer.rejects:
+            details = "\n".join(f"line {line}: {reason}" for line, reason in self.importer.rejects[:20])
+            QMessageBox.warning(self, "Rejected Rows", f"{message}\n\n{details}")
+        else:
+            QMessageBox.information(self, "Import Finished", message)
+    
+    def import_failed(self, err):
+        self.progress_bar.setRange(0, 1)
+        self.status_label.setText("Import failed")
+        QMessageBox.warning(self, "Import Error", f"Import failed: {err}")
+    
+    def cancel_import(self, *_):
+        if self.importer:
+            self.importer.cancel()
+
 class OrderManagerDialog(QDialog):
     """Dialog for managing orders"""
     def __init__(self, db_manager, parent=None):
@@ -971,69 +3464,98 @@ class OrderManagerDialog(QDialog):
         layout.addLayout(date_layout)
         
         # Orders table
-        self.orders_table = QTableWidget(0, 5)
+        self.orders_table = QTableWidget(0, 7)
         self.orders_table.setHorizontalHeaderLabels(
-            ["Order ID", "Customer", "Date", "Status", "Actions"]
+            ["Order ID", "Customer", "Date", "Status", "Items", "Total", "Actions"]
         )
         self.orders_table.doubleClicked.connect(self.view_order_details)
         layout.addWidget(self.orders_table)
         
-        # Close button
+        # Load more / Close buttons
+        button_layout = QHBoxLayout()
+        self.more_button = QPushButton("Load More")
+        self.more_button.setEnabled(False)
+        self.more_button.clicked.connect(self.load_more_orders)
+        button_layout.addWidget(self.more_button)
+
         self.close_button = QPushButton("Close")
         self.close_button.clicked.connect(self.accept)
-        layout.addWidget(self.close_button)
+        button_layout.addWidget(self.close_button)
+        layout.addLayout(button_layout)
         
         self.setLayout(layout)
         
+        self.order_date = None
+        self.next_page = None  # cursor (order_date, order_id) da página seguinte
+        self.total_gross = 0
+        self.queries = QueryRunner(self.db_manager, self, [self.search_button, self.date_edit])
+        
         # Search orders for today by default
         self.search_orders()
     
+    PAGE_SIZE = 200
+
     def search_orders(self):
-        """Search orders for the selected date"""
-        order_date = self.date_edit.date().toString("yyyy-MM-dd")
-        
-        cursor = self.db_manager.connection.cursor(dictionary=True)
-        try:
-            cursor.callproc('DailyOrders_', [order_date])
-            
-            # Get the result set
-            orders = []
-            for result in cursor.stored_results():
-                orders = result.fetchall()
-            
-            self.display_orders(orders)
-        except mysql.connector.Error as err:
-            QMessageBox.warning(self, "Database Error", f"Failed to retrieve orders: {err}")
-        finally:
-            cursor.close()
-    
-    def display_orders(self, orders):
-        """Display orders in the table"""
+        """Search orders for the selected date (first page)"""
+        self.order_date = self.date_edit.date().toString("yyyy-MM-dd")
         self.orders_table.setRowCount(0)
+        self.total_gross = 0
+        self.next_page = None
+        self.more_button.setEnabled(False)
+        self.fetch_page(None)
+
+    def load_more_orders(self):
+        """Append the next page of the same day"""
+        if self.next_page is not None:
+            self.more_button.setEnabled(False)
+            self.fetch_page(self.next_page)
+
+    def fetch_page(self, after):
+        self.queries.submit(
+            self.db_manager.get_daily_orders_page, self.order_date, self.PAGE_SIZE, after,
+            on_result=self.display_orders,
+            on_error=lambda err: QMessageBox.warning(
+                self, "Database Error", f"Failed to retrieve orders: {err}")
+        )
+    
+    def display_orders(self, page):
+        """Append a page of orders to the table"""
+        orders, self.next_page = page
+        self.more_button.setEnabled(self.next_page is not None)
+        primeira = self.orders_table.rowCount()
         
-        if not orders:
+        if not orders and not primeira:
             QMessageBox.information(self, "Search Results", "No orders found for selected date")
             return
         
-        for order in orders:
-            row = self.orders_table.rowCount()
-            self.orders_table.insertRow(row)
-            
+        # Preencher tudo de uma vez, sem redesenhar a tabela a cada linha
+        self.orders_table.setUpdatesEnabled(False)
+        self.orders_table.setRowCount(primeira + len(orders))
+        for row, order in enumerate(orders, start=primeira):
             # Add order data
             self.orders_table.setItem(row, 0, QTableWidgetItem(str(order['order_id'])))
             self.orders_table.setItem(row, 1, QTableWidgetItem(
-                f"{order['customer_id']} - {order['card_holder_name']}"
+                f"{order['customer_id']} - {order['first_name']} {order['last_name']}"
             ))
             self.orders_table.setItem(row, 2, QTableWidgetItem(
-                order['order_datetime'].strftime("%Y-%m-%d %H:%M")
+                order['order_date'].strftime("%Y-%m-%d %H:%M")
             ))
             self.orders_table.setItem(row, 3, QTableWidgetItem(order['status']))
+            self.orders_table.setItem(row, 4, QTableWidgetItem(
+                f"{order['units']} ({order['item_lines']} lines)"
+            ))
+            self.orders_table.setItem(row, 5, QTableWidgetItem(f"€ {order['gross_total']:.2f}"))
             
             # Add view details button
             details_button = QPushButton("View Details")
             details_button.clicked.connect(lambda _, oid=order['order_id']: 
                                          self.view_order_details(oid))
-            self.orders_table.setCellWidget(row, 4, details_button)
+            self.orders_table.setCellWidget(row, 6, details_button)
+        self.orders_table.setUpdatesEnabled(True)
+        self.total_gross += sum(o['gross_total'] for o in orders)
+        mais = "+" if self.next_page is not None else ""
+        self.setWindowTitle(f"Order Management - {self.orders_table.rowCount()}{mais} orders, "
+                            f"€ {self.total_gross:.2f}")
     
     def view_order_details(self, order_id):
         """Show details for a specific order"""
@@ -1059,53 +3581,13 @@ class OrderDetailsDialog(QDialog):
         
         layout = QVBoxLayout()
         
-        # Order information
-        info_layout = QFormLayout()
-        
-        cursor = self.db_manager.connection.cursor(dictionary=True)
-        try:
-            cursor.execute("""
-                SELECT o.*, c.first_name, c.last_name, c.email
-                FROM `Order` o
-                JOIN Customer c ON o.customer_id = c.customer_id
-                WHERE o.order_id = %s
-            """, (order_id,))
-            order = cursor.fetchone()
-            
-            if not order:
-                QMessageBox.warning(self, "Error", "Order not found")
-                self.reject()
-                return
-            
-            info_layout.addRow("Order ID:", QLabel(str(order['order_id'])))
-            info_layout.addRow("Customer:", QLabel(
-                f"{order['first_name']} {order['last_name']} ({order['email']})"
-            ))
-            info_layout.addRow("Order Date:", QLabel(
-                order['order_datetime'].strftime("%Y-%m-%d %H:%M:%S")
-            ))
-            info_layout.addRow("Status:", QLabel(order['status']))
-            info_layout.addRow("Shipping Method:", QLabel(order['shipping_method']))
-            info_layout.addRow("Payment Card:", QLabel(
-                f"{order['card_holder_name']} (****{order['card_number'][-4:]})"
-            ))
-            
-            # Calculate and display order total
-            cursor.callproc('GetOrderTotal', [order_id, 0])
-            for result in cursor.stored_results():
-                total = result.fetchone()[0]
-            
-            info_layout.addRow("Order Total:", QLabel(f"€ {total:.2f}"))
-            
-        except mysql.connector.Error as err:
-            QMessageBox.warning(self, "Database Error", f"Failed to retrieve order: {err}")
-            self.reject()
-            return
-        finally:
-            cursor.close()
+        # Order information (preenchida quando a query terminar)
+        self.info_layout = QFormLayout()
+        self.loading_label = QLabel("A carregar encomenda...")
+        self.info_layout.addRow(self.loading_label)
         
         info_box = QGroupBox("Order Information")
-        info_box.setLayout(info_layout)
+        info_box.setLayout(self.info_layout)
         layout.addWidget(info_box)
         
         # Order items
@@ -1118,49 +3600,286 @@ class OrderDetailsDialog(QDialog):
         )
         layout.addWidget(self.items_table)
         
-        # Load order items
-        self.load_order_items()
-        
         # Close button
         self.close_button = QPushButton("Close")
         self.close_button.clicked.connect(self.accept)
         layout.addWidget(self.close_button)
         
         self.setLayout(layout)
+        
+        self.queries = QueryRunner(self.db_manager, self)
+        self.queries.submit(
+            self.fetch_order, order_id,
+            on_result=self.display_order,
+            on_error=lambda err: self.fail("Failed to retrieve order", err)
+        )
+        
+        # Load order items
+        self.load_order_items()
+    
+    def fetch_order(self, order_id):
+        """Fetch the order; its totals are stored on the row (runs in a worker thread)"""
+        return self.db_manager.get_order(order_id)
+    
+    def display_order(self, order):
+        """Fill the order information box"""
+        if not order:
+            QMessageBox.warning(self, "Error", "Order not found")
+            self.reject()
+            return
+        
+        info_layout = self.info_layout
+        info_layout.removeRow(self.loading_label)
+        info_layout.addRow("Order ID:", QLabel(str(order['order_id'])))
+        info_layout.addRow("Customer:", QLabel(
+            f"{order['first_name']} {order['last_name']} ({order['email']})"
+        ))
+        info_layout.addRow("Order Date:", QLabel(
+            order['order_date'].strftime("%Y-%m-%d %H:%M:%S")
+        ))
+        info_layout.addRow("Status:", QLabel(order['status']))
+        info_layout.addRow("Shipping Method:", QLabel(order['shipping_method']))
+        info_layout.addRow("Payment Card:", QLabel(
+            f"{order['card_holder_name']} (****{order['card_number'][-4:]})"
+        ))
+        info_layout.addRow("Net Total:", QLabel(f"€ {order['net_total']:.2f}"))
+        info_layout.addRow("VAT:", QLabel(f"€ {order['vat_total']:.2f}"))
+        info_layout.addRow("Order Total:", QLabel(f"€ {order['gross_total']:.2f}"))
+    
+    def fail(self, message, err):
+        """Report a failed query and close the dialog"""
+        QMessageBox.warning(self, "Database Error", f"{message}: {err}")
+        self.reject()
     
     def load_order_items(self):
         """Load and display items for this order"""
-        cursor = self.db_manager.connection.cursor(dictionary=True)
-        try:
-            cursor.execute("""
-                SELECT oi.product_id, oi.quantity, p.price,
-                       COALESCE(b.title, CONCAT(e.brand, ' ', e.model)) AS description
-                FROM Ordered_Item oi
-                JOIN Product p ON oi.product_id = p.product_id
-                LEFT JOIN Book b ON p.product_id = b.product_id
-                LEFT JOIN Electronics e ON p.product_id = e.product_id
-                WHERE oi.order_id = %s
-            """, (self.order_id,))
-            
-            items = cursor.fetchall()
+        self.queries.submit(
+            self.db_manager.get_order_items, self.order_id,
+            on_result=self.display_items,
+            on_error=lambda err: QMessageBox.warning(
+                self, "Database Error", f"Failed to retrieve order items: {err}")
+        )
+    
+    def display_items(self, items):
+        """Display the order items in the table"""
+        self.items_table.setRowCount(0)
+        for item in items:
+            row = self.items_table.rowCount()
+            self.items_table.insertRow(row)
             
-            self.items_table.setRowCount(0)
-            for item in items:
-                row = self.items_table.rowCount()
-                self.items_table.insertRow(row)
-                
-                self.items_table.setItem(row, 0, QTableWidgetItem(str(item['product_id'])))
-                self.items_table.setItem(row, 1, QTableWidgetItem(item['description']))
-                self.items_table.setItem(row, 2, QTableWidgetItem(str(item['quantity'])))
-                self.items_table.setItem(row, 3, QTableWidgetItem(f"€ {item['price']:.2f}"))
-                
-        except mysql.connector.Error as err:
-            QMessageBox.warning(self, "Database Error", f"Failed to retrieve order items: {err}")
-        finally:
-            cursor.close()
+            self.items_table.setItem(row, 0, QTableWidgetItem(str(item['product_id'])))
+            self.items_table.setItem(row, 1, QTableWidgetItem(item['description']))
+            self.items_table.setItem(row, 2, QTableWidgetItem(str(item['quantity'])))
+            self.items_table.setItem(row, 3, QTableWidgetItem(f"€ {item['price']:.2f}"))
+
+class QueryStatsDialog(QDialog):
+    """Latency, rows and errors of every query fingerprint run by the backoffice"""
+    COLUMNS = ["Query", "Calls", "Errors", "Total ms", "Avg ms", "p95 ms", "Max ms", "Rows", "KB"]
+
+    def __init__(self, query_stats, parent=None):
+        super().__init__(parent)
+        self.query_stats = query_stats
+        self.setWindowTitle("Query Stats")
+        self.setMinimumWidth(1000)
+        self.setMinimumHeight(500)
+
+        layout = QVBoxLayout()
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.results_table = QTableWidget(0, len(self.COLUMNS))
+        self.results_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.results_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.results_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.results_table.setSortingEnabled(True)
+        layout.addWidget(self.results_table)
+
+        button_layout = QHBoxLayout()
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.load_stats)
+        button_layout.addWidget(self.refresh_button)
+
+        self.reset_button = QPushButton("Reset")
+        self.reset_button.clicked.connect(self.reset_stats)
+        button_layout.addWidget(self.reset_button)
+
+        self.export_button = QPushButton("Export...")
+        self.export_button.clicked.connect(self.export_stats)
+        button_layout.addWidget(self.export_button)
+
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.accept)
+        button_layout.addWidget(self.close_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        self.load_stats()
+
+    def load_stats(self):
+        """Fill the table, slowest total time first"""
+        linhas = self.query_stats.snapshot()
+        self.summary_label.setText(
+            f"{len(linhas)} queries, {sum(e['calls'] for e in linhas)} calls since "
+            f"{self.query_stats.started:%Y-%m-%d %H:%M:%S}; slower than "
+            f"{self.query_stats.slow_query_ms:g} ms are logged to {self.query_stats.slow_log}"
+        )
+        self.results_table.setSortingEnabled(False)
+        self.results_table.setRowCount(len(linhas))
+        for row, e in enumerate(linhas):
+            item = QTableWidgetItem(e['fingerprint'])
+            item.setToolTip(e['fingerprint'] + (f"\n\nLast error: {e['last_error']}" if e['last_error'] else ""))
+            self.results_table.setItem(row, 0, item)
+            valores = [e['calls'], e['errors'], round(e['total_ms'], 1), round(e['avg_ms'], 2),
+                       e['p95_ms'], round(e['max_ms'], 1), e['rows'], round(e['bytes'] / 1024, 1)]
+            for col, valor in enumerate(valores, start=1):
+                item = QTableWidgetItem()
+                item.setData(Qt.DisplayRole, valor)  # ordena como número
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.results_table.setItem(row, col, item)
+        self.results_table.setSortingEnabled(True)
+
+    def reset_stats(self):
+        self.query_stats.reset()
+        self.load_stats()
+
+    def export_stats(self):
+        """Write the counters as JSON or Prometheus text"""
+        caminho, _ = QFileDialog.getSaveFileName(
+            self, "Export Query Stats", "query_stats.json",
+            "JSON (*.json);;Prometheus text (*.prom)"
+        )
+        if not caminho:
+            return
+        try:
+            self.query_stats.dump(caminho)
+        except OSError as err:
+            QMessageBox.warning(self, "Error", f"Export failed: {err}")
+            return
+        QMessageBox.information(self, "Query Stats", f"Saved to {caminho}")
+
+
+class SalesReportWidget(QWidget):
+    """Reports tab: revenue per month and best sellers, read from the sales rollup tables"""
+    MONTHS = ["All", "Jan", "Feb", "Mar", "Apr", "May", "Jun",
+              "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+    def __init__(self, db_manager, parent=None):
+        super().__init__(parent)
+        self.db_manager = db_manager
+        layout = QVBoxLayout()
+
+        # Filters
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Year:"))
+        self.year_input = QSpinBox()
+        self.year_input.setRange(2000, 2100)
+        self.year_input.setValue(date.today().year)
+        filter_layout.addWidget(self.year_input)
+
+        filter_layout.addWidget(QLabel("Month:"))
+        self.month_combo = QComboBox()
+        self.month_combo.addItems(self.MONTHS)
+        filter_layout.addWidget(self.month_combo)
+
+        filter_layout.addWidget(QLabel("Type:"))
+        self.type_combo = QComboBox()
+        self.type_combo.addItems(["All", "Book", "Electronics"])
+        filter_layout.addWidget(self.type_combo)
+
+        self.show_button = QPushButton("Show Report")
+        self.show_button.clicked.connect(self.load_report)
+        filter_layout.addWidget(self.show_button)
+
+        self.refresh_button = QPushButton("Update Sales Data")
+        self.refresh_button.clicked.connect(self.refresh_rollups)
+        filter_layout.addWidget(self.refresh_button)
+        layout.addLayout(filter_layout)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        # Revenue per month
+        self.months_table = QTableWidget(0, 5)
+        self.months_table.setHorizontalHeaderLabels(
+            ["Month", "Units", "Order Lines", "Net Revenue", "Gross Revenue"])
+        layout.addWidget(self.months_table)
+
+        # Best sellers
+        tops_layout = QHBoxLayout()
+        self.products_table = QTableWidget(0, 4)
+        self.products_table.setHorizontalHeaderLabels(["Product ID", "Description", "Units", "Revenue"])
+        tops_layout.addWidget(self.products_table)
+        self.customers_table = QTableWidget(0, 3)
+        self.customers_table.setHorizontalHeaderLabels(["Customer", "Orders", "Revenue"])
+        tops_layout.addWidget(self.customers_table)
+        layout.addLayout(tops_layout)
+
+        self.setLayout(layout)
+        self.queries = QueryRunner(self.db_manager, self, [self.show_button, self.refresh_button])
+
+    def filters(self):
+        """(year, month or None, product type or None) from the filter widgets"""
+        month = self.month_combo.currentIndex() or None
+        product_type = self.type_combo.currentText()
+        return self.year_input.value(), month, None if product_type == "All" else product_type
+
+    def fetch_report(self, year, month, product_type):
+        """Run the report queries (worker thread); returns (results, elapsed ms)"""
+        inicio = time.perf_counter()
+        resultado = {
+            'months': self.db_manager.get_sales_by_period(year, product_type),
+            'products': self.db_manager.get_top_products(year, month, product_type),
+            'customers': self.db_manager.get_top_customers(year, month),
+        }
+        return resultado, (time.perf_counter() - inicio) * 1000
+
+    def load_report(self):
+        self.status_label.setText("A carregar relatório...")
+        self.queries.submit(self.fetch_report, *self.filters(), on_result=self.display_report)
+
+    def display_report(self, result):
+        resultado, ms = result
+        self.months_table.setRowCount(len(resultado['months']))
+        for row, linha in enumerate(resultado['months']):
+            valores = [self.MONTHS[linha['period']], linha['units'], linha['order_lines'],
+                       f"€ {linha['net_revenue']:.2f}", f"€ {linha['gross_revenue']:.2f}"]
+            for col, valor in enumerate(valores):
+                self.months_table.setItem(row, col, QTableWidgetItem(str(valor)))
+
+        self.products_table.setRowCount(len(resultado['products']))
+        for row, linha in enumerate(resultado['products']):
+            valores = [linha['product_id'], linha['description'], linha['units'],
+                       f"€ {linha['gross_revenue']:.2f}"]
+            for col, valor in enumerate(valores):
+                self.products_table.setItem(row, col, QTableWidgetItem(str(valor)))
+
+        self.customers_table.setRowCount(len(resultado['customers']))
+        for row, linha in enumerate(resultado['customers']):
+            valores = [f"{linha['customer_id']} - {linha['first_name']} {linha['last_name']}",
+                       linha['orders'], f"€ {linha['gross_revenue']:.2f}"]
+            for col, valor in enumerate(valores):
+                self.customers_table.setItem(row, col, QTableWidgetItem(str(valor)))
+
+        total = sum(linha['gross_revenue'] for linha in resultado['months'])
+        self.status_label.setText(f"Total: € {total:.2f} (calculado em {ms:.0f} ms)")
+
+    def refresh_rollups(self):
+        self.status_label.setText("A atualizar dados de vendas...")
+        self.queries.submit(self.db_manager.refresh_sales_rollups, on_result=self.rollups_refreshed)
+
+    def rollups_refreshed(self, estado):
+        if estado:
+            self.status_label.setText(
+                f"Dados de vendas até à encomenda {estado['last_order_id']} ({estado['updated_at']:%Y-%m-%d %H:%M})")
+        self.load_report()
+
 
 class MainWindow(QMainWindow):
     """Main application window"""
+    backup_progress = Signal(object)
+
     def __init__(self, db_manager, operator_name):
         super().__init__()
         self.db_manager = db_manager
@@ -1249,7 +3968,24 @@ class MainWindow(QMainWindow):
 
 
 
+        # Tempos das queries do backoffice (QueryStats)
+        self.query_stats_button = QPushButton("QUERY STATS",admin_tab)
+        self.query_stats_button.move(0,70)
+        self.query_stats_button.setFixedSize(200,60)
+        self.query_stats_button.setStyleSheet(self.create_button.styleSheet())
+        self.query_stats_button.clicked.connect(self.open_query_stats)
+
+        # Incremental: só o binlog desde o último backup (barato, pode ser de hora a hora)
+        self.bacupe_incr_button = QPushButton("BACUPE INCREMENTAL",admin_tab)
+        self.bacupe_incr_button.move(520,0)
+        self.bacupe_incr_button.setFixedSize(200,60)
+        self.bacupe_incr_button.setStyleSheet(self.bacupe_buttons.styleSheet())
+
         self.bacupe_buttons.clicked.connect(self.Bacupe_Database)
+        self.bacupe_incr_button.clicked.connect(lambda: self.Bacupe_Database(incremental=True))
+        self.backup_progress.connect(self.show_backup_progress)
+        # O backup usa as suas próprias ligações, por isso não há db_manager para KILL QUERY
+        self.queries = QueryRunner(None, self, [self.bacupe_buttons, self.bacupe_incr_button])
 
         #admin_buttons.addWidget(self.search_user_button)
         admin_layout.addLayout(bacupe_buttons)
@@ -1288,6 +4024,10 @@ class MainWindow(QMainWindow):
         self.add_product_button.clicked.connect(self.open_add_product)
         product_buttons.addWidget(self.add_product_button)
         
+        self.import_products_button = QPushButton("Import Products")
+        self.import_products_button.clicked.connect(self.open_import_products)
+        product_buttons.addWidget(self.import_products_button)
+        
         product_layout.addLayout(product_buttons)
         tabs.addTab(product_tab, "Product Management")
         
@@ -1301,6 +4041,9 @@ class MainWindow(QMainWindow):
         order_layout.addWidget(self.manage_orders_button, alignment=Qt.AlignCenter)
         
         tabs.addTab(order_tab, "Order Management")
+
+        # Reports tab
+        tabs.addTab(SalesReportWidget(self.db_manager), "Reports")
         
         # Logout button
         logout_button = QPushButton("Logout")
@@ -1309,12 +4052,29 @@ class MainWindow(QMainWindow):
 
 
 
-    def Bacupe_Database(self):
-        """Admin Bacupe"""
+    def Bacupe_Database(self, incremental=False):
+        """Admin Bacupe (corre em background; o progresso aparece na barra de estado)"""
+        self.statusBar().showMessage("Bacupe em curso...")
+        self.queries.submit(
+            partial(ConfigManager.fazer_backup, progress=self.backup_progress.emit,
+                    incremental=incremental),
+            on_result=self.backup_done,
+            on_error=lambda err: QMessageBox.warning(self, "Backup Error", f"Backup failed: {err}")
+        )
+
+    def show_backup_progress(self, estado):
+        self.statusBar().showMessage(
+            f"Bacupe: {estado['tables_done']}/{estado['tables_total']} tabelas "
+            f"({estado['rows']} linhas) - {estado['table']}"
+        )
 
-        ConfigManager.fazer_backup()    
+    def backup_done(self, caminho):
+        if caminho is None:
+            self.statusBar().showMessage("Sem alterações desde o último bacupe", 10000)
+            return
+        self.statusBar().showMessage(f"Bacupe guardado em {caminho}", 10000)
         msgBox = QMessageBox()
-        msgBox.setText("Bacupe Done!!!!!!!!.")
+        msgBox.setText(f"Bacupe Done!!!!!!!!.\n{caminho}")
         msgBox.exec()
 
     
@@ -1356,6 +4116,19 @@ class MainWindow(QMainWindow):
         dialog = AddProductDialog(self.db_manager, self)
         dialog.exec()
     
+    def open_import_products(self):
+        """Open bulk product import dialog"""
+        dialog = ProductImportDialog(self.db_manager, self)
+        dialog.exec()
+    
+    def open_query_stats(self):
+        """Open the query statistics view"""
+        if self.db_manager.query_stats is None:
+            QMessageBox.information(self, "Query Stats", "Query instrumentation is disabled")
+            return
+        dialog = QueryStatsDialog(self.db_manager.query_stats, self)
+        dialog.exec()
+
     def open_order_manager(self):
         """Open order manager dialog"""
         dialog = OrderManagerDialog(self.db_manager, self)
@@ -1371,7 +4144,23 @@ class BuyPyBackoffice:
     def __init__(self):
         self.app = QApplication(sys.argv)
         self.config = ConfigManager()
-        self.db = DatabaseManager()
+        query_stats = None
+        if self.config.get_setting('Database', 'query_stats', 'yes').lower() in ('1', 'yes', 'true', 'on'):
+            query_stats = QueryStats(
+                slow_query_ms=float(self.config.get_setting('Database', 'slow_query_ms', 500)),
+                slow_log=self.config.get_setting('Database', 'slow_query_log', 'slow_queries.log'),
+                dump_path=self.config.get_setting('Database', 'query_stats_file') or None,
+                dump_interval=float(self.config.get_setting('Database', 'query_stats_interval', 60))
+            )
+        self.db = DatabaseManager(
+            pool_size=int(self.config.get_setting('Database', 'pool_size', 4)),
+            cache_size=int(self.config.get_setting('Database', 'cache_size', 1000)),
+            cache_ttl=float(self.config.get_setting('Database', 'cache_ttl', 60)),
+            customer_index=self.config.get_setting('Database', 'customer_index', 'yes').lower()
+            in ('1', 'yes', 'true', 'on'),
+            query_stats=query_stats,
+            prepared_cache_size=int(self.config.get_setting('Database', 'prepared_cache', 64))
+        )
         
         # Try to login with saved credentials
         username, password = self.config.load_config()
@@ -1393,6 +4182,8 @@ class BuyPyBackoffice:
             if self.db.connect(username, password):
                 # Save credentials if login successful
                 self.config.save_config(username, password)
+                ConfigManager.username=username
+                ConfigManager.password=password
                 self.show_main_window(username)
             else:
                 QMessageBox.warning(None, "Login Failed", "Invalid username or password")
@@ -0,0 +1,45 @@
+-- Migração 001: índices secundários para os acessos mais usados pelo backoffice
+--
+--   Customer.status                  -> DatabaseManager.get_blocked_users
+--   Product.price / Product.quantity -> DatabaseManager.get_products (filtros e ordenação)
+--   Product.popularity               -> DatabaseManager.get_products_page (ordenação)
+--   Order.order_date                 -> DailyOrders_, DatabaseManager.get_daily_orders_page
+--   Order(customer_id, order_date)   -> AnnualOrders_
+--
+-- Aplicar com ConfigManager.apply_migrations (ou o botão "Aplicar migrações").
+-- Pode ser executada mais de uma vez: os índices que já existem são ignorados.
+
+DROP PROCEDURE IF EXISTS AddIndexIfMissing;
+
+DELIMITER //
+CREATE PROCEDURE AddIndexIfMissing(
+    IN p_table VARCHAR(64),
+    IN p_index VARCHAR(64),
+    IN p_columns VARCHAR(255)
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+        AND table_name = p_table
+        AND index_name = p_index
+    ) THEN
+        SET @ddl = CONCAT('CREATE INDEX `', p_index, '` ON `', p_table, '` (', p_columns, ')');
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+DELIMITER ;
+
+-- Clientes bloqueados (a PK vem incluída em qualquer índice InnoDB)
+CALL AddIndexIfMissing('Customer', 'idx_customer_status', 'status');
+
+-- Filtros de preço/quantidade: cada índice cobre também o outro filtro
+CALL AddIndexIfMissing('Product', 'idx_product_price', 'price, quantity');
+CALL AddIndexIfMissing('Product', 'idx_product_quantity', 'quantity, price');
+CALL AddIndexIfMissing('Product', 'idx_product_popularity', 'popularity');
+
+-- Encomendas por dia e por cliente/ano
+CALL AddIndexIfMissing('Order', 'idx_order_date', 'order_date');
+CALL AddIndexIfMissing('Order', 'idx_order_customer_date', 'customer_id, order_date');
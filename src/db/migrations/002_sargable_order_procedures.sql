@@ -0,0 +1,44 @@
+-- Migração 002: procedures de encomendas por data com intervalos semiabertos
+--
+-- DATE(o.order_date) = ... e YEAR(o.order_date) = ... aplicam uma função à coluna e
+-- obrigam a ler a tabela `Order` inteira. Comparando a coluna diretamente com
+-- [início, fim) o MySQL usa idx_order_date / idx_order_customer_date (migração 001).
+
+DROP PROCEDURE IF EXISTS DailyOrders_;
+DROP PROCEDURE IF EXISTS AnnualOrders_;
+DROP PROCEDURE IF EXISTS OrdersBetween_;
+
+DELIMITER //
+
+-- DailyOrders: Returns all orders for a specific date
+CREATE PROCEDURE DailyOrders_(IN p_order_date DATE)
+BEGIN
+    SELECT *
+    FROM `Order` o
+    WHERE o.order_date >= p_order_date
+    AND o.order_date < p_order_date + INTERVAL 1 DAY
+    ORDER BY o.order_date, o.order_id;
+END //
+
+-- AnnualOrders: Returns all orders placed by a customer in a specific year
+CREATE PROCEDURE AnnualOrders_(IN p_customer_id INT, IN p_order_year INT)
+BEGIN
+    SELECT *
+    FROM `Order` o
+    WHERE o.customer_id = p_customer_id
+    AND o.order_date >= MAKEDATE(p_order_year, 1)
+    AND o.order_date < MAKEDATE(p_order_year + 1, 1)
+    ORDER BY o.order_date, o.order_id;
+END //
+
+-- OrdersBetween: Returns all orders with p_start <= order_date < p_end
+CREATE PROCEDURE OrdersBetween_(IN p_start DATETIME, IN p_end DATETIME)
+BEGIN
+    SELECT *
+    FROM `Order` o
+    WHERE o.order_date >= p_start
+    AND o.order_date < p_end
+    ORDER BY o.order_date, o.order_id;
+END //
+
+DELIMITER ;
@@ -0,0 +1,40 @@
+-- Migração 003: AddProductToOrder_ passa a bloquear a linha do produto
+--
+-- A versão anterior lia o stock com SELECT ... INTO sem bloqueio e só depois fazia o
+-- UPDATE: duas encomendas em simultâneo podiam ambas ver stock suficiente e vender
+-- acima do disponível. Com FOR UPDATE a segunda espera pela primeira.
+-- Para encomendas com várias linhas usar DatabaseManager.create_order_with_items,
+-- que bloqueia todos os produtos de uma vez e escreve as linhas num só INSERT.
+
+DROP PROCEDURE IF EXISTS AddProductToOrder_;
+
+DELIMITER //
+
+-- AddProductToOrder: Adds a product to an order
+CREATE PROCEDURE AddProductToOrder_(
+    IN p_order_id INT,
+    IN p_product_id INT,
+    IN p_quantity INT
+)
+BEGIN
+    DECLARE current_stock INT;
+
+    -- Check if product exists and has enough stock (locking the row until commit)
+    SELECT quantity INTO current_stock FROM Product WHERE product_id = p_product_id FOR UPDATE;
+
+    IF current_stock IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Product not found';
+    ELSEIF current_stock < p_quantity THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Not enough stock available';
+    ELSE
+        -- Add product to order
+        INSERT INTO Ordered_Item (order_id, product_id, quantity)
+        VALUES (p_order_id, p_product_id, p_quantity)
+        ON DUPLICATE KEY UPDATE quantity = quantity + p_quantity;
+
+        -- Update product stock
+        UPDATE Product SET quantity = quantity - p_quantity WHERE product_id = p_product_id;
+    END IF;
+END //
+
+DELIMITER ;
@@ -0,0 +1,120 @@
+-- Migração 004: totais das encomendas guardados em `Order`
+--
+-- GetOrderTotal_ juntava Ordered_Item com Product a cada consulta e usava o preço
+-- atual do produto, não o da venda. Agora:
+--   Ordered_Item.unit_price / vat_rate  -> preço e IVA no momento da venda
+--   Order.net_total / vat_total / gross_total -> atualizados ao acrescentar linhas
+--     (AddProductToOrder_ e DatabaseManager.create_order_with_items)
+-- O IVA é arredondado ao cêntimo por linha: vat = ROUND(unit_price * quantity * vat_rate / 100, 2).
+-- RecalcOrderTotals_ recalcula um intervalo de encomendas (usado aqui e pelo seed.py).
+
+DROP PROCEDURE IF EXISTS AddColumnIfMissing;
+DROP PROCEDURE IF EXISTS RecalcOrderTotals_;
+DROP PROCEDURE IF EXISTS AddProductToOrder_;
+DROP PROCEDURE IF EXISTS GetOrderTotal_;
+
+DELIMITER //
+CREATE PROCEDURE AddColumnIfMissing(
+    IN p_table VARCHAR(64),
+    IN p_column VARCHAR(64),
+    IN p_definition VARCHAR(255)
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = DATABASE()
+        AND table_name = p_table
+        AND column_name = p_column
+    ) THEN
+        SET @ddl = CONCAT('ALTER TABLE `', p_table, '` ADD COLUMN `', p_column, '` ', p_definition);
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+
+-- RecalcOrderTotals: Snapshots missing item prices and recomputes the totals of orders in a range
+CREATE PROCEDURE RecalcOrderTotals_(IN p_first_order_id INT, IN p_last_order_id INT)
+BEGIN
+    UPDATE Ordered_Item oi
+    JOIN Product p ON oi.product_id = p.product_id
+    SET oi.unit_price = p.price, oi.vat_rate = p.vat_rate
+    WHERE oi.order_id BETWEEN p_first_order_id AND p_last_order_id
+    AND oi.unit_price IS NULL;
+
+    UPDATE `Order` o
+    LEFT JOIN (
+        SELECT order_id,
+               SUM(unit_price * quantity) AS net,
+               SUM(ROUND(unit_price * quantity * vat_rate / 100, 2)) AS vat
+        FROM Ordered_Item
+        WHERE order_id BETWEEN p_first_order_id AND p_last_order_id
+        GROUP BY order_id
+    ) t ON t.order_id = o.order_id
+    SET o.net_total = COALESCE(t.net, 0),
+        o.vat_total = COALESCE(t.vat, 0),
+        o.gross_total = COALESCE(t.net, 0) + COALESCE(t.vat, 0)
+    WHERE o.order_id BETWEEN p_first_order_id AND p_last_order_id;
+END //
+
+-- AddProductToOrder: Adds a product to an order
+CREATE PROCEDURE AddProductToOrder_(
+    IN p_order_id INT,
+    IN p_product_id INT,
+    IN p_quantity INT
+)
+BEGIN
+    DECLARE current_stock INT;
+    DECLARE v_price DECIMAL(10,2);
+    DECLARE v_vat_rate DECIMAL(4,2);
+    DECLARE v_old_quantity INT DEFAULT 0;
+
+    -- Check if product exists and has enough stock (locking the row until commit)
+    SELECT quantity, price, vat_rate INTO current_stock, v_price, v_vat_rate
+    FROM Product WHERE product_id = p_product_id FOR UPDATE;
+
+    IF current_stock IS NULL THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Product not found';
+    ELSEIF current_stock < p_quantity THEN
+        SIGNAL SQLSTATE '45000' SET MESSAGE_TEXT = 'Not enough stock available';
+    ELSE
+        -- A line that already exists keeps the price it was sold at
+        SELECT quantity, unit_price, vat_rate INTO v_old_quantity, v_price, v_vat_rate
+        FROM Ordered_Item
+        WHERE order_id = p_order_id AND product_id = p_product_id
+        FOR UPDATE;
+
+        -- Add product to order
+        INSERT INTO Ordered_Item (order_id, product_id, quantity, unit_price, vat_rate)
+        VALUES (p_order_id, p_product_id, p_quantity, v_price, v_vat_rate)
+        ON DUPLICATE KEY UPDATE quantity = quantity + p_quantity;
+
+        -- Update product stock
+        UPDATE Product SET quantity = quantity - p_quantity WHERE product_id = p_product_id;
+
+        -- Update the order totals by the difference in this line
+        UPDATE `Order`
+        SET net_total = net_total + v_price * p_quantity,
+            vat_total = vat_total
+                + ROUND(v_price * (v_old_quantity + p_quantity) * v_vat_rate / 100, 2)
+                - ROUND(v_price * v_old_quantity * v_vat_rate / 100, 2),
+            gross_total = net_total + vat_total
+        WHERE order_id = p_order_id;
+    END IF;
+END //
+
+-- GetOrderTotal: Returns the stored gross total of an order
+CREATE PROCEDURE GetOrderTotal_(IN p_order_id INT, OUT p_total DECIMAL(12,2))
+BEGIN
+    SELECT gross_total INTO p_total FROM `Order` WHERE order_id = p_order_id;
+END //
+DELIMITER ;
+
+CALL AddColumnIfMissing('Ordered_Item', 'unit_price', 'DECIMAL(10,2) NULL');
+CALL AddColumnIfMissing('Ordered_Item', 'vat_rate', 'DECIMAL(4,2) NULL');
+CALL AddColumnIfMissing('Order', 'net_total', 'DECIMAL(12,2) NOT NULL DEFAULT 0');
+CALL AddColumnIfMissing('Order', 'vat_total', 'DECIMAL(12,2) NOT NULL DEFAULT 0');
+CALL AddColumnIfMissing('Order', 'gross_total', 'DECIMAL(12,2) NOT NULL DEFAULT 0');
+
+-- Encomendas já existentes: preço atual como melhor aproximação do preço de venda
+CALL RecalcOrderTotals_(0, 2147483647);
@@ -0,0 +1,121 @@
+-- Migração 005: tabelas de agregados de vendas para os relatórios
+--
+--   Sales_Daily             receita, unidades e encomendas por dia x produto (com o tipo)
+--   Sales_Customer_Monthly  receita, unidades e encomendas por cliente x mês
+--
+-- Os relatórios (separador "Reports", reports.py) leem só estas tabelas: um ano inteiro
+-- são no máximo 365 x produtos linhas já somadas, em vez de todas as encomendas.
+-- RefreshSalesRollups_ acrescenta as encomendas novas desde a última execução (marca
+-- em Rollup_State) e corre de 5 em 5 minutos pelo evento ev_refresh_sales_rollups
+-- (precisa de event_scheduler=ON) ou a pedido. Só entram encomendas com mais de um
+-- minuto, para não saltar transações ainda por confirmar. Linhas acrescentadas a uma
+-- encomenda já agregada ou mudanças de estado não são vistas: RebuildSalesRollups_
+-- recalcula tudo de raiz.
+
+CREATE TABLE IF NOT EXISTS Sales_Daily (
+    sale_date DATE NOT NULL,
+    product_id INT NOT NULL,
+    product_type ENUM('Book', 'Electronics') NOT NULL,
+    units INT NOT NULL,
+    orders INT NOT NULL,
+    net_revenue DECIMAL(14,2) NOT NULL,
+    gross_revenue DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (sale_date, product_id),
+    INDEX idx_sales_daily_type_date (product_type, sale_date),
+    INDEX idx_sales_daily_product_date (product_id, sale_date)
+);
+
+CREATE TABLE IF NOT EXISTS Sales_Customer_Monthly (
+    sale_month DATE NOT NULL,  -- primeiro dia do mês
+    customer_id INT NOT NULL,
+    units INT NOT NULL,
+    orders INT NOT NULL,
+    net_revenue DECIMAL(14,2) NOT NULL,
+    gross_revenue DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (sale_month, customer_id),
+    INDEX idx_sales_customer_month (customer_id, sale_month)
+);
+
+CREATE TABLE IF NOT EXISTS Rollup_State (
+    name VARCHAR(64) PRIMARY KEY,
+    last_order_id INT NOT NULL,
+    updated_at DATETIME NOT NULL
+);
+
+DROP PROCEDURE IF EXISTS RefreshSalesRollups_;
+DROP PROCEDURE IF EXISTS RebuildSalesRollups_;
+
+DELIMITER //
+
+-- RefreshSalesRollups: Adds the orders placed since the last refresh to the rollup tables
+CREATE PROCEDURE RefreshSalesRollups_()
+BEGIN
+    DECLARE v_from INT;
+    DECLARE v_to INT;
+
+    START TRANSACTION;
+    INSERT IGNORE INTO Rollup_State (name, last_order_id, updated_at) VALUES ('sales', 0, NOW());
+    -- FOR UPDATE: duas execuções em simultâneo não agregam as mesmas encomendas
+    SELECT last_order_id INTO v_from FROM Rollup_State WHERE name = 'sales' FOR UPDATE;
+    SELECT COALESCE(MAX(order_id), v_from) INTO v_to
+    FROM `Order`
+    WHERE order_id > v_from AND order_date < NOW() - INTERVAL 1 MINUTE;
+
+    IF v_to > v_from THEN
+        INSERT INTO Sales_Daily (sale_date, product_id, product_type, units, orders,
+                                 net_revenue, gross_revenue)
+        SELECT DATE(o.order_date), oi.product_id, p.product_type, SUM(oi.quantity), COUNT(*),
+               SUM(oi.unit_price * oi.quantity),
+               SUM(oi.unit_price * oi.quantity + ROUND(oi.unit_price * oi.quantity * oi.vat_rate / 100, 2))
+        FROM `Order` o
+        JOIN Ordered_Item oi ON oi.order_id = o.order_id
+        JOIN Product p ON p.product_id = oi.product_id
+        WHERE o.order_id > v_from AND o.order_id <= v_to
+        GROUP BY DATE(o.order_date), oi.product_id, p.product_type
+        ON DUPLICATE KEY UPDATE
+            units = units + VALUES(units),
+            orders = orders + VALUES(orders),
+            net_revenue = net_revenue + VALUES(net_revenue),
+            gross_revenue = gross_revenue + VALUES(gross_revenue);
+
+        INSERT INTO Sales_Customer_Monthly (sale_month, customer_id, units, orders,
+                                            net_revenue, gross_revenue)
+        SELECT DATE_FORMAT(o.order_date, '%Y-%m-01'), o.customer_id,
+               SUM(t.units), COUNT(*), SUM(o.net_total), SUM(o.gross_total)
+        FROM `Order` o
+        JOIN (
+            SELECT order_id, SUM(quantity) AS units
+            FROM Ordered_Item
+            WHERE order_id > v_from AND order_id <= v_to
+            GROUP BY order_id
+        ) t ON t.order_id = o.order_id
+        WHERE o.order_id > v_from AND o.order_id <= v_to AND o.customer_id IS NOT NULL
+        GROUP BY DATE_FORMAT(o.order_date, '%Y-%m-01'), o.customer_id
+        ON DUPLICATE KEY UPDATE
+            units = units + VALUES(units),
+            orders = orders + VALUES(orders),
+            net_revenue = net_revenue + VALUES(net_revenue),
+            gross_revenue = gross_revenue + VALUES(gross_revenue);
+
+        UPDATE Rollup_State SET last_order_id = v_to, updated_at = NOW() WHERE name = 'sales';
+    END IF;
+    COMMIT;
+END //
+
+-- RebuildSalesRollups: Recomputes the rollup tables from scratch
+CREATE PROCEDURE RebuildSalesRollups_()
+BEGIN
+    DELETE FROM Sales_Daily;
+    DELETE FROM Sales_Customer_Monthly;
+    REPLACE INTO Rollup_State (name, last_order_id, updated_at) VALUES ('sales', 0, NOW());
+    CALL RefreshSalesRollups_();
+END //
+
+DELIMITER ;
+
+DROP EVENT IF EXISTS ev_refresh_sales_rollups;
+CREATE EVENT ev_refresh_sales_rollups
+    ON SCHEDULE EVERY 5 MINUTE
+    DO CALL RefreshSalesRollups_();
+
+CALL RefreshSalesRollups_();
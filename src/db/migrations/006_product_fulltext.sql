@@ -0,0 +1,33 @@
+-- Migração 006: índices FULLTEXT para a pesquisa de produtos por texto
+--
+--   Book(title, author, publisher, genre)       -> DatabaseManager.search_products
+--   Electronics(brand, model, technical_specs)  -> DatabaseManager.search_products
+--
+-- A pesquisa usa MATCH ... AGAINST em modo booleano (cada palavra obrigatória e como
+-- prefixo), ordenada pela relevância devolvida pelo MySQL.
+
+DROP PROCEDURE IF EXISTS AddFulltextIndexIfMissing;
+
+DELIMITER //
+CREATE PROCEDURE AddFulltextIndexIfMissing(
+    IN p_table VARCHAR(64),
+    IN p_index VARCHAR(64),
+    IN p_columns VARCHAR(255)
+)
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.statistics
+        WHERE table_schema = DATABASE()
+        AND table_name = p_table
+        AND index_name = p_index
+    ) THEN
+        SET @ddl = CONCAT('CREATE FULLTEXT INDEX `', p_index, '` ON `', p_table, '` (', p_columns, ')');
+        PREPARE stmt FROM @ddl;
+        EXECUTE stmt;
+        DEALLOCATE PREPARE stmt;
+    END IF;
+END //
+DELIMITER ;
+
+CALL AddFulltextIndexIfMissing('Book', 'ft_book_text', 'title, author, publisher, genre');
+CALL AddFulltextIndexIfMissing('Electronics', 'ft_electronics_text', 'brand, model, technical_specs');
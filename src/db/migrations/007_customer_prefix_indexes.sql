@@ -0,0 +1,10 @@
+-- Migração 007: índices para a pesquisa de clientes enquanto se escreve
+--
+-- DatabaseManager.suggest_customers procura por prefixo (LIKE 'abc%') no email, nome,
+-- apelido e telefone. Enquanto o índice em memória (CustomerIndex) não está carregado,
+-- ou se estiver desligado no config.ini, é o MySQL que responde com estes índices.
+-- O email já tem o índice UNIQUE; nos nomes basta indexar os primeiros caracteres.
+
+CALL AddIndexIfMissing('Customer', 'idx_customer_first_name', 'first_name(20)');
+CALL AddIndexIfMissing('Customer', 'idx_customer_last_name', 'last_name(20)');
+CALL AddIndexIfMissing('Customer', 'idx_customer_phone', 'phone_number');
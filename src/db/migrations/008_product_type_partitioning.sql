@@ -0,0 +1,98 @@
+-- Migração 008: o tipo de produto vem de Product.product_type
+--
+-- A listagem de produtos (DatabaseManager.get_products / get_products_page) e o
+-- ProductByType_ descobriam o tipo com LEFT JOIN a Book e a Electronics e testando
+-- b.isbn / e.serial_number, o que lia as duas tabelas para cada produto. Agora filtram
+-- por product_type (indexado) e juntam só a tabela do tipo pedido; "All" é um
+-- UNION ALL das duas consultas.
+--
+-- Para isso product_type tem de estar certo:
+--   CheckProductTypes_     lista os produtos com o tipo errado, sem subtipo ou com os dois
+--   BackfillProductType_   corrige o tipo a partir da tabela de subtipo (corre aqui uma vez)
+--   trg_*_product_type     acertam o tipo ao inserir em Book/Electronics (AddBook_ e
+--                          AddElec_ não preenchem a coluna)
+
+-- A PK vem incluída em cada índice: (product_type, product_id) serve a ordenação por id
+CALL AddIndexIfMissing('Product', 'idx_product_type', 'product_type');
+CALL AddIndexIfMissing('Product', 'idx_product_type_price', 'product_type, price');
+CALL AddIndexIfMissing('Product', 'idx_product_type_popularity', 'product_type, popularity');
+
+DROP PROCEDURE IF EXISTS CheckProductTypes_;
+DROP PROCEDURE IF EXISTS BackfillProductType_;
+DROP PROCEDURE IF EXISTS ProductByType_;
+
+DELIMITER //
+
+-- CheckProductTypes: Lists the products whose product_type disagrees with their subtype row
+CREATE PROCEDURE CheckProductTypes_()
+BEGIN
+    SELECT p.product_id, p.product_type,
+           CASE
+               WHEN b.product_id IS NOT NULL AND e.product_id IS NOT NULL THEN 'both subtypes'
+               WHEN b.product_id IS NULL AND e.product_id IS NULL THEN 'no subtype'
+               ELSE 'wrong product_type'
+           END AS problem,
+           CASE
+               WHEN b.product_id IS NOT NULL AND e.product_id IS NULL THEN 'Book'
+               WHEN e.product_id IS NOT NULL AND b.product_id IS NULL THEN 'Electronics'
+           END AS expected_type
+    FROM Product p
+    LEFT JOIN Book b ON b.product_id = p.product_id
+    LEFT JOIN Electronics e ON e.product_id = p.product_id
+    WHERE (b.product_id IS NULL) = (e.product_id IS NULL)
+       OR (b.product_id IS NOT NULL AND p.product_type <> 'Book')
+       OR (e.product_id IS NOT NULL AND p.product_type <> 'Electronics')
+    ORDER BY p.product_id;
+END //
+
+-- BackfillProductType: Sets product_type from the subtype table (ambiguous products are left alone)
+CREATE PROCEDURE BackfillProductType_()
+BEGIN
+    DECLARE v_books INT;
+    DECLARE v_electronics INT;
+
+    UPDATE Product p
+    JOIN Book b ON b.product_id = p.product_id
+    LEFT JOIN Electronics e ON e.product_id = p.product_id
+    SET p.product_type = 'Book'
+    WHERE e.product_id IS NULL AND p.product_type <> 'Book';
+    SET v_books = ROW_COUNT();
+
+    UPDATE Product p
+    JOIN Electronics e ON e.product_id = p.product_id
+    LEFT JOIN Book b ON b.product_id = p.product_id
+    SET p.product_type = 'Electronics'
+    WHERE b.product_id IS NULL AND p.product_type <> 'Electronics';
+    SET v_electronics = ROW_COUNT();
+
+    SELECT v_books AS books_fixed, v_electronics AS electronics_fixed;
+END //
+
+-- ProductByType: Returns product details filtered by type (all products when NULL)
+CREATE PROCEDURE ProductByType_(IN p_product_type VARCHAR(50))
+BEGIN
+    IF p_product_type IS NULL THEN
+        SELECT product_id, price, popularity, active, image_path, product_type
+        FROM Product;
+    ELSE
+        SELECT product_id, price, popularity, active, image_path, product_type
+        FROM Product
+        WHERE product_type = p_product_type;
+    END IF;
+END //
+
+DELIMITER ;
+
+DROP TRIGGER IF EXISTS trg_book_product_type;
+CREATE TRIGGER trg_book_product_type
+    AFTER INSERT ON Book FOR EACH ROW
+    UPDATE Product SET product_type = 'Book'
+    WHERE product_id = NEW.product_id AND product_type <> 'Book';
+
+DROP TRIGGER IF EXISTS trg_electronics_product_type;
+CREATE TRIGGER trg_electronics_product_type
+    AFTER INSERT ON Electronics FOR EACH ROW
+    UPDATE Product SET product_type = 'Electronics'
+    WHERE product_id = NEW.product_id AND product_type <> 'Electronics';
+
+CALL BackfillProductType_();
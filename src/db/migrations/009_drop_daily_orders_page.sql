@@ -0,0 +1,8 @@
+-- Migração 009: remove DailyOrdersPage_
+--
+-- A procedure chegou a ser instalada pelo BUYPay.sql, mas ninguém a chamava: a janela
+-- "Manage Orders" usa DatabaseManager.get_daily_orders_page, que pagina pelo mesmo
+-- (order_date, order_id) e junta logo o cliente e as linhas de cada encomenda.
+-- Pode ser executada mais de uma vez.
+
+DROP PROCEDURE IF EXISTS DailyOrdersPage_;
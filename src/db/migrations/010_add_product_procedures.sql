@@ -0,0 +1,71 @@
+-- Migração 010: AddBook_ e AddElec_ corrigidas
+--
+-- As do BUYPay.sql não preenchem Product.product_type (NOT NULL sem valor por omissão,
+-- por isso o INSERT falha em modo estrito) e AddElec_ escreve nas colunas tech_specs e
+-- type, que não existem em Electronics (são technical_specs e consumable_type).
+-- Usadas por DatabaseManager.add_book / add_electronics.
+-- Pode ser executada mais de uma vez.
+
+DROP PROCEDURE IF EXISTS AddBook_;
+DROP PROCEDURE IF EXISTS AddElec_;
+
+DELIMITER //
+
+-- AddBook: Adds a book product to the database
+CREATE PROCEDURE AddBook_(
+    IN p_quantity INT,
+    IN p_price DECIMAL(10,2),
+    IN p_vat_rate DECIMAL(5,2),
+    IN p_popularity INT,
+    IN p_image_path VARCHAR(255),
+    IN p_isbn VARCHAR(20),
+    IN p_title VARCHAR(255),
+    IN p_genre VARCHAR(100),
+    IN p_publisher VARCHAR(100),
+    IN p_author VARCHAR(100),
+    IN p_publication_date DATE
+)
+BEGIN
+    DECLARE new_product_id INT;
+
+    INSERT INTO Product (quantity, price, vat_rate, popularity, image_path,
+                         active, inactive_reason, product_type)
+    VALUES (p_quantity, p_price, p_vat_rate, p_popularity, p_image_path,
+            TRUE, NULL, 'Book');
+
+    SET new_product_id = LAST_INSERT_ID();
+
+    INSERT INTO Book (product_id, isbn, title, genre, publisher, author, publication_date)
+    VALUES (new_product_id, p_isbn, p_title, p_genre, p_publisher, p_author, p_publication_date);
+END //
+
+-- AddElec: Adds an electronics product to the database
+CREATE PROCEDURE AddElec_(
+    IN p_quantity INT,
+    IN p_price DECIMAL(10,2),
+    IN p_vat_rate DECIMAL(5,2),
+    IN p_popularity INT,
+    IN p_image_path VARCHAR(255),
+    IN p_serial_number VARCHAR(50),
+    IN p_brand VARCHAR(100),
+    IN p_model VARCHAR(100),
+    IN p_technical_specs TEXT,
+    IN p_consumable_type VARCHAR(100)
+)
+BEGIN
+    DECLARE new_product_id INT;
+
+    INSERT INTO Product (quantity, price, vat_rate, popularity, image_path,
+                         active, inactive_reason, product_type)
+    VALUES (p_quantity, p_price, p_vat_rate, p_popularity, p_image_path,
+            TRUE, NULL, 'Electronics');
+
+    SET new_product_id = LAST_INSERT_ID();
+
+    INSERT INTO Electronics (product_id, serial_number, brand, model,
+                             technical_specs, consumable_type)
+    VALUES (new_product_id, p_serial_number, p_brand, p_model,
+            p_technical_specs, p_consumable_type);
+END //
+
+DELIMITER ;